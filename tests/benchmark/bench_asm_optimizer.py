@@ -0,0 +1,75 @@
+"""
+Benchmark for the assembly optimizer, showing how the optimization time
+grows with the size of the assembly.
+
+The assembly is the unoptimized runtime assembly of an example contract,
+repeated (with fresh labels) to get larger inputs.
+
+usage: python -m tests.benchmark.bench_asm_optimizer [--contract PATH] [--max-copies N]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from vyper.compiler.phases import CompilerData
+from vyper.compiler.settings import OptimizationLevel, Settings
+from vyper.evm.assembler.instructions import DATA_ITEM, PUSH_OFST, PUSHLABEL, Label
+from vyper.evm.assembler.optimizer import optimize_assembly
+
+DEFAULT_CONTRACT = Path(__file__).parents[2] / "examples/tokens/ERC20.vy"
+
+
+def unoptimized_assembly(path: Path) -> list:
+    # strip the version pragma, the examples track the latest release
+    source = "\n".join(
+        line for line in path.read_text().splitlines() if not line.startswith("#pragma version")
+    )
+    settings = Settings(optimize=OptimizationLevel.NONE)
+    return CompilerData(source, settings=settings).assembly_runtime
+
+
+def _rename(item, suffix: str):
+    def relabel(label):
+        return Label(label.label + suffix) if isinstance(label, Label) else label
+
+    if isinstance(item, Label):
+        return relabel(item)
+    if isinstance(item, PUSHLABEL):
+        return PUSHLABEL(relabel(item.label))
+    if isinstance(item, PUSH_OFST):
+        return PUSH_OFST(relabel(item.label), item.ofst)
+    if isinstance(item, DATA_ITEM):
+        return DATA_ITEM(relabel(item.data))
+    return item
+
+
+def replicate(assembly: list, copies: int) -> list:
+    ret = []
+    for i in range(copies):
+        ret.extend(_rename(item, f"_{i}") for item in assembly)
+    return ret
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--contract", type=Path, default=DEFAULT_CONTRACT)
+    parser.add_argument("--max-copies", type=int, default=64)
+    args = parser.parse_args()
+
+    base = unoptimized_assembly(args.contract)
+
+    print(f"{'items':>8} {'ms':>10} {'us/item':>8}")
+    copies = 1
+    while copies <= args.max_copies:
+        assembly = replicate(base, copies)
+        n = len(assembly)
+        t0 = time.perf_counter()
+        optimize_assembly(assembly)
+        elapsed = time.perf_counter() - t0
+        print(f"{n:>8} {elapsed * 1000:>10.1f} {elapsed * 1e6 / n:>8.2f}")
+        copies *= 2
+
+
+if __name__ == "__main__":
+    main()
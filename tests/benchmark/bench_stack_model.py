@@ -0,0 +1,141 @@
+"""
+Benchmark for the venom stack model, comparing the indexed stack model
+with a stack model which scans the stack for every depth query.
+
+The first table replays the operations of assembly generation (depth
+queries, dups, swaps and pops) on stacks of growing height. The second
+table generates assembly for contracts with external functions taking
+many arguments, which are forwarded to an internal function and to an
+external call, so that many variables are live on the stack at once.
+
+usage: python -m tests.benchmark.bench_stack_model [--max-height N] [--repeat N]
+"""
+
+import argparse
+import random
+import time
+
+from vyper.compiler.phases import CompilerData
+from vyper.compiler.settings import Settings
+from vyper.venom import venom_to_assembly
+from vyper.venom.basicblock import IRVariable
+from vyper.venom.stack_model import StackModel
+from vyper.venom.venom_to_assembly import VenomCompiler
+
+
+class LinearStackModel(StackModel):
+    """
+    Stack model which looks up operands by scanning the stack
+    """
+
+    def get_depth(self, op):
+        for i, stack_op in enumerate(reversed(self._stack)):
+            if stack_op.value == op.value:
+                return -i
+        return StackModel.NOT_IN_STACK  # type: ignore
+
+    def get_phi_depth(self, phis):
+        ret = StackModel.NOT_IN_STACK
+        for i, stack_item in enumerate(reversed(self._stack)):
+            if stack_item in phis:
+                assert ret is StackModel.NOT_IN_STACK
+                ret = -i
+        return ret  # type: ignore
+
+
+def replay(stack_model: type, height: int, n_ops: int) -> float:
+    rng = random.Random(height)
+    variables = [IRVariable(f"%{i}") for i in range(height)]
+    stack = stack_model()
+    for var in variables:
+        stack.push(var)
+
+    t0 = time.perf_counter()
+    for _ in range(n_ops):
+        depth = stack.get_depth(rng.choice(variables))
+        stack.dup(depth)
+        stack.pop()
+        # swap back and forth, so no variable is lost from the stack
+        swap_depth = -rng.randint(1, min(16, height - 1))
+        stack.swap(swap_depth)
+        stack.swap(swap_depth)
+        stack.get_phi_depth(rng.sample(variables, 2)[:1])
+    return time.perf_counter() - t0
+
+
+def make_contract(n_args: int) -> str:
+    args = ", ".join(f"x{i}: uint256" for i in range(n_args))
+    call_args = ", ".join(f"x{i}" for i in range(n_args))
+    # mix the arguments so they stay live across the calls
+    total = " + ".join(f"x{i} * {i + 1}" for i in range(n_args))
+    return f"""
+interface Target:
+    def take({args}) -> uint256: nonpayable
+
+target: Target
+
+@internal
+def _mix({args}) -> uint256:
+    return {total}
+
+@external
+def forward({args}) -> uint256:
+    a: uint256 = extcall self.target.take({call_args})
+    b: uint256 = self._mix({call_args})
+    return a + b + {total}
+"""
+
+
+def _venom_runtime(source: str):
+    settings = Settings(experimental_codegen=True)
+    return CompilerData(source, settings=settings).venom_runtime
+
+
+def _time(source: str, stack_model: type, repeat: int) -> tuple[float, list]:
+    venom_to_assembly.StackModel = stack_model  # type: ignore
+    try:
+        best = float("inf")
+        for _ in range(repeat):
+            # assembly generation modifies the venom context, start afresh
+            ctx = _venom_runtime(source)
+            t0 = time.perf_counter()
+            asm = VenomCompiler(ctx).generate_evm_assembly()
+            best = min(best, time.perf_counter() - t0)
+    finally:
+        venom_to_assembly.StackModel = StackModel  # type: ignore
+    return best, asm
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-height", type=int, default=1024)
+    parser.add_argument("--ops", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'height':>6} {'linear ms':>10} {'indexed ms':>10} {'speedup':>8}")
+    height = 16
+    while height <= args.max_height:
+        linear = min(replay(LinearStackModel, height, args.ops) for _ in range(args.repeat))
+        indexed = min(replay(StackModel, height, args.ops) for _ in range(args.repeat))
+        print(
+            f"{height:>6} {linear * 1000:>10.2f} {indexed * 1000:>10.2f} {linear / indexed:>8.2f}"
+        )
+        height *= 4
+
+    print()
+    print(f"{'args':>6} {'linear ms':>10} {'indexed ms':>10} {'speedup':>8}")
+    # much more than 12 arguments runs into StackTooDeep
+    for n_args in (1, 4, 8, 12):
+        source = make_contract(n_args)
+        linear, linear_asm = _time(source, LinearStackModel, args.repeat)
+        indexed, indexed_asm = _time(source, StackModel, args.repeat)
+        assert linear_asm == indexed_asm
+
+        print(
+            f"{n_args:>6} {linear * 1000:>10.2f} {indexed * 1000:>10.2f} {linear / indexed:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -773,6 +773,76 @@ def ix(i: uint256) -> address:
         c.ix(len(some_good_address) + 1)
 
 
+def test_constant_list_lookup_table(env, get_contract, tx_failed):
+    def lookup_gas(n):
+        table = [2**255 + i**3 for i in range(n)]
+        code = f"""
+TABLE: constant(uint256[{n}]) = {table}
+
+@external
+def ix(i: uint256) -> uint256:
+    return TABLE[i]
+        """
+        c = get_contract(code)
+        for i in (0, n // 2, n - 1):
+            assert c.ix(i) == table[i]
+        with tx_failed():
+            c.ix(n)
+
+        assert c.ix(3) == 2**255 + 27
+        return env.last_result.gas_used
+
+    # the table is read from code, the cost does not depend on its size
+    assert lookup_gas(4) == lookup_gas(512)
+
+
+def test_constant_list_in_constructor(get_contract, tx_failed):
+    code = """
+XS: constant(int128[4]) = [-1, 2, -3, 4]
+YS: constant(uint8[2][3]) = [[1, 2], [3, 4], [5, 6]]
+
+x: public(int128)
+y: public(uint8[2])
+
+@deploy
+def __init__(i: uint256):
+    self.x = XS[i]
+    self.y = YS[i]
+
+@external
+def foo(i: uint256, j: uint256) -> (int128, uint8, uint8[2]):
+    return XS[i], YS[i][j], YS[j]
+    """
+    c = get_contract(code, 2)
+    assert c.x() == -3
+    assert [c.y(0), c.y(1)] == [5, 6]
+    assert c.foo(2, 1) == (-3, 6, [3, 4])
+    assert c.foo(1, 0) == (2, 3, [1, 2])
+    with tx_failed():
+        c.foo(4, 0)
+    with tx_failed():
+        c.foo(0, 3)
+
+
+def test_constant_list_loop_variable(get_contract):
+    # loop variables are not modifiable either, but are not module constants
+    code = """
+ROWS: constant(uint256[2][2]) = [[5, 6], [7, 8]]
+
+@external
+def foo(i: uint256) -> uint256:
+    s: uint256 = 0
+    for row: uint256[2] in [[1, 2], [3, 4]]:
+        s += row[i]
+    for row: uint256[2] in ROWS:
+        s += row[i]
+    return s
+    """
+    c = get_contract(code)
+    assert c.foo(0) == 1 + 3 + 5 + 7
+    assert c.foo(1) == 2 + 4 + 6 + 8
+
+
 def test_list_index_complex_expr(get_contract, tx_failed):
     # test subscripts where the index is not a literal
     code = """
@@ -1,4 +1,8 @@
+import pytest
+from lark import UnexpectedInput
+
 from tests.venom_utils import assert_bb_eq, assert_ctx_eq
+from vyper.venom import parser
 from vyper.venom.basicblock import IRBasicBlock, IRLabel, IRLiteral, IRVariable
 from vyper.venom.context import DataItem, DataSection, IRContext
 from vyper.venom.function import IRFunction
@@ -400,3 +404,52 @@ def test_multi_output_last_var():
 
     g_fn = parsed_ctx.get_function(IRLabel("g"))
     assert g_fn.last_variable == 0
+
+
+def test_fast_lexer():
+    # comments, blank lines and whitespace before newlines, negative and
+    # hex literals, memory locations, keywords as labels and data
+    source = """
+    function main {  ; comment
+    main:
+        %1 = -5  // comment
+
+        %2 = 0x10 # comment
+        %x:1 = add %1, %2\r
+        %3 = add {@1, 32}, +7
+        jmp @"db"
+    "db":
+        invoke @data, %3
+        stop
+    }
+
+    function data {
+    data:
+        ret %1
+    }
+
+    data readonly {
+        dbsection readonly:
+            db x"ab_cd"
+            db @main
+    }
+    """
+    slow = parser._venom_parser("contextual").parse(source)
+    fast = parser._venom_parser("fast").parse(source)
+    assert_ctx_eq(fast, slow)
+
+
+def test_syntax_error():
+    source = """
+    function main {
+    main:
+        %1 = add 1, 0x1g
+    }
+    """
+    with pytest.raises(parser._LexerFallback):
+        parser._venom_parser("fast").parse(source)
+
+    # the error is reported by the contextual lexer
+    with pytest.raises(UnexpectedInput) as e:
+        parse_venom(source)
+    assert "line 4" in str(e.value)
@@ -69,3 +69,39 @@ def test_order_reversed():
     values = [i.value for i in node.get_descendants(vy_ast.Int, reverse=True)]
 
     assert values == [0, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+
+
+def test_type_filter_matches_isinstance():
+    node_types = [
+        vy_ast.Name,
+        vy_ast.Module,
+        vy_ast.ExprNode,
+        vy_ast.VyperNode,
+        (vy_ast.Int, vy_ast.Name),
+        (vy_ast.FunctionDef, vy_ast.Call, vy_ast.Return),
+    ]
+    for path in Path(".").glob("examples/**/*.vy"):
+        with path.open() as fp:
+            vyper_ast = vy_ast.parse_to_ast(fp.read())
+
+        for node in [vyper_ast, *vyper_ast.body]:
+            for node_type in node_types:
+                for include_self in (False, True):
+                    descendants = node.get_descendants(include_self=include_self)
+                    expected = [i for i in descendants if isinstance(i, node_type)]
+                    ret = node.get_descendants(node_type, include_self=include_self)
+                    assert ret == expected
+
+
+def test_new_descendant():
+    vyper_ast = vy_ast.parse_to_ast("[1, 2]")
+    node = vyper_ast.body[0].value
+
+    assert len(vyper_ast.get_descendants(vy_ast.Int)) == 2
+    assert len(node.get_descendants(vy_ast.Int)) == 2
+
+    new_node = vy_ast.Int(parent=node, value=3)
+
+    assert vyper_ast.get_descendants(vy_ast.Int)[-1] is new_node
+    assert node.get_descendants(vy_ast.Int)[-1] is new_node
+    assert len(vyper_ast.get_descendants()) == 5
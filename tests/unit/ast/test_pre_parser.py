@@ -232,6 +232,15 @@ def test_parse_venom_pragma(code):
     assert compiler_data.settings.experimental_codegen is True
 
 
+def test_parse_venom_pipeline_pragma():
+    code = """
+    #pragma venom-pipeline MakeSSA, [SCCP, AssignElimination], CSE
+    """
+    pre_parser = PreParser(is_interface=False)
+    pre_parser.parse(code)
+    assert pre_parser.settings.venom_pipeline == "MakeSSA, [SCCP, AssignElimination], CSE"
+
+
 invalid_pragmas = [
     # evm-versionnn
     """
@@ -268,6 +277,22 @@ invalid_pragmas = [
     #pragma venom-experimental
     #pragma venom-experimental
     """,
+    # unknown venom pass
+    """
+    #pragma venom-pipeline MakeSSA,Foo
+    """,
+    # unclosed fixed point group
+    """
+    #pragma venom-pipeline MakeSSA,[SCCP
+    """,
+    # passes which always run last
+    """
+    #pragma venom-pipeline SCCP,DFTPass
+    """,
+    """
+    #pragma venom-pipeline gas
+    #pragma venom-pipeline gas
+    """,
 ]
 
 
@@ -1,3 +1,4 @@
+import random
 import re
 
 import pytest
@@ -7,6 +8,7 @@ from vyper.cli.vyper_json import compile_json
 from vyper.compiler import compile_code
 from vyper.evm.opcodes import version_check
 from vyper.exceptions import StorageLayoutException
+from vyper.semantics.analysis.data_positions import OverridingStorageAllocator
 
 
 def test_storage_layout_overrides():
@@ -157,6 +159,75 @@ x: uint256[2]
         )
 
 
+def test_override_large_arrays():
+    # checking the layout does not depend on the size of the variables
+    code = """
+a: uint256[2**64]
+b: uint256
+c: uint256[2**64]
+    """
+
+    storage_layout_override = {
+        "a": {"slot": 2**64 + 1, "type": "uint256[18446744073709551616]", "n_slots": 2**64},
+        "b": {"slot": 2**64, "type": "uint256", "n_slots": 1},
+        "c": {"slot": 0, "type": "uint256[18446744073709551616]", "n_slots": 2**64},
+    }
+
+    out = compile_code(
+        code, output_formats=["layout"], storage_layout_override=json_input(storage_layout_override)
+    )
+    assert out["layout"]["storage_layout"] == storage_layout_override
+
+    storage_layout_override["b"]["slot"] = 2**64 + 5
+    with pytest.raises(
+        StorageLayoutException,
+        match=f"Storage collision! Tried to assign 'b' to slot {2**64 + 5}"
+        " but it has already been reserved by 'a'",
+    ):
+        compile_code(
+            code,
+            output_formats=["layout"],
+            storage_layout_override=json_input(storage_layout_override),
+        )
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_overriding_allocator(seed):
+    # check against reserving the slots one by one
+    rng = random.Random(seed)
+    allocator = OverridingStorageAllocator()
+    occupied: dict[int, str] = {}
+
+    for i in range(30):
+        first_slot = rng.randint(-2, 40) if i % 10 else 2**256 - rng.randint(1, 3)
+        n_slots = rng.randint(1, 6)
+        var_name = f"x{i}"
+
+        expected = None
+        for slot in range(first_slot, first_slot + n_slots):
+            if slot < 0 or slot >= 2**256:
+                expected = f"Invalid storage slot for var {var_name}, out of bounds: {slot}"
+                break
+            if slot in occupied:
+                expected = (
+                    f"Storage collision! Tried to assign '{var_name}' to slot {slot} but it "
+                    f"has already been reserved by '{occupied[slot]}'"
+                )
+                break
+
+        if expected is None:
+            allocator.reserve_slot_range(first_slot, n_slots, var_name)
+            for slot in range(first_slot, first_slot + n_slots):
+                occupied[slot] = var_name
+        else:
+            with pytest.raises(StorageLayoutException) as e:
+                allocator.reserve_slot_range(first_slot, n_slots, var_name)
+            assert e.value.message == expected
+
+        for slot in range(-1, 45):
+            assert allocator.get_var_name(slot) == occupied.get(slot)
+
+
 def test_override_nonreentrant_slot():
     code = """
 @nonreentrant
@@ -0,0 +1,76 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+# the CLI entry points should only import the compiler when they compile
+# something, and only import the parts of the compiler which are needed
+# for the requested outputs. these are modules which are expensive to
+# import and should be imported lazily.
+HEAVY_MODULES = (
+    "Crypto",
+    "vyper.ast",
+    "vyper.builtins",
+    "vyper.codegen",
+    "vyper.compiler.output",
+    "vyper.compiler.phases",
+    "vyper.ir",
+    "vyper.semantics",
+    "vyper.venom",
+)
+
+ENTRY_POINTS = (
+    "vyper",
+    "vyper.cli.vyper_compile",
+    "vyper.cli.vyper_json",
+    "vyper.cli.vyper_server",
+    "vyper.cli.venom_main",
+)
+
+
+def _run(code: str):
+    res = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(res.stdout)
+
+
+def _imported_modules(stmt: str) -> list[str]:
+    code = f"import json, sys\n{stmt}\nprint(json.dumps(list(sys.modules)))"
+    return _run(code)
+
+
+def _heavy(modules: list[str]) -> list[str]:
+    return [m for m in modules if m.split(".")[0] == "Crypto" or m.startswith(HEAVY_MODULES)]
+
+
+@pytest.mark.parametrize("entry_point", ENTRY_POINTS)
+def test_entry_point_imports_are_lazy(entry_point):
+    modules = _imported_modules(f"import {entry_point}")
+    assert _heavy(modules) == []
+
+
+def test_legacy_pipeline_does_not_import_venom():
+    stmt = """
+import vyper
+vyper.compile_code("x: public(uint256)", output_formats=["bytecode", "abi", "metadata"])
+"""
+    modules = _imported_modules(stmt)
+    assert "vyper.codegen.module" in modules
+    assert not any(m.startswith("vyper.venom") for m in modules)
+
+
+def _vyper_modules(modules: list[str]) -> list[str]:
+    return [m for m in modules if m.split(".")[0] == "vyper"]
+
+
+def test_import_budget():
+    # import time is dominated by the number of modules which get imported,
+    # so budget the modules imported by the CLI (which, unlike wall-clock
+    # time, does not depend on the load of the machine). the budget is
+    # relative to importing the entire compiler. (at the time of writing,
+    # the ratio is about 1/5).
+    cli_modules = _vyper_modules(_imported_modules("import vyper.cli.vyper_compile"))
+    full_modules = _vyper_modules(
+        _imported_modules("import vyper.cli.vyper_compile, vyper.compiler.output")
+    )
+    assert len(cli_modules) < len(full_modules) / 3
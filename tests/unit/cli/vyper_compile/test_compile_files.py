@@ -679,3 +679,63 @@ def baz() -> uint8:
             continue
         with pytest.raises(ValueError):
             compile_files([file], [f])
+
+
+PARALLEL_LIB = """
+@internal
+def foo() -> uint256:
+    return {n}
+"""
+
+PARALLEL_MAIN = """
+import lib{n} as lib
+
+@external
+def bar() -> uint256:
+    return lib.foo()
+"""
+
+
+def _make_parallel_project(make_file, n):
+    files = []
+    for i in range(n):
+        make_file(f"lib{i}.vy", PARALLEL_LIB.format(n=i))
+        files.append(str(make_file(f"main{i}.vy", PARALLEL_MAIN.format(n=i))))
+    return files
+
+
+def test_compile_files_parallel(make_file, chdir_tmp_path):
+    files = _make_parallel_project(make_file, 4)
+    formats = ["bytecode", "source_map", "metadata", "abi"]
+
+    sequential = compile_files(files, formats)
+    parallel = compile_files(files, formats, jobs=2)
+
+    # output ordering and source ids are stable
+    assert list(parallel.keys()) == list(sequential.keys())
+    assert parallel == sequential
+
+
+def test_compile_files_parallel_warnings(make_file, chdir_tmp_path):
+    files = _make_parallel_project(make_file, 2)
+    files.append(str(make_file("enum.vy", "enum Foo:\n    A\n")))
+
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        compile_files(files, ["bytecode"], jobs=2)
+
+    assert len(w) == 1
+    assert str(w[0].message).startswith("enum will be deprecated")
+
+
+def test_compile_files_parallel_error(make_file, chdir_tmp_path):
+    files = _make_parallel_project(make_file, 2)
+    # type error, import resolution succeeds
+    files.insert(1, str(make_file("bad.vy", "@external\ndef foo() -> uint256:\n    return -1\n")))
+    # missing import, import resolution fails
+    files.append(str(make_file("bad2.vy", "import missing\n")))
+
+    with pytest.raises(TypeMismatch):
+        compile_files(files[:-1], ["bytecode"], jobs=2)
+    with pytest.raises(TypeMismatch):
+        compile_files(files, ["bytecode"], jobs=2)
@@ -315,6 +315,22 @@ def test_exc_handler_to_dict_compiler(input_json):
     assert error["type"] == "TypeMismatch"
 
 
+def test_compile_json_parallel(input_json):
+    sequential = compile_json(input_json)
+    parallel = compile_json(input_json, jobs=2)
+
+    assert parallel == sequential
+
+
+@pytest.mark.parametrize("bad_code", [BAD_SYNTAX_CODE, BAD_COMPILER_CODE])
+def test_exc_handler_to_dict_parallel(input_json, bad_code):
+    input_json["sources"]["badcode.vy"] = {"content": bad_code}
+    sequential = compile_json(input_json, exc_handler_to_dict)
+    parallel = compile_json(input_json, exc_handler_to_dict, jobs=2)
+
+    assert parallel == sequential
+
+
 def test_unknown_storage_layout_overrides(input_json):
     unknown_contract_path = "contracts/baz.vy"
     input_json["storage_layout_overrides"] = {
@@ -3,7 +3,7 @@ from pathlib import PurePath
 import pytest
 
 from vyper import compiler
-from vyper.cli.vyper_json import TRANSLATE_MAP, VENOM_KEYS, get_output_formats
+from vyper.cli.vyper_json import OPT_IN_KEYS, TRANSLATE_MAP, VENOM_KEYS, get_output_formats
 from vyper.exceptions import JSONError
 
 
@@ -54,7 +54,7 @@ def test_star():
         "sources": {"foo.vy": "", "bar.vy": ""},
         "settings": {"outputSelection": {"*": ["*"]}},
     }
-    translate_map = set(TRANSLATE_MAP.values())
+    translate_map = set(TRANSLATE_MAP.values()) - set(OPT_IN_KEYS)
     # if the venom flag is not present
     for k in VENOM_KEYS:
         translate_map.remove(k)
@@ -69,7 +69,7 @@ def test_star_with_venom_flag():
         "sources": {"foo.vy": "", "bar.vy": ""},
         "settings": {"venomExperimental": True, "outputSelection": {"*": ["*"]}},
     }
-    translate_map = set(TRANSLATE_MAP.values())
+    translate_map = set(TRANSLATE_MAP.values()) - set(OPT_IN_KEYS)
     expected = sorted(translate_map)
     result = get_output_formats(input_json)
     assert result == {PurePath("foo.vy"): expected, PurePath("bar.vy"): expected}
@@ -0,0 +1,153 @@
+import io
+import json
+import socket
+import threading
+import time
+
+from vyper.cli.vyper_json import compile_json, exc_handler_to_dict
+from vyper.cli.vyper_server import CompilerServer, serve_stream, serve_unix_socket
+
+LIBRARY_CODE = """
+@internal
+def foo() -> uint256:
+    return 1
+"""
+
+FOO_CODE = """
+import lib
+
+@external
+def foo() -> uint256:
+    return lib.foo()
+"""
+
+BAR_CODE = """
+import lib
+
+@external
+def bar() -> uint256:
+    return lib.foo() + 1
+"""
+
+
+def _request(output_selection, lib_code=LIBRARY_CODE):
+    return {
+        "language": "Vyper",
+        "sources": {
+            "lib.vy": {"content": lib_code},
+            "foo.vy": {"content": FOO_CODE},
+            "bar.vy": {"content": BAR_CODE},
+        },
+        "settings": {"outputSelection": output_selection},
+    }
+
+
+def _expected(input_dict):
+    # roundtrip through json, like a client would see it
+    return json.loads(json.dumps(compile_json(input_dict, exc_handler_to_dict), default=str))
+
+
+def test_server_stream():
+    requests = [
+        _request({"foo.vy": ["abi", "evm.bytecode"]}),
+        _request({"bar.vy": ["abi", "evm.bytecode"]}),
+        _request({"*": ["abi", "evm.bytecode"]}),
+        _request({"foo.vy": ["abi", "evm.bytecode"]}, lib_code=LIBRARY_CODE.replace("1", "2")),
+    ]
+    in_stream = io.StringIO("".join(json.dumps(r) + "\n\n" for r in requests))
+    out_stream = io.StringIO()
+
+    serve_stream(CompilerServer(), in_stream, out_stream)
+
+    responses = out_stream.getvalue().splitlines()
+    assert len(responses) == len(requests)
+    for request, response in zip(requests, responses):
+        assert json.loads(response) == _expected(request)
+
+    # the library was changed in the last request
+    first, last = (json.loads(responses[i])["contracts"]["foo.vy"] for i in (0, 3))
+    assert first["foo"]["evm"]["bytecode"] != last["foo"]["evm"]["bytecode"]
+
+
+def test_server_reuses_outputs():
+    server = CompilerServer()
+    request = json.dumps(_request({"*": ["abi"]}))
+
+    response = server.handle_request(request)
+    assert server.handle_request(request) is response
+
+
+def test_server_reuses_modules():
+    server = CompilerServer()
+    server.handle_request(json.dumps(_request({"foo.vy": ["abi"]})))
+    server.handle_request(json.dumps(_request({"bar.vy": ["abi"]})))
+
+    # same sources, so same module cache
+    (module_cache,) = server.session._module_caches.values()
+    # lib.vy gets source id 1 in both requests
+    assert len(module_cache._modules) == 1
+
+
+def test_server_reuses_modules_of_unchanged_files():
+    server = CompilerServer()
+    request = _request({"foo.vy": ["abi", "evm.bytecode"]})
+    server.handle_request(json.dumps(request))
+
+    (module_cache,) = server.session._module_caches.values()
+    (lib_entry,) = module_cache._modules.values()
+
+    # edit the top-level file, the library is reused
+    request["sources"]["foo.vy"]["content"] = FOO_CODE.replace("lib.foo()", "lib.foo() + 2")
+    response = json.loads(server.handle_request(json.dumps(request)))
+    assert response == _expected(request)
+    assert list(server.session._module_caches.values()) == [module_cache]
+    assert list(module_cache._modules.values()) == [lib_entry]
+
+    # edit the library, it gets parsed and analyzed again
+    request = _request({"foo.vy": ["abi", "evm.bytecode"]}, lib_code=LIBRARY_CODE.replace("1", "3"))
+    response = json.loads(server.handle_request(json.dumps(request)))
+    assert response == _expected(request)
+    assert len(module_cache._modules) == 2
+
+
+def test_server_errors():
+    server = CompilerServer()
+    bad_request = _request({"foo.vy": ["abi"]}, lib_code="x: uint256 = 1")
+
+    response = json.loads(server.handle_request(json.dumps(bad_request)))
+    assert response == _expected(bad_request)
+    assert response["errors"][0]["severity"] == "error"
+
+    # errors don't get memoized
+    assert len(server._outputs) == 0
+
+    # the server keeps going
+    response = json.loads(server.handle_request("not json"))
+    assert response["errors"][0]["type"] == "JSONError"
+
+    good_request = _request({"foo.vy": ["abi"]})
+    response = json.loads(server.handle_request(json.dumps(good_request)))
+    assert response == _expected(good_request)
+
+
+def test_server_unix_socket(tmp_path):
+    socket_path = str(tmp_path / "vyper.sock")
+    server = CompilerServer()
+    t = threading.Thread(target=serve_unix_socket, args=(server, socket_path), daemon=True)
+    t.start()
+
+    for _ in range(100):
+        try:
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(socket_path)
+            break
+        except (FileNotFoundError, ConnectionRefusedError):
+            client.close()
+            time.sleep(0.05)
+
+    request = _request({"*": ["abi"]})
+    with client, client.makefile("rw") as f:
+        for _ in range(2):
+            f.write(json.dumps(request) + "\n")
+            f.flush()
+            assert json.loads(f.readline()) == _expected(request)
@@ -3,8 +3,14 @@ import pytest
 from vyper.compiler import compile_code
 from vyper.compiler.phases import CompilerData
 from vyper.compiler.settings import OptimizationLevel, Settings
-from vyper.evm.assembler.instructions import PUSHLABEL, Label
-from vyper.evm.assembler.optimizer import _merge_jumpdests
+from vyper.evm.assembler.instructions import DATA_ITEM, PUSH_OFST, PUSHLABEL, DataHeader, Label
+from vyper.evm.assembler.optimizer import (
+    DEFAULT_RULES,
+    PeepholeOptimizer,
+    PeepholeRule,
+    _merge_jumpdests,
+    optimize_assembly,
+)
 
 codes = [
     """
@@ -131,5 +137,141 @@ def foo():
 
 def test_merge_jumpdests():
     asm = [PUSHLABEL(Label("label_0")), "JUMP", "PUSH0", Label("label_0"), Label("_label_0")]
+    opt = PeepholeOptimizer(asm, DEFAULT_RULES)
 
-    assert _merge_jumpdests(asm) is False, "should not return True as no changes were made"
+    # jumps to label_0 are forwarded to _label_0
+    assert _merge_jumpdests(opt, 3) is True
+    assert opt.items[0] == PUSHLABEL(Label("_label_0"))
+
+
+def test_merge_jumpdests_unused_label():
+    # label_0 is not used by any PUSHLABEL
+    asm = [Label("label_0"), Label("_label_0"), PUSHLABEL(Label("_label_0")), "JUMP"]
+    opt = PeepholeOptimizer(asm, DEFAULT_RULES)
+
+    assert _merge_jumpdests(opt, 0) is False, "should not return True as no changes were made"
+
+
+def _optimize(asm):
+    asm = list(asm)
+    optimize_assembly(asm)
+    return asm
+
+
+def test_prune_unreachable_code():
+    asm = ["STOP", "PUSH1", 1, "POP", Label("a"), "JUMP", "ADD", DataHeader(Label("data"))]
+    asm.insert(0, PUSHLABEL(Label("a")))
+    assert _optimize(asm)[:4] == [PUSHLABEL(Label("a")), "STOP", Label("a"), "JUMP"]
+
+
+def test_jump_chains():
+    # jumps to `a` and `b` are forwarded to `c`, and the unused labels
+    # and unreachable code are removed
+    asm = [
+        PUSHLABEL(Label("a")),
+        "JUMPI",
+        PUSHLABEL(Label("b")),
+        "JUMP",
+        Label("b"),
+        PUSHLABEL(Label("c")),
+        "JUMP",
+        Label("a"),
+        Label("c"),
+        "STOP",
+    ]
+    assert _optimize(asm) == [PUSHLABEL(Label("c")), "JUMPI", Label("c"), "STOP"]
+
+
+def test_optimize_inefficient_jumps():
+    asm = [
+        PUSHLABEL(Label("a")),
+        "JUMPI",
+        PUSHLABEL(Label("b")),
+        "JUMP",
+        Label("a"),
+        "STOP",
+        Label("b"),
+        "INVALID",
+    ]
+    assert _optimize(asm) == [
+        "ISZERO",
+        PUSHLABEL(Label("b")),
+        "JUMPI",
+        "STOP",
+        Label("b"),
+        "INVALID",
+    ]
+
+
+def test_labels_referenced_from_data_are_kept():
+    asm = [
+        Label("a"),
+        PUSH_OFST(Label("b"), 1),
+        "STOP",
+        Label("b"),
+        "STOP",
+        DataHeader(Label("data")),
+        DATA_ITEM(Label("a")),
+    ]
+    assert _optimize(asm) == asm
+
+
+def test_stack_peephole_opts():
+    asm = ["DUP1", "SWAP2", "SWAP1", "SWAP3", "SWAP3", "SWAP1", "ADD", "DUP1", "SWAP1", "POP"]
+    assert _optimize(asm) == ["SWAP1", "DUP2", "ADD"]
+    assert _optimize(["ISZERO", "ISZERO", "ISZERO", "STOP"]) == ["ISZERO", "STOP"]
+
+
+def test_custom_rules():
+    def drop_nops(opt, node):
+        opt.delete(node)
+        return True
+
+    rule = PeepholeRule("drop_nops", ("JUMPDEST",), drop_nops, window=1)
+    asm = ["JUMPDEST", "PUSH0", "JUMPDEST", "STOP"]
+    optimize_assembly(asm, rules=(rule,))
+    assert asm == ["PUSH0", "STOP"]
+
+
+def _chain_of_blocks(n):
+    # `n` blocks of stack juggling, each jumping to the next one through
+    # an intermediate label
+    asm = []
+    for i in range(n):
+        asm.extend(
+            [
+                Label(f"block_{i}"),
+                "DUP1",
+                "SWAP1",
+                "POP",
+                "ISZERO",
+                "ISZERO",
+                PUSHLABEL(Label(f"block_{i + 1}")),
+                "JUMPI",
+                PUSHLABEL(Label(f"via_{i}")),
+                "JUMP",
+                "PUSH0",
+                Label(f"via_{i}"),
+                PUSHLABEL(Label(f"block_{i + 1}")),
+                "JUMP",
+            ]
+        )
+    asm.extend([Label(f"block_{n}"), "STOP"])
+    return asm
+
+
+def test_optimizer_work_is_linear():
+    # the number of items visited by the optimizer grows linearly with the
+    # size of the assembly
+    ratios = []
+    for n in (10, 100, 1000):
+        asm = _chain_of_blocks(n)
+        opt = PeepholeOptimizer(asm, DEFAULT_RULES)
+        opt.run()
+        ratios.append(opt.visits / len(asm))
+
+        # the stack juggling and the intermediate jumps are removed
+        assert "SWAP1" not in opt.result()
+        assert Label("via_0") not in opt.result()
+
+    assert max(ratios) < 1.5 * min(ratios)
@@ -0,0 +1,92 @@
+import pytest
+
+from vyper.compiler import compile_code
+from vyper.evm.assembler.core import assembly_to_evm
+from vyper.evm.assembler.instructions import DATA_ITEM, PUSH_OFST, PUSHLABEL, DataHeader, Label
+from vyper.evm.assembler.symbols import resolve_symbols
+from vyper.evm.opcodes import get_opcodes
+
+JUMP = 0x56
+JUMPDEST = 0x5B
+STOP = 0x00
+
+
+def test_small_label_push():
+    asm = [PUSHLABEL(Label("a")), "JUMP", Label("a"), "STOP"]
+    bytecode, _ = assembly_to_evm(asm)
+    # PUSH1 0x03 JUMP JUMPDEST STOP
+    assert bytecode == bytes([0x60, 0x03, JUMP, JUMPDEST, STOP])
+
+
+def test_label_push0():
+    # a jump to pc 0 uses PUSH0 (available since shanghai)
+    asm = [Label("a"), PUSHLABEL(Label("a")), "JUMP"]
+    bytecode, _ = assembly_to_evm(asm)
+    assert bytecode == bytes([JUMPDEST, 0x5F, JUMP])
+
+
+def test_large_label_push():
+    asm = [PUSHLABEL(Label("a")), "JUMP"] + ["STOP"] * 300 + [Label("a"), "STOP"]
+    bytecode, _ = assembly_to_evm(asm)
+    # PUSH2 0x0130
+    assert bytecode[:3] == bytes([0x61, 0x01, 0x30])
+    assert bytecode[0x130] == JUMPDEST
+
+
+def test_push_ofst_label():
+    asm = [PUSH_OFST(Label("data"), 1), "STOP", DataHeader(Label("data")), DATA_ITEM(b"\x01\x02")]
+    bytecode, _ = assembly_to_evm(asm)
+    # PUSH1 (0x03 + 1) STOP 0x01 0x02
+    assert bytecode == bytes([0x60, 0x04, STOP, 0x01, 0x02])
+
+
+def test_data_item_label_width():
+    # labels in data sections (e.g. jumptables) keep a fixed width
+    asm = [Label("a"), "STOP", DataHeader(Label("data")), DATA_ITEM(Label("a"))]
+    bytecode, _ = assembly_to_evm(asm)
+    assert bytecode == bytes([JUMPDEST, STOP, 0x00, 0x00])
+
+
+@pytest.mark.parametrize("padding", range(245, 260))
+def test_relaxation_converges(padding):
+    # labels around the PUSH1/PUSH2 boundary, where growing one push moves
+    # other labels across the boundary
+    asm = []
+    for i in range(8):
+        asm.extend([PUSHLABEL(Label(f"l{i}")), "POP"])
+    asm.extend(["STOP"] * padding)
+    for i in range(8):
+        asm.extend([Label(f"l{i}"), "STOP"])
+
+    bytecode, _ = assembly_to_evm(asm)
+    symbol_map, _, _ = resolve_symbols(asm)
+    pc = 0
+    for i in range(8):
+        value = symbol_map[Label(f"l{i}")]
+        width = 1 if value < 256 else 2
+        assert bytecode[pc] == 0x5F + width
+        assert int.from_bytes(bytecode[pc + 1 : pc + 1 + width], "big") == value
+        assert bytecode[value] == JUMPDEST
+        pc += width + 2  # PUSH POP
+
+
+def test_source_map_pcs(experimental_codegen):
+    code = """
+@internal
+def _bar(a: uint256) -> uint256:
+    return a * 2
+
+@external
+def foo(a: uint256) -> uint256:
+    assert a > 1, "too small"
+    return self._bar(a)
+    """
+    out = compile_code(code, output_formats=["bytecode_runtime", "source_map_runtime"])
+    bytecode = bytes.fromhex(out["bytecode_runtime"].removeprefix("0x"))
+    source_map = out["source_map_runtime"]
+
+    opcodes = get_opcodes()
+    jump_opcodes = {opcodes[op][0] for op in ("JUMP", "JUMPI", "JUMPDEST")}
+    for pc in source_map["pc_jump_map"]:
+        if pc != 0:
+            assert bytecode[pc] in jump_opcodes
@@ -1,5 +1,6 @@
 import pytest
 
+from vyper import ast as vy_ast
 from vyper.codegen.ir_node import IRnode
 from vyper.evm.opcodes import version_check
 from vyper.ir import compile_ir
@@ -75,3 +76,63 @@ def test_pc_debugger():
         offset = 5
 
     assert line_number_map["pc_breakpoints"][0] == offset
+
+
+def _ir_attributes(ir):
+    # the attributes of every node in the tree, by node identity
+    ret = {}
+    for node in [ir] + [n for arg in ir.args for n in _walk(arg)]:
+        ret[id(node)] = (
+            node.value,
+            [id(arg) for arg in node.args],
+            node.typ,
+            node.location,
+            node.ast_source,
+            node.error_msg,
+            node.annotation,
+            node.encoding,
+            node.valency,
+        )
+    return ret
+
+
+def _walk(ir):
+    yield ir
+    for arg in ir.args:
+        yield from _walk(arg)
+
+
+def test_compile_to_assembly_does_not_mutate_ir():
+    untouched = ["seq", ["mstore", 0, 32], ["mstore", 32, 64]]
+    # (any ast node will do)
+    ast_source = vy_ast.parse_to_ast("x: uint256").body[0]
+    cleanup = IRnode.from_list(
+        ["label", "bar", ["var_list", "return_buffer"], ["exit_to", "_sym_cleanup", ["mload", 64]]]
+    )
+    cleanup.args[2].ast_source = ast_source
+    ir = IRnode.from_list(
+        [
+            "seq",
+            untouched,
+            ["label", "foo", ["var_list", "return_pc"], ["exit_to", "return_pc"]],
+            cleanup,
+            ["return", "ret_ofst", "ret_len"],
+        ]
+    )
+    before = str(ir)
+    attributes = _ir_attributes(ir)
+
+    rewritten = compile_ir._rewrite_return_sequences(ir)
+    # subtrees without return sequences are shared with the original
+    assert rewritten.args[0] is ir.args[0]
+    assert rewritten.args[1].args[2].value == "jump"
+    assert rewritten.args[3].args[0].value == "pass"
+    # the arguments of the cleanup jump get the ast_source of the exit_to
+    goto = rewritten.args[2].args[2].args[-1]
+    assert goto.value == "goto"
+    assert goto.args[1].ast_source is ast_source
+    assert _ir_attributes(ir) == attributes
+
+    compile_ir.compile_to_assembly(ir)
+    assert str(ir) == before
+    assert _ir_attributes(ir) == attributes
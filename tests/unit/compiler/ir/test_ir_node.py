@@ -0,0 +1,38 @@
+import copy
+
+from vyper.codegen.ir_node import IRnode
+
+
+def test_gas_computed_on_demand():
+    ir = IRnode.from_list(["seq", ["mstore", 0, 1], ["sstore", 0, 1]])
+    assert ir._gas is None
+    # seq + mstore + sstore (with its dynamic cost) + 4 int literals
+    assert ir.gas == 30 + (3 + 2 * (0 - 2)) + (20000 + 2 * (0 - 2) + 15000) + 4 * 5
+
+    ir.add_gas_estimate = 7
+    assert ir.gas == 30 + (3 + 2 * (0 - 2)) + (20000 + 2 * (0 - 2) + 15000) + 4 * 5 + 7
+
+
+def test_passthrough_metadata_allocated_on_demand():
+    ir = IRnode.from_list(["seq"])
+    assert ir._passthrough_metadata is None
+
+    ir.passthrough_metadata["foo"] = 1
+    assert ir.passthrough_metadata == {"foo": 1}
+
+
+def test_copies():
+    ir = IRnode.from_list(["add", 1, "x"], annotation="foo")
+    ir.args[1]._referenced_variables = {"x"}
+    assert ir.referenced_variables == {"x"}
+
+    ir2 = copy.deepcopy(ir)
+    assert ir2 == ir and ir2.args[0] is not ir.args[0]
+    assert ir2.annotation == "foo"
+    assert ir2.args[1]._referenced_variables == {"x"}
+
+    ir3 = ir.copy_with(args=[ir.args[0], IRnode.from_list("y")])
+    assert ir3.args[0] is ir.args[0]
+    assert ir3.annotation == "foo"
+    # cached properties are not copied over
+    assert ir3.referenced_variables == set()
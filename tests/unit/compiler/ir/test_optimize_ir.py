@@ -378,3 +378,45 @@ def test_mload_merge(ir, evm_version):
         assert optimized == expected
     else:
         pytest.skip("no mcopy available")
+
+
+def test_shared_subtrees_optimized_once(monkeypatch):
+    shared = IRnode.from_list(["seq", ["mstore", 0, ["add", 1, 2]], ["return", 0, 32]])
+    deploy = IRnode.from_list(["deploy", 0, shared, 0])
+
+    calls = 0
+    optimize_r = optimizer._optimize_r
+
+    def counting_optimize_r(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return optimize_r(*args, **kwargs)
+
+    monkeypatch.setattr(optimizer, "_optimize_r", counting_optimize_r)
+
+    cache: dict = {}
+    optimized_deploy = optimizer.optimize(deploy, cache)
+    n_calls = calls
+    optimized_shared = optimizer.optimize(shared, cache)
+    # served entirely from the cache
+    assert calls == n_calls
+
+    expected = IRnode.from_list(["seq", ["mstore", 0, 3], ["return", 0, 32]])
+    assert optimized_shared == expected
+    assert optimized_deploy.args[1] == expected
+    # each occurrence of the shared subtree gets its own root
+    assert optimized_shared is not optimized_deploy.args[1]
+
+
+@pytest.mark.parametrize("first", ["mstore", "if"])
+def test_shared_subtree_optimized_against_parent(first):
+    # `(seq x)` is optimized to `x`, which depends on the parent of the seq
+    shared = IRnode.from_list(["seq", ["eq", "x", "y"]])
+    uses = {"mstore": ["mstore", 0, shared], "if": ["if", shared, ["stop"]]}
+    second = "if" if first == "mstore" else "mstore"
+    ir = IRnode.from_list(["seq", uses[first], uses[second]])
+
+    optimized = {arg.value: arg for arg in optimizer.optimize(ir).args}
+
+    assert optimized["mstore"] == IRnode.from_list(["mstore", 0, ["eq", "x", "y"]])
+    assert optimized["if"] == IRnode.from_list(["if", ["iszero", ["xor", "x", "y"]], ["stop"]])
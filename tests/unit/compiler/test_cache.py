@@ -0,0 +1,177 @@
+import json
+import warnings
+from pathlib import Path
+
+import pytest
+
+from vyper.cli.vyper_compile import compile_files
+from vyper.cli.vyper_json import compile_json
+from vyper.compiler.cache import CacheEntry, CompilationCache, replay_warnings
+from vyper.compiler.settings import OptimizationLevel, Settings
+from vyper.warnings import Deprecation
+
+LIBRARY_CODE = """
+@internal
+def foo() -> uint256:
+    return 1
+"""
+
+CONTRACT_CODE = """
+import lib
+
+x: public(uint256)
+
+@external
+def bar() -> uint256:
+    return lib.foo()
+"""
+
+EXPECTED_WARNING = "enum will be deprecated in a future release, use flag instead"
+
+FORMATS = ["bytecode", "bytecode_runtime", "abi", "source_map", "layout"]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CompilationCache(tmp_path / "cache")
+
+
+def test_cache_hit(chdir_tmp_path, make_file, cache):
+    make_file("lib.vy", LIBRARY_CODE)
+    make_file("contract.vy", CONTRACT_CODE)
+
+    out1 = compile_files(["contract.vy"], FORMATS, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    out2 = compile_files(["contract.vy"], FORMATS, cache=cache)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    assert out1 == out2
+    assert out1 == compile_files(["contract.vy"], FORMATS)
+
+
+def test_cache_invalidated_by_import(chdir_tmp_path, make_file, cache):
+    make_file("lib.vy", LIBRARY_CODE)
+    make_file("contract.vy", CONTRACT_CODE)
+
+    out1 = compile_files(["contract.vy"], FORMATS, cache=cache)
+
+    # change a dependency, not the compilation target
+    make_file("lib.vy", LIBRARY_CODE.replace("return 1", "return 2"))
+    out2 = compile_files(["contract.vy"], FORMATS, cache=cache)
+
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert out1[Path("contract.vy")]["bytecode"] != out2[Path("contract.vy")]["bytecode"]
+
+
+def test_cache_keyed_by_settings(chdir_tmp_path, make_file, cache):
+    make_file("lib.vy", LIBRARY_CODE)
+    make_file("contract.vy", CONTRACT_CODE)
+
+    settings = Settings(optimize=OptimizationLevel.CODESIZE)
+    compile_files(["contract.vy"], FORMATS, cache=cache)
+    compile_files(["contract.vy"], FORMATS, settings=settings, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    # also keyed by output formats
+    compile_files(["contract.vy"], ["bytecode"], cache=cache)
+    assert (cache.hits, cache.misses) == (0, 3)
+
+
+def test_cache_replays_warnings(chdir_tmp_path, make_file, cache):
+    code = """
+enum Foo:
+    A
+    """
+    make_file("contract.vy", code)
+
+    messages = []
+    for _ in range(2):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            compile_files(["contract.vy"], ["bytecode"], cache=cache)
+        assert len(w) == 1
+        assert str(w[0].message).startswith(EXPECTED_WARNING)
+        messages.append(str(w[0].message))
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert messages[0] == messages[1]
+
+
+def test_cache_uncacheable_formats(chdir_tmp_path, make_file, cache):
+    make_file("contract.vy", CONTRACT_CODE)
+    make_file("lib.vy", LIBRARY_CODE)
+
+    compile_files(["contract.vy"], ["ir"], cache=cache)
+    compile_files(["contract.vy"], ["ir"], cache=cache)
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_cache_lru_eviction(tmp_path):
+    cache = CompilationCache(tmp_path, max_size=2000)
+    payload = {"bytecode": "0x" + "00" * 400}
+
+    cache.put("a", CacheEntry(payload))
+    cache.put("b", CacheEntry(payload))
+    # touch "a", so that "b" is the least recently used entry
+    assert cache.get("a") is not None
+    cache.put("c", CacheEntry(payload))
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_cache_corrupted_entry(tmp_path):
+    cache = CompilationCache(tmp_path)
+    cache.put("a", CacheEntry({"bytecode": "0x"}))
+    (tmp_path / "a.json").write_bytes(b"garbage")
+
+    assert cache.get("a") is None
+    assert not (tmp_path / "a.json").exists()
+
+
+def test_cache_entry_roundtrip(tmp_path):
+    cache = CompilationCache(tmp_path)
+    outputs = {
+        "source_map": {"pc_pos_map": {0: (1, 2, 3, 4)}, "keys": ("source_id", "node_id")},
+        "abi": [{"__tuple__": [1]}, {"__dict__": 2}],
+        "nested": {(1, "a"): [(), {}]},
+    }
+    entry = CacheEntry(outputs, [("EnumUsage", "enum will be deprecated")])
+    cache.put("a", entry)
+
+    # entries are plain json
+    json.loads((tmp_path / "a.json").read_text())
+    assert cache.get("a") == entry
+
+
+def test_cache_unserializable_entry(tmp_path):
+    cache = CompilationCache(tmp_path)
+    cache.put("a", CacheEntry({"bytecode": b"\x00"}))
+    cache.put("b", CacheEntry({"layout": {"x": {1, 2}}}))
+
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+
+
+def test_cache_replays_unknown_warning_category(tmp_path):
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        replay_warnings([("Deprecation", "foo"), ("SomethingElse", "bar")])
+
+    assert [(x.category, str(x.message)) for x in w] == [(Deprecation, "foo"), (UserWarning, "bar")]
+
+
+def test_cache_standard_json(cache):
+    input_json = {
+        "language": "Vyper",
+        "sources": {"lib.vy": {"content": LIBRARY_CODE}, "contract.vy": {"content": CONTRACT_CODE}},
+        "settings": {"outputSelection": {"contract.vy": ["abi", "evm.bytecode"]}},
+    }
+    out1 = compile_json(input_json, cache=cache)
+    out2 = compile_json(input_json, cache=cache)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert out1 == out2
+    assert out1 == compile_json(input_json)
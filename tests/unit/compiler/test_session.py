@@ -0,0 +1,233 @@
+import warnings
+from pathlib import Path
+
+import pytest
+
+from vyper.compiler import compile_from_file_input
+from vyper.compiler.input_bundle import FilesystemInputBundle
+from vyper.compiler.session import BuildSession
+from vyper.exceptions import TypeMismatch
+
+LIBRARY_CODE = """
+counter: public(uint256)
+
+@internal
+@nonreentrant
+def increment() -> uint256:
+    self.counter += 1
+    return self.counter
+
+@internal
+def foo() -> uint256:
+    return 1
+"""
+
+TOKEN_CODE = """
+import lib
+
+initializes: lib
+
+x: public(uint256)
+
+@external
+def bar() -> uint256:
+    self.x = lib.increment()
+    return self.x
+
+exports: lib.counter
+"""
+
+# the library gets allocated at a different storage slot than in TOKEN_CODE
+VAULT_CODE = """
+import lib
+
+a: uint256
+b: HashMap[address, uint256]
+
+initializes: lib
+
+@external
+def deposit() -> uint256:
+    self.a += lib.foo()
+    return lib.increment()
+
+@external
+@nonreentrant
+def withdraw():
+    self.b[msg.sender] = self.a
+"""
+
+USER_CODE = """
+import lib
+
+uses: lib
+
+y: uint256
+
+@internal
+def read() -> uint256:
+    self.y = lib.counter
+    return self.y
+"""
+
+APP_CODE = """
+import lib
+import user
+
+initializes: user[lib := lib]
+initializes: lib
+
+@external
+def read() -> uint256:
+    return user.read()
+"""
+
+DEPRECATED_LIB_CODE = """
+enum Foo:
+    A
+
+@internal
+def foo() -> Foo:
+    return Foo.A
+"""
+
+BAD_CODE = """
+import lib
+
+@external
+def foo() -> uint256:
+    return lib.foo() + 1.0
+"""
+
+FORMATS = ["bytecode", "bytecode_runtime", "abi", "layout", "metadata", "method_identifiers"]
+
+
+def _compile_targets(tmp_path, targets, session):
+    # compile targets with one input bundle, like `vyper a.vy b.vy` does
+    input_bundle = FilesystemInputBundle([tmp_path])
+    ret = {}
+    for name in targets:
+        file_input = input_bundle.load_file(tmp_path / name)
+        ret[name] = compile_from_file_input(
+            file_input, input_bundle=input_bundle, output_formats=FORMATS, session=session
+        )
+    return ret
+
+
+def test_session_equivalent_output(tmp_path, make_file):
+    make_file("lib.vy", LIBRARY_CODE)
+    make_file("token.vy", TOKEN_CODE)
+    make_file("vault.vy", VAULT_CODE)
+    make_file("user.vy", USER_CODE)
+    make_file("app.vy", APP_CODE)
+
+    targets = ["token.vy", "app.vy", "vault.vy", "token.vy"]
+    expected = _compile_targets(tmp_path, targets, session=None)
+    assert _compile_targets(tmp_path, targets, session=BuildSession()) == expected
+
+    # sanity check: the library is at different storage slots
+    token_layout = expected["token.vy"]["layout"]["storage_layout"]
+    vault_layout = expected["vault.vy"]["layout"]["storage_layout"]
+    assert token_layout["lib"]["counter"] != vault_layout["lib"]["counter"]
+
+
+def test_session_reuses_modules(tmp_path, make_file):
+    make_file("lib.vy", LIBRARY_CODE)
+    make_file("token.vy", TOKEN_CODE)
+    make_file("vault.vy", VAULT_CODE)
+
+    session = BuildSession()
+    input_bundle = FilesystemInputBundle([tmp_path])
+
+    lib_asts = []
+    for name in ("token.vy", "vault.vy"):
+        file_input = input_bundle.load_file(tmp_path / name)
+        compile_from_file_input(file_input, input_bundle=input_bundle, session=session)
+
+        (module_cache,) = session._module_caches.values()
+        (entry,) = module_cache._modules.values()
+        lib_asts.append(entry.module)
+
+    assert lib_asts[0] is lib_asts[1]
+
+
+def test_session_invalidates_importers(tmp_path, make_file):
+    make_file("lib2.vy", "@internal\ndef bar() -> uint256:\n    return 1\n")
+    make_file("lib.vy", "import lib2\n\n@internal\ndef foo() -> uint256:\n    return lib2.bar()\n")
+    make_file("main.vy", "import lib\n\n@external\ndef foo() -> uint256:\n    return lib.foo()\n")
+
+    session = BuildSession()
+
+    def compile_main():
+        input_bundle = FilesystemInputBundle([tmp_path])
+        file_input = input_bundle.load_file(tmp_path / "main.vy")
+        out = compile_from_file_input(
+            file_input, input_bundle=input_bundle, output_formats=FORMATS, session=session
+        )
+        assert out == compile_from_file_input(
+            file_input, input_bundle=input_bundle, output_formats=FORMATS
+        )
+        (module_cache,) = session._module_caches.values()
+        return list(module_cache._modules.values())
+
+    entries = compile_main()
+    assert len(entries) == 2
+    assert compile_main() == entries
+
+    # lib2 changed, so lib has to be redone as well
+    make_file("lib2.vy", "@internal\ndef bar() -> uint256:\n    return 2\n")
+    assert compile_main()[:2] == entries
+    assert len(compile_main()) == 4
+
+
+def test_session_max_module_age(tmp_path, make_file):
+    make_file("lib.vy", LIBRARY_CODE)
+    make_file("lib2.vy", LIBRARY_CODE)
+    make_file("a.vy", "import lib\n")
+    make_file("b.vy", "import lib2\n")
+
+    session = BuildSession(max_module_age=1)
+    _compile_targets(tmp_path, ["a.vy", "a.vy"], session)
+    (module_cache,) = session._module_caches.values()
+    assert [Path(entry.module.path).name for entry in module_cache._modules.values()] == ["lib.vy"]
+
+    _compile_targets(tmp_path, ["b.vy"], session)
+    assert [Path(entry.module.path).name for entry in module_cache._modules.values()] == ["lib2.vy"]
+
+
+def test_session_replays_warnings(tmp_path, make_file):
+    make_file("lib.vy", DEPRECATED_LIB_CODE)
+    make_file("a.vy", "import lib\n")
+    make_file("b.vy", "import lib\n")
+
+    session = BuildSession()
+    input_bundle = FilesystemInputBundle([tmp_path])
+    for name in ("a.vy", "b.vy"):
+        file_input = input_bundle.load_file(tmp_path / name)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            compile_from_file_input(file_input, input_bundle=input_bundle, session=session)
+
+        assert len(w) == 1
+        assert str(w[0].message).startswith("enum will be deprecated")
+
+
+def test_session_cleared_on_error(tmp_path, make_file):
+    make_file("lib.vy", LIBRARY_CODE)
+    make_file("bad.vy", BAD_CODE)
+    make_file("token.vy", TOKEN_CODE)
+
+    session = BuildSession()
+    input_bundle = FilesystemInputBundle([tmp_path])
+
+    file_input = input_bundle.load_file(tmp_path / "bad.vy")
+    with pytest.raises(TypeMismatch):
+        compile_from_file_input(file_input, input_bundle=input_bundle, session=session)
+
+    (module_cache,) = session._module_caches.values()
+    assert len(module_cache._modules) == 0
+
+    # the session is still usable
+    file_input = input_bundle.load_file(tmp_path / "token.vy")
+    out = compile_from_file_input(file_input, input_bundle=input_bundle, session=session)
+    assert out == compile_from_file_input(file_input, input_bundle=input_bundle)
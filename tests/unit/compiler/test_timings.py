@@ -0,0 +1,184 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from vyper.cli.vyper_json import compile_json
+from vyper.compiler import compile_code
+from vyper.compiler.input_bundle import FileInput
+from vyper.compiler.phases import CompilerData
+from vyper.compiler.settings import OptimizationLevel, Settings
+from vyper.compiler.timings import Timings, record_timings, timed_phase
+
+CODE = """
+x: public(uint256)
+
+@external
+def foo(a: uint256) -> uint256:
+    self.x = a
+    return a + 1
+"""
+
+FRONTEND_PHASES = ("parse", "import_resolution", "analysis", "storage_layout", "ir_generation")
+BACKEND_PHASES = ("assembly", "assembly_runtime", "bytecode", "bytecode_runtime")
+
+
+def test_timings_output():
+    settings = Settings(experimental_codegen=False)
+    timings = compile_code(CODE, output_formats=["timings"], settings=settings)["timings"]
+
+    for phase in FRONTEND_PHASES + BACKEND_PHASES + ("legacy_optimizer",):
+        assert timings[phase]["count"] >= 1
+        assert timings[phase]["wall_time"] >= 0
+        assert timings[phase]["peak_memory"] >= 0
+
+    assert not any(phase.startswith("venom") for phase in timings)
+
+
+def test_timings_output_no_optimize():
+    settings = Settings(optimize=OptimizationLevel.NONE)
+    timings = compile_code(CODE, output_formats=["timings"], settings=settings)["timings"]
+    assert "legacy_optimizer" not in timings
+
+
+def test_timings_output_venom():
+    settings = Settings(experimental_codegen=True)
+    timings = compile_code(CODE, output_formats=["timings"], settings=settings)["timings"]
+
+    for phase in FRONTEND_PHASES + BACKEND_PHASES:
+        assert phase in timings
+    assert "venom_generation" in timings
+    assert "venom_generation_runtime" in timings
+    assert "venom_pass:SCCP" in timings
+    assert "venom_pass:FunctionInlinerPass" in timings
+
+
+def test_timings_with_other_outputs():
+    # the timings include the phases triggered by the other outputs,
+    # regardless of where "timings" is in the list
+    out = compile_code(CODE, output_formats=["timings", "abi", "bytecode"])
+    assert out["bytecode"].startswith("0x")
+    assert out["timings"]["bytecode"]["count"] == 1
+
+
+def test_timed_phase_inactive():
+    timings = Timings()
+    with timed_phase("foo"):
+        pass
+    assert timings.phases == {}
+
+
+def test_nested_phases():
+    timings = Timings()
+    with record_timings(timings):
+        with timed_phase("outer"):
+            with timed_phase("inner"):
+                _ = [0] * 100_000
+            with timed_phase("inner"):
+                pass
+
+    assert list(timings.phases) == ["inner", "outer"]
+    outer, inner = timings.phases["outer"], timings.phases["inner"]
+    assert outer.count == 1
+    assert inner.count == 2
+    # peak memory includes nested phases
+    assert inner.peak_memory >= 8 * 100_000
+    assert outer.peak_memory >= inner.peak_memory
+
+
+@pytest.mark.parametrize("selection", [["timings"], ["abi", "timings"]])
+def test_timings_json(selection):
+    input_json = {
+        "language": "Vyper",
+        "sources": {"foo.vy": {"content": CODE}},
+        "settings": {"outputSelection": {"foo.vy": selection}},
+    }
+    output = compile_json(json.dumps(input_json))
+    timings = output["contracts"]["foo.vy"]["foo"]["timings"]
+    assert "bytecode_runtime" in timings
+
+
+def test_timings_json_not_in_wildcard():
+    input_json = {
+        "language": "Vyper",
+        "sources": {"foo.vy": {"content": CODE}},
+        "settings": {"outputSelection": {"*": ["*"]}},
+    }
+    output = compile_json(json.dumps(input_json))
+    assert "timings" not in output["contracts"]["foo.vy"]["foo"]
+
+
+def test_venom_pass_stats_output():
+    settings = Settings(experimental_codegen=True)
+    stats = compile_code(CODE, output_formats=["venom_pass_stats"], settings=settings)[
+        "venom_pass_stats"
+    ]
+
+    stages = {s["stage"] for s in stats}
+    assert stages == {"venom_generation", "venom_generation_runtime"}
+
+    global_passes = [s for s in stats if s["function"] is None]
+    assert {s["pass_name"] for s in global_passes} == {"FixCalloca", "FunctionInlinerPass"}
+
+    # SCCP runs several times on each function
+    runtime_sccp = [
+        s
+        for s in stats
+        if s["stage"] == "venom_generation_runtime"
+        and s["function"] is not None
+        and s["pass_name"] == "SCCP"
+    ]
+    fn_names = {s["function"] for s in runtime_sccp}
+    for fn_name in fn_names:
+        runs = [s["run"] for s in runtime_sccp if s["function"] == fn_name]
+        assert runs == list(range(1, len(runs) + 1))
+        assert len(runs) > 1
+
+    for s in stats:
+        assert s["wall_time"] >= 0
+        assert s["instructions_before"] >= 0 and s["instructions_after"] >= 0
+        assert s["analysis_hits"] >= 0 and s["analysis_misses"] >= 0
+
+    # some pass actually shrinks the IR
+    assert any(s["instructions_after"] < s["instructions_before"] for s in stats)
+
+
+def test_venom_pass_stats_no_memory_tracing(monkeypatch):
+    # pass stats alone should not pay for memory tracing
+    def bad_start(*args, **kwargs):
+        raise AssertionError("tracemalloc started")
+
+    monkeypatch.setattr("tracemalloc.start", bad_start)
+    settings = Settings(experimental_codegen=True)
+    out = compile_code(CODE, output_formats=["venom_pass_stats"], settings=settings)
+    assert len(out["venom_pass_stats"]) > 0
+
+
+def test_format_pass_stats():
+    settings = Settings(experimental_codegen=True)
+    compiler_data = CompilerData(
+        FileInput(0, Path("foo.vy"), Path("foo.vy"), CODE), settings=settings
+    )
+    with record_timings(compiler_data.timings, trace_memory=False):
+        _ = compiler_data.venom_runtime
+
+    lines = compiler_data.timings.format_pass_stats().splitlines()
+    assert lines[0].split() == [
+        "stage",
+        "function",
+        "pass",
+        "run",
+        "ms",
+        "insts",
+        "bbs",
+        "hits",
+        "misses",
+    ]
+    assert len(lines) == len(compiler_data.timings.passes) + 1
+    assert "<global>" in lines[1]
+
+
+def test_venom_pass_stats_legacy_pipeline():
+    settings = Settings(experimental_codegen=False)
+    out = compile_code(CODE, output_formats=["venom_pass_stats"], settings=settings)
+    assert out["venom_pass_stats"] == []
@@ -0,0 +1,131 @@
+from tests.venom_utils import parse_from_basic_block
+from vyper.venom.analysis import CFGAnalysis, DFGAnalysis, FCGAnalysis, IRAnalysesCache
+from vyper.venom.basicblock import IRBasicBlock, IRInstruction, IRLabel, IRLiteral
+from vyper.venom.passes.machinery.inst_updater import InstUpdater
+
+CODE = """
+main:
+    %1 = add 1, 2
+    mstore 0, %1
+    stop
+"""
+
+
+def _setup():
+    ctx = parse_from_basic_block(CODE)
+    fn = ctx.entry_function
+    return fn, IRAnalysesCache(fn)
+
+
+def test_unchanged_function_keeps_analyses():
+    fn, ac = _setup()
+    cfg = ac.request_analysis(CFGAnalysis)
+    dfg = ac.request_analysis(DFGAnalysis)
+
+    ac.invalidate_analysis(CFGAnalysis)
+    ac.invalidate_analysis(DFGAnalysis)
+
+    assert ac.request_analysis(CFGAnalysis) is cfg
+    assert ac.request_analysis(DFGAnalysis) is dfg
+
+
+def test_modified_function_invalidates_analyses():
+    fn, ac = _setup()
+    dfg = ac.request_analysis(DFGAnalysis)
+
+    fn.entry.instructions[0].operands[0] = IRLiteral(5)
+    ac.invalidate_analysis(DFGAnalysis)
+
+    assert ac.request_analysis(DFGAnalysis) is not dfg
+
+
+def test_invalidation_cascades():
+    # analyses invalidated by a stale analysis are removed, even if they
+    # are up to date themselves
+    fn, ac = _setup()
+    cfg = ac.request_analysis(CFGAnalysis)
+    fn.entry.insert_instruction(IRInstruction("mstore", [IRLiteral(0), IRLiteral(0)]), index=0)
+    dfg = ac.request_analysis(DFGAnalysis)
+
+    ac.invalidate_analysis(DFGAnalysis)
+    assert ac.request_analysis(DFGAnalysis) is dfg
+
+    ac.invalidate_analysis(CFGAnalysis)
+    assert ac.request_analysis(CFGAnalysis) is not cfg
+    assert ac.request_analysis(DFGAnalysis) is not dfg
+
+
+def test_force_analysis():
+    fn, ac = _setup()
+    dfg = ac.request_analysis(DFGAnalysis)
+    assert ac.force_analysis(DFGAnalysis) is not dfg
+
+
+def test_fcg_is_not_function_local():
+    # the call graph depends on the other functions, it is always invalidated
+    fn, ac = _setup()
+    fcg = ac.request_analysis(FCGAnalysis)
+    ac.invalidate_analysis(FCGAnalysis)
+    assert ac.request_analysis(FCGAnalysis) is not fcg
+
+
+def test_version_instruction_mutators():
+    fn, ac = _setup()
+    bb = fn.entry
+    add, mstore, _ = bb.instructions
+
+    version = fn.version
+    add.operands = list(add.operands)  # no change
+    add.opcode = "add"
+    add.annotation = "foo"
+    assert fn.version == version
+
+    add.opcode = "sub"
+    assert fn.version > version
+
+    version = fn.version
+    mstore.operands.append(IRLiteral(1))
+    assert fn.version > version
+
+    version = fn.version
+    updater = InstUpdater(ac.request_analysis(DFGAnalysis))
+    updater.update(add, "add", [IRLiteral(3), IRLiteral(4)])
+    assert fn.version > version
+
+    version = fn.version
+    updater.nop(mstore)
+    assert fn.version > version
+
+
+def test_version_basic_block_mutators():
+    fn, _ = _setup()
+    bb = fn.entry
+
+    version = fn.version
+    bb.insert_instruction(IRInstruction("mstore", [IRLiteral(0), IRLiteral(0)]), index=0)
+    assert fn.version > version
+
+    version = fn.version
+    bb.remove_instruction(bb.instructions[0])
+    assert fn.version > version
+
+    version = fn.version
+    bb.instructions = bb.instructions[1:]
+    assert fn.version > version
+
+    version = fn.version
+    bb.instructions.sort(key=lambda inst: inst.opcode)
+    assert fn.version > version
+
+    version = fn.version
+    new_bb = IRBasicBlock(IRLabel("new"), fn)
+    fn.append_basic_block(new_bb)
+    assert fn.version > version
+
+    version = fn.version
+    new_bb.append_instruction("stop")
+    assert fn.version > version
+
+    version = fn.version
+    fn.remove_basic_block(new_bb)
+    assert fn.version > version
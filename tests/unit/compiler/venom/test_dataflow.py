@@ -0,0 +1,131 @@
+from tests.venom_utils import parse_from_basic_block
+from vyper.venom.analysis import IRAnalysesCache, LivenessAnalysis, VarDefinition
+from vyper.venom.analysis.dataflow import BitsetIndex
+from vyper.venom.basicblock import IRVariable
+
+
+def test_bitset_index():
+    index = BitsetIndex(["a", "b"])
+    assert index.mask(["c", "a"]) == 0b101
+    assert len(index) == 3
+    assert index.full == 0b111
+
+    assert list(index.iter(0b110)) == ["b", "c"]
+    assert index.first(0b110) == "b"
+    assert index.first(0) is None
+
+    # masks built before renumbering still refer to the old number
+    assert index.renumber("a") == 3
+    assert list(index.iter(0b1001)) == ["a", "a"]
+    assert index.bit("a") == 0b1000
+
+
+_LOOP = """
+main:
+    %1 = calldataload 0
+    %2 = calldataload 32
+    jmp @cond
+cond:
+    %i = phi @main, %1, @body, %i2
+    %c = lt %i, %2
+    jnz %c, @body, @exit
+body:
+    %i2 = add %i, 1
+    jmp @cond
+exit:
+    return %i, %2
+"""
+
+
+def test_liveness_loop():
+    ctx = parse_from_basic_block(_LOOP)
+    fn = next(iter(ctx.functions.values()))
+    ac = IRAnalysesCache(fn)
+    liveness = ac.request_analysis(LivenessAnalysis)
+
+    i, i2, n = IRVariable("%i"), IRVariable("%i2"), IRVariable("%2")
+    cond = fn.get_basic_block("cond")
+    body = fn.get_basic_block("body")
+    main = fn.get_basic_block("main")
+
+    # %2 is live around the loop
+    assert set(liveness.out_vars(body)) == {i2, n}
+    assert set(liveness.out_vars(cond)) == {i, n}
+    assert set(liveness.live_vars_at(cond.instructions[1])) == {i, n}
+
+    # phi operands are only live along their own edge
+    assert set(liveness.input_vars_from(body, cond)) == {i2, n}
+    assert set(liveness.input_vars_from(main, cond)) == {IRVariable("%1"), n}
+
+
+def test_liveness_order():
+    # the live sets are ordered by when the variables become live,
+    # walking backwards (the most recently used variable is last)
+    pre = """
+    main:
+        %1 = calldataload 0
+        %2 = calldataload 32
+        %3 = calldataload 64
+        %4 = add %3, %1
+        return %2, %4
+    """
+    ctx = parse_from_basic_block(pre)
+    fn = next(iter(ctx.functions.values()))
+    liveness = IRAnalysesCache(fn).request_analysis(LivenessAnalysis)
+
+    bb = fn.entry
+    assert list(liveness.live_vars_at(bb.instructions[3])) == [
+        IRVariable("%2"),
+        IRVariable("%1"),
+        IRVariable("%3"),
+    ]
+
+
+def test_var_definition():
+    pre = """
+    main:
+        %1 = calldataload 0
+        jnz %1, @then, @join
+    then:
+        %2 = calldataload 32
+        jmp @join
+    join:
+        %3 = add %1, 1
+        stop
+    """
+    ctx = parse_from_basic_block(pre)
+    fn = next(iter(ctx.functions.values()))
+    var_def = IRAnalysesCache(fn).request_analysis(VarDefinition)
+
+    join = fn.get_basic_block("join")
+    then = fn.get_basic_block("then")
+    v1, v2 = IRVariable("%1"), IRVariable("%2")
+
+    assert var_def.is_defined_at(v1, join.instructions[0])
+    # %2 is only defined on one of the paths into `join`
+    assert not var_def.is_defined_at(v2, join.instructions[0])
+    assert var_def.is_defined_out(v2, then)
+    assert not var_def.is_defined_at(v2, then.instructions[0])
+    assert not var_def.is_defined_at(IRVariable("%unknown"), join.instructions[0])
+
+
+def test_liveness_on_demand():
+    ctx = parse_from_basic_block(_LOOP)
+    fn = next(iter(ctx.functions.values()))
+    liveness = IRAnalysesCache(fn).request_analysis(LivenessAnalysis)
+
+    cond = fn.get_basic_block("cond")
+    i, n = IRVariable("%i"), IRVariable("%2")
+
+    # block boundaries do not need the per-instruction liveness
+    assert set(liveness.live_vars_at(cond.instructions[0])) == {
+        IRVariable("%1"),
+        IRVariable("%i2"),
+        n,
+    }
+    assert set(liveness.out_vars(cond)) == {i, n}
+    assert cond not in liveness._inst_liveness
+
+    assert list(liveness.live_vars_at(cond.instructions[2])) == [n, i, IRVariable("%c")]
+    assert cond in liveness._inst_liveness
+    assert len(liveness._inst_liveness) == 1
@@ -72,3 +72,90 @@ def test_phi_placement():
 
     ac = IRAnalysesCache(fn)
     MakeSSA(ac, fn).run_pass()
+
+
+def _reachable_without(fn: IRFunction, cfg_outs: dict, removed: IRBasicBlock) -> set:
+    seen: set = set()
+    work = [fn.entry]
+    while len(work) > 0:
+        bb = work.pop()
+        if bb in seen or bb is removed:
+            continue
+        seen.add(bb)
+        work.extend(cfg_outs[bb])
+    return seen
+
+
+def _make_random_fn(seed: int, n: int) -> IRFunction:
+    import random
+
+    rand = random.Random(seed)
+    ctx = IRContext()
+    fn = ctx.create_function("0")
+    labels = [IRLabel(str(i)) for i in range(n)]
+    bbs = [fn.entry] + [IRBasicBlock(label, fn) for label in labels[1:]]
+    for bb in bbs[1:]:
+        fn.append_basic_block(bb)
+    for i, bb in enumerate(bbs):
+        if i == n - 1:
+            bb.append_instruction("stop")
+        elif rand.random() < 0.3:
+            bb.append_instruction("jmp", labels[i + 1])
+        else:
+            # (the fallthrough edge keeps all blocks reachable)
+            bb.append_instruction("jnz", IRLiteral(1), labels[i + 1], rand.choice(labels[1:]))
+    return fn
+
+
+def test_dominators_match_definition():
+    # `a` dominates `b` iff `b` is unreachable from the entry once `a` is removed
+    for seed in range(20):
+        fn = _make_random_fn(seed, 30)
+        ac = IRAnalysesCache(fn)
+        dom = ac.request_analysis(DominatorTreeAnalysis)
+        cfg_outs = {bb: dom.cfg.cfg_out(bb) for bb in dom.cfg_post_walk}
+
+        for a in dom.cfg_post_walk:
+            reachable = _reachable_without(fn, cfg_outs, a)
+            for b in dom.cfg_post_walk:
+                expected = a is b or b not in reachable
+                assert dom.dominates(a, b) == expected, (seed, a.label, b.label)
+
+            if a is not fn.entry:
+                idom = dom.immediate_dominator(a)
+                # the immediate dominator is the closest strict dominator
+                assert dom.dominates(idom, a) and idom is not a
+                for b in dom.cfg_post_walk:
+                    if b is not a and dom.dominates(b, a):
+                        assert dom.dominates(b, idom)
+
+
+def test_dominators_large_function():
+    # a long chain of diamonds, deeper than the recursion limit
+    n = 3000
+    ctx = IRContext()
+    fn = ctx.create_function("entry")
+    fn.entry.append_instruction("jmp", IRLabel("head0"))
+    for i in range(n):
+        head = IRBasicBlock(IRLabel(f"head{i}"), fn)
+        left = IRBasicBlock(IRLabel(f"left{i}"), fn)
+        right = IRBasicBlock(IRLabel(f"right{i}"), fn)
+        for bb in (head, left, right):
+            fn.append_basic_block(bb)
+        head.append_instruction("jnz", IRLiteral(1), left.label, right.label)
+        nxt = IRLabel(f"head{i + 1}") if i < n - 1 else IRLabel("exit")
+        left.append_instruction("jmp", nxt)
+        right.append_instruction("jmp", nxt)
+    exit_bb = IRBasicBlock(IRLabel("exit"), fn)
+    fn.append_basic_block(exit_bb)
+    exit_bb.append_instruction("stop")
+
+    ac = IRAnalysesCache(fn)
+    dom = ac.request_analysis(DominatorTreeAnalysis)
+
+    head0 = fn.get_basic_block("head0")
+    last_left = fn.get_basic_block(f"left{n - 1}")
+    assert dom.dominates(head0, exit_bb)
+    assert dom.dominates(fn.entry, last_left)
+    assert not dom.dominates(last_left, exit_bb)
+    assert dom.immediate_dominator(exit_bb) == fn.get_basic_block(f"head{n - 1}")
@@ -1,6 +1,8 @@
 from tests.venom_utils import parse_venom
 from vyper.compiler.settings import OptimizationLevel
+from vyper.venom.analysis import FCGAnalysis
 from vyper.venom.analysis.analysis import IRAnalysesCache
+from vyper.venom.basicblock import IRLabel
 from vyper.venom.check_venom import check_venom_ctx
 from vyper.venom.passes import FunctionInlinerPass, SimplifyCFGPass
 
@@ -107,3 +109,63 @@ def test_inliner_phi_invalidation_inner():
         SimplifyCFGPass(ac, fn).run_pass()
 
     check_venom_ctx(ctx)
+
+
+def test_inliner_call_graph_update():
+    """
+    Test that the call graph which is updated in place while inlining
+    matches the call graph of the resulting context
+    """
+
+    pre = """
+    function main {
+    main:
+        %p = source
+        %1 = invoke @f, %p
+        %2 = invoke @g, %1
+        %3 = invoke @g, %2
+        sink %3
+    }
+
+    function f {
+    main:
+        %p = source
+        %1 = invoke @g, %p
+        %2 = invoke @h, %1
+        ret %2
+    }
+
+    function g {
+    main:
+        %p = source
+        %1 = add %p, 1
+        ret %1
+    }
+
+    function h {
+    main:
+        %p = source
+        %1 = invoke @g, %p
+        ret %1
+    }
+    """
+
+    ctx = parse_venom(pre)
+
+    ir_analyses = {}
+    for fn in ctx.functions.values():
+        ir_analyses[fn] = IRAnalysesCache(fn)
+
+    inliner = FunctionInlinerPass(ir_analyses, ctx, OptimizationLevel.CODESIZE)
+    inliner.run_pass()
+
+    # h and then f are inlined, g has several call sites
+    assert [fn.name.value for fn in ctx.get_functions()] == ["main", "g"]
+
+    main = ctx.get_function(IRLabel("main"))
+    g = ctx.get_function(IRLabel("g"))
+    fresh = IRAnalysesCache(main).force_analysis(FCGAnalysis)
+
+    assert len(fresh.get_call_sites(g)) == 4
+    assert inliner.fcg.call_sites == fresh.call_sites
+    assert inliner.fcg.callees == fresh.callees
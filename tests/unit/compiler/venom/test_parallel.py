@@ -0,0 +1,159 @@
+from multiprocessing import get_context
+
+import pytest
+
+from tests.venom_utils import parse_venom
+from vyper.compiler import compile_code
+from vyper.compiler.settings import OptimizationLevel, Settings, anchor_settings
+from vyper.exceptions import StaticAssertionException
+from vyper.venom import parallel
+from vyper.venom.analysis import IRAnalysesCache
+from vyper.venom.context import IRContext
+from vyper.venom.passes import SCCP, ConcretizeMemLocPass, MakeSSA, MemMergePass
+from vyper.venom.pipeline import FixedPoint, PassStep, Pipeline
+
+# internal functions with several call sites are not inlined
+CODE = """
+@internal
+def bar(a: uint256) -> uint256:
+    s: uint256 = 0
+    for i: uint256 in range(10):
+        s += a * i
+    return s
+
+@internal
+def baz(a: DynArray[uint256, 8]) -> uint256:
+    return self.bar(a[0]) + self.bar(len(a))
+
+@external
+def foo(a: uint256) -> uint256:
+    return self.baz([a, a + 1]) + self.baz([a]) + self.bar(a)
+"""
+
+_OUTPUTS = ["bytecode", "bytecode_runtime", "source_map_runtime"]
+
+
+def _compile(source: str) -> dict:
+    settings = Settings(experimental_codegen=True, optimize=OptimizationLevel.CODESIZE)
+    return compile_code(source, output_formats=_OUTPUTS, settings=settings)
+
+
+def test_parallel_same_output(monkeypatch):
+    expected = _compile(CODE)
+
+    merged = []
+    merge = parallel._merge
+    monkeypatch.setattr(parallel, "_merge", lambda *args: merged.append(merge(*args)))
+    monkeypatch.setattr(parallel, "JOBS", 2)
+
+    assert _compile(CODE) == expected
+    # the functions were optimized in the worker processes
+    assert len(merged) > 0
+
+
+def test_parallel_error(monkeypatch):
+    code = """
+@internal
+def bar(a: uint256) -> uint256:
+    x: uint256 = 1
+    assert x == 2
+    return a
+
+@external
+def foo(a: uint256) -> uint256:
+    return self.bar(a) + self.bar(a + 1)
+    """
+    with pytest.raises(StaticAssertionException) as expected:
+        _compile(code)
+
+    monkeypatch.setattr(parallel, "JOBS", 2)
+    with pytest.raises(StaticAssertionException) as e:
+        _compile(code)
+
+    assert str(e.value) == str(expected.value)
+
+
+COPY_VENOM = """
+function main {
+main:
+    %1 = mload 0
+    %2 = mload 32
+    mstore 1000, %1
+    mstore 1032, %2
+    invoke @other
+    stop
+}
+
+function other {
+other:
+    %1 = mload 64
+    %2 = mload 96
+    mstore 2000, %1
+    mstore 2032, %2
+    ret
+}
+"""
+
+
+def _run_fn_passes(settings, jobs, mp_context=None) -> str:
+    ctx = parse_venom(COPY_VENOM)
+    functions = list(ctx.get_functions())
+    ir_analyses = {fn: IRAnalysesCache(fn) for fn in functions}
+    pipeline = Pipeline((PassStep(MemMergePass),))
+    with anchor_settings(settings):
+        if jobs == 1:
+            for fn in functions:
+                pipeline.run(ir_analyses[fn], fn)
+        else:
+            parallel.run_fn_passes(ctx, functions, pipeline, ir_analyses, jobs, mp_context)
+    return str(ctx)
+
+
+def test_parallel_spawn_settings():
+    # spawned workers do not inherit the global settings (and thus the
+    # evm version) of this process
+    settings = Settings(evm_version="shanghai")
+    expected = _run_fn_passes(settings, 1)
+    # mcopy is not available before cancun
+    assert "mcopy" not in expected
+
+    assert _run_fn_passes(settings, 2, get_context("spawn")) == expected
+
+
+def test_split_pipeline():
+    concretize = PassStep(ConcretizeMemLocPass)
+    group = FixedPoint((PassStep(SCCP), concretize))
+    pipeline = Pipeline((PassStep(MakeSSA), PassStep(SCCP), concretize, PassStep(SCCP), group))
+
+    assert parallel._split(pipeline) == [
+        (True, (PassStep(MakeSSA), PassStep(SCCP))),
+        (False, (concretize,)),
+        (True, (PassStep(SCCP),)),
+        (False, (group,)),
+    ]
+
+
+def test_pickle_function():
+    ctx = parse_venom(
+        """
+    function main {
+    main:
+        %p = source
+        %1 = add %p, 1
+        sink %1
+    }
+    """
+    )
+    fn = next(ctx.get_functions())
+    new_ctx = IRContext()
+    new_fn = parallel._loads(parallel._dumps(fn, ctx, []), new_ctx, None)
+
+    assert str(new_fn) == str(fn)
+    # the function is sent without its context
+    assert new_fn.ctx is new_ctx
+
+    # modifications are still tracked
+    inst = new_fn.entry.instructions[1]
+    version = new_fn.version
+    inst.operands[0] = inst.operands[1]
+    assert new_fn.version > version
@@ -0,0 +1,229 @@
+import json
+
+import pytest
+
+from tests.venom_utils import parse_from_basic_block
+from vyper.cli.vyper_json import compile_json
+from vyper.compiler import compile_code
+from vyper.compiler.settings import OptimizationLevel, Settings
+from vyper.exceptions import JSONError
+from vyper.venom.analysis import IRAnalysesCache
+from vyper.venom.basicblock import IRInstruction, IRLiteral
+from vyper.venom.passes import CSE, SCCP, AssignElimination, DeadStoreElimination, MakeSSA
+from vyper.venom.passes.base_pass import IRPass
+from vyper.venom.pipeline import (
+    LOWERING_EPILOGUE,
+    LOWERING_PROLOGUE,
+    PIPELINES,
+    FixedPoint,
+    PassStep,
+    Pipeline,
+    get_pipeline,
+    parse_pipeline,
+)
+
+CODE = """
+x: public(uint256)
+
+@external
+def foo(a: uint256) -> uint256:
+    self.x = a
+    return a + 1
+"""
+
+# the example in docs/compiling-a-contract.rst
+DOCUMENTED_PIPELINE = (
+    "SimplifyCFGPass,[SCCP,AssignElimination,RemoveUnusedVariablesPass],Mem2Var,CSE"
+)
+
+
+def _user_steps(pipeline):
+    # the steps between the lowering passes
+    steps = pipeline.steps
+    assert steps[: len(LOWERING_PROLOGUE)] == LOWERING_PROLOGUE
+    assert steps[len(steps) - len(LOWERING_EPILOGUE) :] == LOWERING_EPILOGUE
+    return steps[len(LOWERING_PROLOGUE) : len(steps) - len(LOWERING_EPILOGUE)]
+
+
+def test_parse_pipeline():
+    pipeline = parse_pipeline("MakeSSA, [SCCP, AssignElimination], CSE")
+    assert str(Pipeline(_user_steps(pipeline))) == "MakeSSA,[SCCP,AssignElimination],CSE"
+
+    make_ssa, group, cse = _user_steps(pipeline)
+    assert make_ssa == PassStep(MakeSSA)
+    assert isinstance(group, FixedPoint)
+    assert group.steps == (PassStep(SCCP), PassStep(AssignElimination))
+    assert cse == PassStep(CSE)
+
+
+def test_parse_pipeline_dse():
+    # dead store elimination runs once per address space
+    steps = _user_steps(parse_pipeline("DeadStoreElimination"))
+    assert len(steps) == 3
+    assert all(s.pass_cls is DeadStoreElimination for s in steps)
+
+
+@pytest.mark.parametrize("level", ["none", "gas", "codesize"])
+def test_parse_pipeline_level(level):
+    assert parse_pipeline(level) is PIPELINES[OptimizationLevel.from_string(level)]
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        "",
+        "MakeSSA,Foo",
+        "MakeSSA,[SCCP",
+        "MakeSSA,SCCP]",
+        "MakeSSA,[]",
+        "MakeSSA[SCCP]",
+        "[SCCP]MakeSSA",
+        # always run last
+        "SCCP,DFTPass",
+        "CFGNormalization",
+    ],
+)
+def test_parse_pipeline_invalid(spec):
+    with pytest.raises(ValueError):
+        parse_pipeline(spec)
+
+
+def test_get_pipeline():
+    assert get_pipeline(Settings()) is PIPELINES[OptimizationLevel.GAS]
+    codesize = Settings(optimize=OptimizationLevel.CODESIZE)
+    assert get_pipeline(codesize) is PIPELINES[OptimizationLevel.CODESIZE]
+
+    settings = Settings(optimize=OptimizationLevel.CODESIZE, venom_pipeline="MakeSSA")
+    assert get_pipeline(settings) == Pipeline(
+        LOWERING_PROLOGUE + (PassStep(MakeSSA),) + LOWERING_EPILOGUE
+    )
+
+
+class _CountingPass(IRPass):
+    runs = 0
+
+    def run_pass(self):
+        type(self).runs += 1
+
+
+class _GrowingPass(IRPass):
+    # changes the IR every time it runs
+    runs = 0
+
+    def run_pass(self):
+        type(self).runs += 1
+        bb = self.function.entry
+        bb.insert_instruction(IRInstruction("mstore", [IRLiteral(0), IRLiteral(0)]), index=0)
+
+
+def _run_on_fixture(step):
+    ctx = parse_from_basic_block(
+        """
+        main:
+            %1 = add 1, 2
+            mstore 0, %1
+            stop
+        """
+    )
+    fn = ctx.entry_function
+    Pipeline((step,)).run(IRAnalysesCache(fn), fn)
+
+
+def test_fixed_point_stops_when_unchanged():
+    _CountingPass.runs = 0
+    _run_on_fixture(FixedPoint((PassStep(_CountingPass),)))
+    assert _CountingPass.runs == 1
+
+
+def test_fixed_point_max_iterations():
+    _GrowingPass.runs = 0
+    _run_on_fixture(FixedPoint((PassStep(_GrowingPass),), max_iterations=5))
+    assert _GrowingPass.runs == 5
+
+
+def test_fixed_point_converges():
+    _CountingPass.runs = 0
+    # the first iteration folds and removes `%1`, the second one changes nothing
+    (group,) = _user_steps(parse_pipeline("[SCCP,AssignElimination,RemoveUnusedVariablesPass]"))
+    assert isinstance(group, FixedPoint)
+    _run_on_fixture(FixedPoint(group.steps + (PassStep(_CountingPass),)))
+    assert _CountingPass.runs == 2
+
+
+def test_venom_pipeline_setting():
+    settings = Settings(experimental_codegen=True)
+    default = compile_code(CODE, settings=settings)["bytecode"]
+
+    settings.venom_pipeline = "gas"
+    assert compile_code(CODE, settings=settings)["bytecode"] == default
+
+    # a fixed point cleanup pipeline still produces valid code
+    settings.venom_pipeline = "[SCCP,AssignElimination,RemoveUnusedVariablesPass,SimplifyCFGPass]"
+    assert compile_code(CODE, settings=settings)["bytecode"].startswith("0x")
+
+
+LOOPS = """
+@internal
+def _sum(n: uint256) -> uint256:
+    acc: uint256 = 0
+    for i: uint256 in range(n, bound=10):
+        acc += i
+    return acc
+
+@external
+def foo(xs: DynArray[uint256, 10]) -> uint256:
+    acc: uint256 = 0
+    for x: uint256 in xs:
+        acc += x
+    return acc + self._sum(len(xs))
+"""
+
+
+# passes need the IR in SSA form, and codegen needs the lowering passes,
+# which run around every user-supplied pipeline
+@pytest.mark.parametrize(
+    "spec", [DOCUMENTED_PIPELINE, "SCCP", "[SCCP,AssignElimination]", "Mem2Var", "RevertToAssert"]
+)
+def test_venom_pipeline_lowering(get_contract, spec):
+    settings = Settings(experimental_codegen=True, venom_pipeline=spec)
+    c = get_contract(LOOPS, compiler_settings=settings)
+    assert c.foo([1, 2, 3]) == 6 + 3
+
+
+def test_venom_pipeline_pragma():
+    code = "#pragma venom-pipeline codesize\n" + CODE
+    settings = Settings(experimental_codegen=True, venom_pipeline="codesize")
+    # (compare runtime bytecode, the deploy bytecode contains the integrity hash)
+    expected = compile_code(CODE, output_formats=["bytecode_runtime"], settings=settings)[
+        "bytecode_runtime"
+    ]
+
+    settings = Settings(experimental_codegen=True)
+    out = compile_code(code, output_formats=["bytecode_runtime"], settings=settings)
+    assert out["bytecode_runtime"] == expected
+
+
+def test_venom_pipeline_json_invalid():
+    input_json = {
+        "language": "Vyper",
+        "sources": {"foo.vy": {"content": CODE}},
+        "settings": {"venomPipeline": "SCCP,DFTPass"},
+    }
+    with pytest.raises(JSONError):
+        compile_json(json.dumps(input_json))
+
+
+def test_venom_pipeline_json():
+    input_json = {
+        "language": "Vyper",
+        "sources": {"foo.vy": {"content": CODE}},
+        "settings": {
+            "experimentalCodegen": True,
+            "venomPipeline": "none",
+            "outputSelection": {"foo.vy": ["evm.bytecode.object"]},
+        },
+    }
+    output = compile_json(json.dumps(input_json))
+    settings = Settings(experimental_codegen=True, venom_pipeline="none")
+    expected = compile_code(CODE, settings=settings)["bytecode"]
+    assert output["contracts"]["foo.vy"]["foo"]["evm"]["bytecode"]["object"] == expected
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from vyper.venom.basicblock import IRLabel, IRLiteral, IRVariable
+from vyper.venom.stack_model import StackModel
+
+_OPERANDS = [IRVariable(f"%{i}") for i in range(6)] + [IRLiteral(1), IRLabel("foo")]
+
+
+def _expected_depth(stack: StackModel, op) -> int:
+    for i, stack_op in enumerate(reversed(stack._stack)):
+        if stack_op.value == op.value:
+            return -i
+    return StackModel.NOT_IN_STACK  # type: ignore
+
+
+def _check(stack: StackModel):
+    for op in _OPERANDS:
+        assert stack.get_depth(op) == _expected_depth(stack, op)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_stack_model_depths(seed):
+    rng = random.Random(seed)
+    stack = StackModel()
+
+    for _ in range(200):
+        action = rng.choice(["push", "push", "pop", "dup", "swap", "poke", "copy"])
+        height = stack.height
+        if action == "push" or height < 2:
+            stack.push(rng.choice(_OPERANDS))
+        elif action == "pop":
+            stack.pop(rng.randint(1, min(height, 3)))
+        elif action == "dup":
+            stack.dup(-rng.randrange(height))
+        elif action == "swap":
+            stack.swap(-rng.randint(1, height - 1))
+        elif action == "poke":
+            stack.poke(-rng.randrange(height), rng.choice(_OPERANDS))
+        else:
+            stack = stack.copy()
+        _check(stack)
+
+
+def test_phi_depth():
+    a, b, c = IRVariable("%a"), IRVariable("%b"), IRVariable("%c")
+    stack = StackModel()
+    stack.push(a)
+    stack.push(c)
+    stack.push(IRLiteral(1))
+
+    assert stack.get_phi_depth([b, a]) == -2
+    assert stack.get_phi_depth([b]) is StackModel.NOT_IN_STACK
+
+    stack.dup(-2)
+    with pytest.raises(AssertionError):
+        stack.get_phi_depth([a, c])
@@ -2,6 +2,7 @@ import pytest
 
 from vyper.exceptions import (
     ArrayIndexException,
+    InvalidLiteral,
     InvalidOperation,
     InvalidReference,
     TypeMismatch,
@@ -10,8 +11,8 @@ from vyper.exceptions import (
 )
 from vyper.semantics.analysis.base import VarInfo
 from vyper.semantics.analysis.utils import get_possible_types_from_node
-from vyper.semantics.types import AddressT, BoolT, DArrayT, SArrayT
-from vyper.semantics.types.shortcuts import INT128_T
+from vyper.semantics.types import AddressT, BoolT, DArrayT, IntegerT, SArrayT
+from vyper.semantics.types.shortcuts import INT128_T, UINT8_T
 
 INTEGER_LITERALS = [(42, 31337), (-1, 1), (69, 2**128)]
 DECIMAL_LITERALS = [("4.2", "-1.337")]
@@ -219,3 +220,32 @@ def test_tuple_subscript(build_node, namespace):
     types_list = get_possible_types_from_node(node)
 
     assert types_list == [namespace["bar"].typ]
+
+
+def test_list_integer_types(build_node, namespace):
+    node = build_node("[0, 255, -1, 7]")
+
+    with namespace.enter_scope():
+        types_list = get_possible_types_from_node(node)
+
+    # the signed types which can hold both -1 and 255, largest first
+    expected = [IntegerT(True, bits) for bits in range(256, 8, -8)]
+    assert [t.value_type for t in types_list if isinstance(t, SArrayT)] == expected
+    assert [t.value_type for t in types_list if isinstance(t, DArrayT)] == expected
+
+
+def test_list_integer_and_variable(build_node, namespace):
+    node = build_node("[1, foo, 2]")
+    namespace["foo"] = VarInfo(UINT8_T)
+
+    types_list = get_possible_types_from_node(node)
+
+    assert [t.value_type for t in types_list] == [UINT8_T, UINT8_T]
+
+
+def test_list_integer_incompatible(build_node, namespace):
+    node = build_node(f"[-1, {2**255}]")
+
+    with namespace.enter_scope():
+        with pytest.raises(InvalidLiteral):
+            get_possible_types_from_node(node)
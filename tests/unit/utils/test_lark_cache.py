@@ -0,0 +1,91 @@
+import pytest
+from lark import Lark
+
+from vyper import lark_cache
+from vyper.ast import grammar
+
+GRAMMAR = """
+    start: NAME ("," NAME)*
+    %import common.CNAME -> NAME
+    %import common.WS
+    %ignore WS
+"""
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(lark_cache, "LARK_CACHE_DIR", tmp_path)
+    return tmp_path
+
+
+class _NoBuild(Lark):
+    def __init__(self, *args, **kwargs):
+        raise AssertionError("parser tables were built")
+
+
+def _entries(cache_dir):
+    return sorted(p.name for p in cache_dir.iterdir())
+
+
+def test_lark_cache(cache_dir, monkeypatch):
+    parser = lark_cache.cached_lark(GRAMMAR)
+    (entry,) = _entries(cache_dir)
+
+    # loaded from the cache, without building the tables again
+    monkeypatch.setattr(lark_cache, "Lark", _NoBuild)
+    cached = lark_cache.cached_lark(GRAMMAR)
+    assert cached.parse("a, b") == parser.parse("a, b")
+    assert _entries(cache_dir) == [entry]
+
+
+def test_lark_cache_keyed_by_options(cache_dir):
+    lark_cache.cached_lark(GRAMMAR)
+    lark_cache.cached_lark(GRAMMAR, lexer="basic")
+    lark_cache.cached_lark(GRAMMAR + "\n")
+    assert len(_entries(cache_dir)) == 3
+
+
+def test_lark_cache_corrupted(cache_dir):
+    lark_cache.cached_lark(GRAMMAR)
+    (entry,) = cache_dir.iterdir()
+    entry.write_bytes(b"garbage")
+
+    parser = lark_cache.cached_lark(GRAMMAR)
+    assert isinstance(parser, Lark)
+    assert parser.parse("a").children == ["a"]
+    # the entry was rebuilt
+    assert entry.read_bytes() != b"garbage"
+
+
+def test_lark_cache_disabled(monkeypatch):
+    monkeypatch.setattr(lark_cache, "LARK_CACHE_DIR", None)
+    assert lark_cache.cached_lark(GRAMMAR).parse("a").children == ["a"]
+
+
+def test_vyper_grammar_cached(cache_dir, monkeypatch):
+    source = "@external\ndef foo():\n    pass\n"
+    monkeypatch.setattr(grammar, "_lark_grammar", None)
+    expected = grammar.vyper_grammar().parse(source)
+
+    # the postlexer is passed in again when loading the tables
+    monkeypatch.setattr(grammar, "_lark_grammar", None)
+    monkeypatch.setattr(lark_cache, "Lark", _NoBuild)
+    assert grammar.vyper_grammar().parse(source) == expected
+
+
+def _public_attributes(parser):
+    return {name for name in dir(parser) if not name.startswith("_")}
+
+
+def test_cached_lark_attributes(cache_dir, monkeypatch):
+    parser = lark_cache.cached_lark(GRAMMAR)
+    monkeypatch.setattr(lark_cache, "Lark", _NoBuild)
+    cached = lark_cache.cached_lark(GRAMMAR)
+
+    assert _public_attributes(cached) == _public_attributes(parser)
+    assert cached.source_grammar == parser.source_grammar
+    assert cached.ignore_tokens == parser.ignore_tokens
+    # (compare names, building the parser rewrites the rule trees in place)
+    for defs in ("rule_defs", "term_defs"):
+        names = [d[0] for d in getattr(parser.grammar, defs)]
+        assert [d[0] for d in getattr(cached.grammar, defs)] == names
@@ -1,9 +1,11 @@
 # EXPERIMENTAL VYPER PARSER
+import importlib.resources
 import textwrap
 
-from lark import Lark
 from lark.indenter import Indenter
 
+from vyper.lark_cache import cached_lark
+
 
 class PythonIndenter(Indenter):
     NL_type = "_NEWLINE"
@@ -20,14 +22,8 @@ _lark_grammar = None
 def vyper_grammar():
     global _lark_grammar
     if _lark_grammar is None:
-        _lark_grammar = Lark.open_from_package(
-            "vyper",
-            "grammar.lark",
-            ("ast/",),
-            parser="lalr",
-            start="module",
-            postlex=PythonIndenter(),
-        )
+        grammar = importlib.resources.files("vyper.ast").joinpath("grammar.lark").read_text()
+        _lark_grammar = cached_lark(grammar, start="module", postlex=PythonIndenter())
     return _lark_grammar
 
 
@@ -1,8 +1,10 @@
 import ast as python_ast
+import bisect
 import contextlib
 import copy
 import decimal
 import functools
+import heapq
 import math
 import operator
 import pickle
@@ -199,6 +201,57 @@ def _raise_syntax_exc(error_msg: str, ast_struct: dict) -> None:
     )
 
 
+class _DescendantIndex:
+    """
+    Index of the nodes of a tree, shared by all nodes of the tree.
+
+    The descendants of each node are a contiguous range of the topsort
+    order of the tree, so the descendants of a node which are of a given
+    type can be found without visiting the others.
+    """
+
+    def __init__(self, root):
+        self.valid = True
+        self.nodes = []  # topsort order
+        self.spans = {}  # node -> (start, end) of its subtree in `nodes`
+        self.by_class = {}  # node class -> positions of nodes of that class
+        self._classes = {}  # node type -> lists of positions in `by_class`
+        self._visit(root)
+
+    def _visit(self, node):
+        start = len(self.nodes)
+        self.nodes.append(node)
+        self.by_class.setdefault(type(node), []).append(start)
+        node._cache_descendants = self
+        for child in node._children:
+            self._visit(child)
+        self.spans[node] = (start, len(self.nodes))
+
+    def get_descendants(self, node, node_type, include_self):
+        start, end = self.spans[node]
+        if not include_self:
+            start += 1
+
+        if node_type is None:
+            return self.nodes[start:end]
+
+        if node_type not in self._classes:
+            self._classes[node_type] = [
+                ixs for cls, ixs in self.by_class.items() if issubclass(cls, node_type)
+            ]
+
+        ranges = []
+        for ixs in self._classes[node_type]:
+            lo = bisect.bisect_left(ixs, start)
+            hi = bisect.bisect_left(ixs, end, lo)
+            if lo < hi:
+                ranges.append(ixs[lo:hi])
+
+        if len(ranges) == 1:
+            return [self.nodes[i] for i in ranges[0]]
+        return [self.nodes[i] for i in heapq.merge(*ranges)]
+
+
 class VyperNode:
     """
     Base class for all vyper AST nodes.
@@ -282,6 +335,9 @@ class VyperNode:
         # matches ast order
         if parent is not None:
             parent._children.append(self)
+            if parent._cache_descendants is not None:
+                # the tree changed
+                parent._cache_descendants.valid = False
 
     @property
     def parent(self):
@@ -567,25 +623,21 @@ class VyperNode:
         list
             Descendant nodes matching the filter conditions.
         """
-        ret = self._get_descendants(include_self)
-        return _apply_filters(ret, node_type, filters, reverse)
-
-    def _get_descendants(self, include_self=True):
-        # get descendants in topsort order
-        if self._cache_descendants is None:
-            ret = [self]
-            for node in self._children:
-                ret.extend(node._get_descendants())
-
-            self._cache_descendants = ret
-
-        ret = iter(self._cache_descendants)
-
-        if not include_self:
-            s = next(ret)  # pop
-            assert s is self
-
-        return ret
+        index = self._cache_descendants
+        if index is None or not index.valid:
+            index = self._build_descendant_index()
+        ret = index.get_descendants(self, node_type, include_self)
+        return _apply_filters(ret, None, filters, reverse)
+
+    def _build_descendant_index(self):
+        # (re)build the index for the whole tree, so that it is shared
+        # between all queries on the tree
+        root = self
+        # (a node is not necessarily a child of its parent, e.g. an
+        # expanded getter)
+        while root._parent is not None and root in root._parent._children:
+            root = root._parent
+        return _DescendantIndex(root)
 
     def get(self, field_str: str) -> Any:
         """
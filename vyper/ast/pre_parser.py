@@ -44,6 +44,16 @@ def validate_version_pragma(version_str: str, location: tuple[str, int, int]) ->
         )
 
 
+def _validate_venom_pipeline(spec: str, location: tuple) -> None:
+    # imported here since venom is expensive to import
+    from vyper.venom.pipeline import parse_pipeline
+
+    try:
+        parse_pipeline(spec)
+    except ValueError as e:
+        raise PragmaException(str(e), *location) from e
+
+
 def _parse_pragma(comment_contents, settings, is_interface, code, start):
     pragma = comment_contents.removeprefix("pragma ").strip()
 
@@ -93,6 +103,14 @@ def _parse_pragma(comment_contents, settings, is_interface, code, start):
         settings.enable_decimals = True
         return
 
+    if pragma.startswith("venom-pipeline "):
+        if settings.venom_pipeline is not None:
+            raise PragmaException("pragma venom-pipeline specified twice!", *location)
+        spec = pragma.removeprefix("venom-pipeline").strip()
+        _validate_venom_pipeline(spec, location)
+        settings.venom_pipeline = spec
+        return
+
     if pragma.startswith("nonreentrancy "):
         if is_interface:
             raise PragmaException("pragma nonreentrancy not allowed in interface files!", *location)
@@ -10,7 +10,6 @@ from pathlib import PurePath
 
 from vyper.compiler import outputs_from_compiler_data
 from vyper.compiler.input_bundle import FileInput, ZipInputBundle
-from vyper.compiler.phases import CompilerData
 from vyper.compiler.settings import Settings, merge_settings
 from vyper.exceptions import BadArchive
 
@@ -71,6 +70,8 @@ def compiler_data_from_zip(file_name, settings, no_bytecode_metadata):
         settings, archive_settings, lhs_source="command line", rhs_source="archive settings"
     )
 
+    from vyper.compiler.phases import CompilerData
+
     return CompilerData(
         file,
         input_bundle=input_bundle,
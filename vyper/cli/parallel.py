@@ -0,0 +1,116 @@
+# not an entry point!
+# utility functions to compile several compilation targets in parallel
+
+import concurrent.futures
+import os
+import warnings
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import vyper
+from vyper.compiler.input_bundle import FileInput, InputBundle
+from vyper.compiler.session import BuildSession
+
+# (category name, message) pairs of warnings emitted while compiling a target
+RecordedWarnings = list[tuple[str, str]]
+
+
+@dataclass
+class CompilationTask:
+    file_input: FileInput
+    # extra kwargs for `compile_from_file_input`
+    kwargs: dict[str, Any] = field(default_factory=dict)
+
+
+def get_jobs(jobs: Optional[int]) -> int:
+    # `-j 0` means "use all available cores"
+    if jobs is None:
+        return 1
+    if jobs < 0:
+        raise ValueError(f"invalid number of jobs: {jobs}")
+    if jobs == 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def prepare_task(input_bundle: InputBundle, file_input: FileInput, **kwargs) -> CompilationTask:
+    """
+    Prepare a compilation target for compilation in a worker process.
+
+    Imports are resolved here, in the main process, so that the shared
+    input bundle hands out source ids in the same order as it would
+    for sequential compilation. Raises if import resolution fails.
+    """
+    from vyper.compiler.phases import CompilerData
+
+    compiler_data = CompilerData(file_input, input_bundle)
+    with warnings.catch_warnings():
+        # warnings get reported by the worker
+        warnings.simplefilter("ignore")
+        _ = compiler_data.resolved_imports
+
+    return CompilationTask(file_input, kwargs)
+
+
+# per-worker state, set by `_init_worker`
+_input_bundle: Optional[InputBundle] = None
+_session: Optional[BuildSession] = None
+
+
+def _init_worker(input_bundle: InputBundle, hex_ir: bool) -> None:
+    import vyper.codegen.ir_node as ir_node
+
+    global _input_bundle, _session
+    _input_bundle = input_bundle
+    # share imported modules between the tasks run by this worker
+    _session = BuildSession()
+    ir_node.AS_HEX_DEFAULT = hex_ir
+
+
+def _run_task(task: CompilationTask) -> Optional[tuple[dict, RecordedWarnings]]:
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        try:
+            output = vyper.compile_from_file_input(
+                task.file_input, input_bundle=_input_bundle, session=_session, **task.kwargs
+            )
+        except Exception:
+            # let the main process recompile the target and report
+            # the error, so that it is reported in order.
+            return None
+
+    return output, [(w.category.__name__, str(w.message)) for w in caught]
+
+
+def run_tasks(
+    tasks: list[CompilationTask], input_bundle: InputBundle, jobs: int
+) -> list[Optional[tuple[dict, RecordedWarnings]]]:
+    """
+    Compile `tasks` over a pool of `jobs` worker processes.
+
+    Returns the output and the recorded warnings for each task, in the
+    same order as `tasks`. The result for a task is None if it could not
+    be compiled (or its output could not be sent back to this process);
+    the caller is expected to compile it again in-process, which reports
+    the error the same way as sequential compilation.
+    """
+    if len(tasks) == 0:
+        return []
+
+    import vyper.codegen.ir_node as ir_node
+
+    jobs = min(jobs, len(tasks))
+    initargs = (input_bundle, ir_node.AS_HEX_DEFAULT)
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=initargs
+    ) as executor:
+        futures = [executor.submit(_run_task, task) for task in tasks]
+
+        ret = []
+        for future in futures:
+            try:
+                ret.append(future.result())
+            except Exception:
+                ret.append(None)
+
+    return ret
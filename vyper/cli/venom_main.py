@@ -1,14 +1,11 @@
 #!/usr/bin/env python3
 import argparse
 import sys
+from contextlib import nullcontext
 
 import vyper
 import vyper.evm.opcodes as evm
-from vyper.compiler.phases import generate_bytecode
 from vyper.compiler.settings import OptimizationLevel, Settings, set_global_settings
-from vyper.venom import generate_assembly_experimental, run_passes_on
-from vyper.venom.check_venom import check_venom_ctx
-from vyper.venom.parser import parse_venom
 
 """
 Standalone entry point into venom compiler. Parses venom input and emits
@@ -35,6 +32,17 @@ def _parse_args(argv: list[str]):
     parser.add_argument(
         "--stdin", action="store_true", help="whether to pull venom input from stdin"
     )
+    parser.add_argument(
+        "--venom-pipeline",
+        help="comma-separated list of passes to run on each function (see vyper --help)",
+        dest="venom_pipeline",
+    )
+    parser.add_argument(
+        "--pass-stats",
+        action="store_true",
+        help="print time and IR size statistics for each pass to stderr",
+        dest="pass_stats",
+    )
 
     args = parser.parse_args(argv)
 
@@ -55,11 +63,29 @@ def _parse_args(argv: list[str]):
         with open(args.input_file, "r") as f:
             venom_source = f.read()
 
+    # imported here so that `--version` and argument errors are fast
+    from vyper.compiler.phases import generate_bytecode
+    from vyper.compiler.timings import Timings, record_timings
+    from vyper.venom import generate_assembly_experimental, run_passes_on
+    from vyper.venom.check_venom import check_venom_ctx
+    from vyper.venom.parser import parse_venom
+    from vyper.venom.pipeline import parse_pipeline
+
+    pipeline = None
+    if args.venom_pipeline is not None:
+        pipeline = parse_pipeline(args.venom_pipeline)
+
     ctx = parse_venom(venom_source)
 
     check_venom_ctx(ctx)
 
-    run_passes_on(ctx, OptimizationLevel.default())
+    timings = Timings()
+    timings_ctx = record_timings(timings, trace_memory=False) if args.pass_stats else nullcontext()
+    with timings_ctx:
+        run_passes_on(ctx, OptimizationLevel.default(), pipeline)
+    if args.pass_stats:
+        print(timings.format_pass_stats(), file=sys.stderr)
+
     asm = generate_assembly_experimental(ctx)
     bytecode, _ = generate_bytecode(asm)
     print(f"0x{bytecode.hex()}")
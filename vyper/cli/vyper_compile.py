@@ -6,19 +6,28 @@ import json
 import os
 import sys
 from pathlib import Path
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 import vyper
-import vyper.codegen.ir_node as ir_node
 import vyper.evm.opcodes as evm
-from vyper.cli import vyper_json
-from vyper.cli.compile_archive import NotZipInput, compile_from_zip
+from vyper.cli import vyper_json, vyper_server
+from vyper.cli.compile_archive import NotZipInput, compile_from_zip, compiler_data_from_zip
+from vyper.cli.parallel import CompilationTask, get_jobs, prepare_task, run_tasks
+from vyper.compiler import outputs_from_compiler_data
+from vyper.compiler.cache import CompilationCache, get_cache, replay_warnings
 from vyper.compiler.input_bundle import FileInput, FilesystemInputBundle
+from vyper.compiler.session import BuildSession
 from vyper.compiler.settings import VYPER_TRACEBACK_LIMIT, OptimizationLevel, Settings
 from vyper.typing import ContractPath, OutputFormats
 from vyper.utils import uniq
 from vyper.warnings import warnings_filter
 
+if TYPE_CHECKING:
+    from vyper.compiler.phases import CompilerData
+
+# NOTE: the compiler proper is imported lazily (cf. vyper.compiler), so that
+# e.g. `vyper --version` and argument errors don't pay for importing it.
+
 format_options_help = """Format to print, one or more of (comma-separated):
 bytecode (default) - Deployable bytecode
 bytecode_runtime   - Bytecode at runtime
@@ -53,6 +62,8 @@ integrity          - Output the integrity hash of the source code
 archive            - Output the build as an archive file
 solc_json          - Output the build in solc json format
 settings           - Output the settings for a given build in json format
+timings            - Time and peak memory spent in each compiler phase, in json format
+venom_pass_stats   - Time and IR size statistics for each run of each Venom pass, in json format
 """
 
 combined_json_outputs = [
@@ -108,6 +119,11 @@ def _parse_args(argv):
         vyper_json._parse_args(argv)
         return
 
+    if "--server" in argv:
+        argv.remove("--server")
+        vyper_server._parse_args(argv)
+        return
+
     parser = argparse.ArgumentParser(
         description="Pythonic Smart Contract Language for the EVM",
         formatter_class=argparse.RawTextHelpFormatter,
@@ -166,6 +182,12 @@ def _parse_args(argv):
         help="Switch to standard JSON mode. Use `--standard-json -h` for available options.",
         action="store_true",
     )
+    parser.add_argument(
+        "--server",
+        help="Run a compiler server which compiles line-delimited standard JSON requests.\n"
+        "Use `--server -h` for available options.",
+        action="store_true",
+    )
     parser.add_argument(
         "--hex-ir", help="Represent integers as hex values in the IR", action="store_true"
     )
@@ -189,10 +211,38 @@ def _parse_args(argv):
         dest="experimental_codegen",
     )
     parser.add_argument("--enable-decimals", help="Enable decimals", action="store_true")
+    parser.add_argument(
+        "--venom-pipeline",
+        help="Comma-separated list of venom passes to run on each function, or an optimization\n"
+        "level (none, gas, codesize). Passes in brackets are rerun until they stop changing\n"
+        "the IR, e.g. `[SCCP,AssignElimination],CSE`. Requires --experimental-codegen.",
+        dest="venom_pipeline",
+    )
+    parser.add_argument(
+        "--venom-jobs",
+        help="Number of processes to run the venom passes of each contract's functions\n"
+        "in (0 for one per core). Does not change the output. Requires --experimental-codegen.",
+        type=int,
+        dest="venom_jobs",
+    )
 
     parser.add_argument(
         "-W", help="Control warnings", dest="warnings_control", choices=["error", "none"]
     )
+    parser.add_argument(
+        "--cache-dir",
+        help="Cache compiler outputs in this directory (defaults to $VYPER_CACHE_DIR, if set). "
+        "Cached outputs are trusted, so the directory must not be writable by untrusted users",
+        dest="cache_dir",
+    )
+    parser.add_argument("--no-cache", help="Disable the compiler output cache", action="store_true")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="Number of compilation targets to compile in parallel (0 for one per core)",
+        type=int,
+        default=1,
+    )
 
     args = parser.parse_args(argv)
 
@@ -209,8 +259,15 @@ def _parse_args(argv):
         sys.tracebacklimit = 0
 
     if args.hex_ir:
+        import vyper.codegen.ir_node as ir_node
+
         ir_node.AS_HEX_DEFAULT = True
 
+    if args.venom_jobs is not None:
+        import vyper.venom.parallel as venom_parallel
+
+        venom_parallel.JOBS = get_jobs(args.venom_jobs)
+
     output_formats = tuple(uniq(args.format.split(",")))
 
     if args.base64 and output_formats != ("archive",):
@@ -242,11 +299,20 @@ def _parse_args(argv):
     if args.enable_decimals:
         settings.enable_decimals = args.enable_decimals
 
+    if args.venom_pipeline is not None:
+        # imported here since venom is expensive to import
+        from vyper.venom.pipeline import parse_pipeline
+
+        parse_pipeline(args.venom_pipeline)  # raises on an invalid pipeline
+        settings.venom_pipeline = args.venom_pipeline
+
     if args.verbose:
         print(f"cli specified: `{settings}`", file=sys.stderr)
 
     include_sys_path = not args.disable_sys_path
 
+    cache = get_cache(args.cache_dir, args.no_cache)
+
     compiled = compile_files(
         args.input_files,
         output_formats,
@@ -257,6 +323,8 @@ def _parse_args(argv):
         args.storage_layout,
         args.no_bytecode_metadata,
         args.warnings_control,
+        cache,
+        get_jobs(args.jobs),
     )
 
     mode = "w"
@@ -325,6 +393,8 @@ def compile_files(
     storage_layout_paths: list[str] = None,
     no_bytecode_metadata: bool = False,
     warnings_control: Optional[str] = None,
+    cache: Optional[CompilationCache] = None,
+    jobs: int = 1,
 ) -> dict:
     search_paths = get_search_paths(paths, include_sys_path)
     input_bundle = FilesystemInputBundle(search_paths)
@@ -362,6 +432,57 @@ def compile_files(
     if show_version:
         ret["version"] = vyper.__version__
 
+    if jobs > 1 and len(input_files) > 1:
+        try:
+            targets = _prepare_targets(
+                input_files,
+                input_bundle,
+                final_formats,
+                settings,
+                storage_layout_paths,
+                show_gas_estimates,
+                no_bytecode_metadata,
+                cache,
+            )
+        except Exception:
+            # one of the targets is broken. fall back to sequential
+            # compilation (with a fresh input bundle, so that source ids
+            # are the same as usual), which reports the error in order.
+            input_bundle = FilesystemInputBundle(search_paths)
+        else:
+            tasks = [t for (_, t) in targets if isinstance(t, CompilationTask)]
+            results = iter(run_tasks(tasks, input_bundle, jobs))
+
+            for file_path, target in targets:
+                if not isinstance(target, CompilationTask):
+                    ret[file_path] = outputs_from_compiler_data(target, final_formats)
+                    continue
+
+                result = next(results)
+                if result is None:
+                    # recompile in-process to report the error
+                    output = vyper.compile_from_file_input(
+                        target.file_input,
+                        input_bundle=input_bundle,
+                        exc_handler=exc_handler,
+                        **target.kwargs,
+                    )
+                else:
+                    output, recorded_warnings = result
+                    replay_warnings(recorded_warnings)
+                    if show_gas_estimates:
+                        import vyper.codegen.ir_node as ir_node
+
+                        # normally set as a side effect of `build_ir_output()`
+                        ir_node.IRnode.repr_show_gas = True
+
+                ret[file_path] = output
+
+            return ret
+
+    # share imported modules between compilation targets
+    session = BuildSession()
+
     for file_name in input_files:
         file_path = Path(file_name)
 
@@ -398,6 +519,8 @@ def compile_files(
             storage_layout_override=storage_layout_override,
             show_gas_estimates=show_gas_estimates,
             no_bytecode_metadata=no_bytecode_metadata,
+            cache=cache,
+            session=session,
         )
 
         ret[file_path] = output
@@ -405,5 +528,57 @@ def compile_files(
     return ret
 
 
+def _prepare_targets(
+    input_files,
+    input_bundle,
+    output_formats,
+    settings,
+    storage_layout_paths,
+    show_gas_estimates,
+    no_bytecode_metadata,
+    cache,
+) -> list[tuple[Path, "CompilationTask | CompilerData"]]:
+    # load all compilation targets (in the same order as sequential
+    # compilation would), and prepare them for parallel compilation.
+    # archives are not compiled in parallel, since they come with their
+    # own input bundle.
+    # don't consume the caller's list, it is needed for the sequential
+    # fallback
+    storage_layout_paths = list(storage_layout_paths or [])
+
+    ret: list[tuple[Path, "CompilationTask | CompilerData"]] = []
+    for file_name in input_files:
+        file_path = Path(file_name)
+
+        try:
+            compiler_data = compiler_data_from_zip(file_name, settings, no_bytecode_metadata)
+            ret.append((file_path, compiler_data))
+            continue
+        except NotZipInput:
+            pass
+
+        file = input_bundle.load_file(file_path)
+        assert isinstance(file, FileInput)  # mypy hint
+
+        storage_layout_override = None
+        if storage_layout_paths:
+            storage_file_path = storage_layout_paths.pop(0)
+            storage_layout_override = input_bundle.load_json_file(storage_file_path)
+
+        task = prepare_task(
+            input_bundle,
+            file,
+            output_formats=output_formats,
+            settings=settings,
+            storage_layout_override=storage_layout_override,
+            show_gas_estimates=show_gas_estimates,
+            no_bytecode_metadata=no_bytecode_metadata,
+            cache=cache,
+        )
+        ret.append((file_path, task))
+
+    return ret
+
+
 if __name__ == "__main__":
     _parse_args(sys.argv[1:])
@@ -8,7 +8,10 @@ from pathlib import Path, PurePath
 from typing import Any, Callable, Hashable, Optional
 
 import vyper
+from vyper.cli.parallel import get_jobs, prepare_task, run_tasks
+from vyper.compiler.cache import CompilationCache, get_cache, replay_warnings
 from vyper.compiler.input_bundle import FileInput, JSONInput, JSONInputBundle, _normpath
+from vyper.compiler.session import BuildSession
 from vyper.compiler.settings import OptimizationLevel, Settings
 from vyper.evm.opcodes import EVM_VERSIONS
 from vyper.exceptions import JSONError
@@ -39,10 +42,14 @@ TRANSLATE_MAP = {
     "bb_runtime": "bb_runtime",
     "cfg": "cfg",
     "cfg_runtime": "cfg_runtime",
+    "timings": "timings",
 }
 
 VENOM_KEYS = ("bb", "bb_runtime", "cfg", "cfg_runtime")
 
+# outputs which are not included in "*", since they slow down compilation
+OPT_IN_KEYS = ("timings",)
+
 
 def _parse_cli_args():
     return _parse_args(sys.argv[1:])
@@ -73,6 +80,20 @@ def _parse_args(argv):
         help="Show python traceback on error instead of returning JSON",
         action="store_true",
     )
+    parser.add_argument(
+        "--cache-dir",
+        help="Cache compiler outputs in this directory (defaults to $VYPER_CACHE_DIR, if set). "
+        "Cached outputs are trusted, so the directory must not be writable by untrusted users",
+        dest="cache_dir",
+    )
+    parser.add_argument("--no-cache", help="Disable the compiler output cache", action="store_true")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="Number of compilation targets to compile in parallel (0 for one per core)",
+        type=int,
+        default=1,
+    )
 
     args = parser.parse_args(argv)
     if args.input_file:
@@ -84,8 +105,9 @@ def _parse_args(argv):
         json_path = "<stdin>"
 
     exc_handler = exc_handler_raises if args.traceback else exc_handler_to_dict
+    cache = get_cache(args.cache_dir, args.no_cache)
     output_json = json.dumps(
-        compile_json(input_json, exc_handler, json_path),
+        compile_json(input_json, exc_handler, json_path, cache, get_jobs(args.jobs)),
         indent=2 if args.pretty_json else None,
         sort_keys=True,
         default=str,
@@ -265,7 +287,7 @@ def get_output_formats(input_dict: dict) -> dict[PurePath, list[str]]:
         )
 
         if "*" in outputs:
-            outputs = TRANSLATE_MAP.values()
+            outputs = [k for k in TRANSLATE_MAP.values() if k not in OPT_IN_KEYS]
             if not should_output_venom:
                 outputs = [k for k in outputs if k not in VENOM_KEYS]
         else:
@@ -329,17 +351,34 @@ def get_settings(input_dict: dict) -> Settings:
     # TODO: maybe change these to camelCase for consistency
     enable_decimals = input_dict["settings"].get("enable_decimals", None)
 
+    venom_pipeline = input_dict["settings"].get("venomPipeline")
+    if venom_pipeline is not None:
+        if not isinstance(venom_pipeline, str):
+            raise JSONError("venomPipeline must be a string")
+        # imported here since venom is expensive to import
+        from vyper.venom.pipeline import parse_pipeline
+
+        try:
+            parse_pipeline(venom_pipeline)
+        except ValueError as e:
+            raise JSONError(f"invalid venomPipeline: {e}") from e
+
     return Settings(
         evm_version=evm_version,
         optimize=optimize,
         experimental_codegen=experimental_codegen,
         debug=debug,
         enable_decimals=enable_decimals,
+        venom_pipeline=venom_pipeline,
     )
 
 
 def compile_from_input_dict(
-    input_dict: dict, exc_handler: Callable = exc_handler_raises
+    input_dict: dict,
+    exc_handler: Callable = exc_handler_raises,
+    cache: Optional[CompilationCache] = None,
+    jobs: int = 1,
+    session: Optional[BuildSession] = None,
 ) -> tuple[dict, dict]:
     if input_dict["language"] != "Vyper":
         raise JSONError(f"Invalid language '{input_dict['language']}' - Only Vyper is supported.")
@@ -358,24 +397,55 @@ def compile_from_input_dict(
 
     input_bundle = JSONInputBundle(sources, search_paths=search_paths)
 
+    def _compile_kwargs(contract_path):
+        return dict(
+            output_formats=output_formats[contract_path],
+            storage_layout_override=storage_layout_overrides.get(contract_path),
+            integrity_sum=integrity,
+            settings=settings,
+            no_bytecode_metadata=no_bytecode_metadata,
+            cache=cache,
+        )
+
+    results = None
+    if jobs > 1 and len(compilation_targets) > 1:
+        try:
+            tasks = []
+            for contract_path in compilation_targets:
+                file = input_bundle.load_file(contract_path)
+                assert isinstance(file, FileInput)  # mypy hint
+                tasks.append(prepare_task(input_bundle, file, **_compile_kwargs(contract_path)))
+        except Exception:
+            # one of the targets is broken. fall back to sequential
+            # compilation (with a fresh input bundle, so that source ids
+            # are the same as usual), which reports the error in order.
+            input_bundle = JSONInputBundle(sources, search_paths=search_paths)
+        else:
+            results = run_tasks(tasks, input_bundle, jobs)
+
+    # share imported modules between compilation targets
+    if session is None:
+        session = BuildSession()
+
     res, warnings_dict = {}, {}
     warnings.simplefilter("always")
-    for contract_path in compilation_targets:
-        storage_layout_override = storage_layout_overrides.get(contract_path)
+    for i, contract_path in enumerate(compilation_targets):
         with warnings.catch_warnings(record=True) as caught_warnings:
             try:
                 # use load_file to get a unique source_id
                 file = input_bundle.load_file(contract_path)
                 assert isinstance(file, FileInput)  # mypy hint
-                data = vyper.compile_from_file_input(
-                    file,
-                    input_bundle=input_bundle,
-                    output_formats=output_formats[contract_path],
-                    storage_layout_override=storage_layout_override,
-                    integrity_sum=integrity,
-                    settings=settings,
-                    no_bytecode_metadata=no_bytecode_metadata,
-                )
+                result = results[i] if results is not None else None
+                if result is not None:
+                    data, recorded_warnings = result
+                    replay_warnings(recorded_warnings)
+                else:
+                    data = vyper.compile_from_file_input(
+                        file,
+                        input_bundle=input_bundle,
+                        session=session,
+                        **_compile_kwargs(contract_path),
+                    )
                 assert isinstance(data, dict)
                 data["source_id"] = file.source_id
             except Exception as exc:
@@ -407,7 +477,7 @@ def format_to_output_dict(compiler_data: dict) -> dict:
         if "ir_dict" in data:
             output_contracts["ir"] = data["ir_dict"]
 
-        for key in ("abi", "devdoc", "interface", "metadata", "userdoc"):
+        for key in ("abi", "devdoc", "interface", "metadata", "timings", "userdoc"):
             if key in data:
                 output_contracts[key] = data[key]
 
@@ -475,6 +545,9 @@ def compile_json(
     input_json: dict | str,
     exc_handler: Callable = exc_handler_raises,
     json_path: Optional[str] = None,
+    cache: Optional[CompilationCache] = None,
+    jobs: int = 1,
+    session: Optional[BuildSession] = None,
 ) -> dict:
     try:
         if isinstance(input_json, str):
@@ -487,7 +560,9 @@ def compile_json(
             input_dict = input_json
 
         try:
-            compiler_data, warn_data = compile_from_input_dict(input_dict, exc_handler)
+            compiler_data, warn_data = compile_from_input_dict(
+                input_dict, exc_handler, cache, jobs, session
+            )
             if "errors" in compiler_data:
                 return compiler_data
         except KeyError as exc:
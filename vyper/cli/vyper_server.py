@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+import argparse
+import contextlib
+import json
+import os
+import socketserver
+import sys
+from collections import OrderedDict
+from typing import IO, Optional
+
+import vyper
+from vyper.cli.vyper_json import compile_json, exc_handler_to_dict
+from vyper.compiler.cache import CompilationCache, get_cache
+from vyper.compiler.session import BuildSession
+from vyper.utils import sha256sum
+
+# a long-running compiler process, for editor and build tool integration.
+# it speaks line-delimited standard json: each request is a standard json
+# input on a single line, and each response is the corresponding standard
+# json output on a single line. between requests, the server keeps
+# parsed and analyzed modules (keyed by file contents), and the outputs
+# of recent requests, so that the startup cost of the compiler is only
+# paid once per session.
+#
+# NOTE: requests are handled one at a time, since the compiler state
+# which is shared between requests is not thread-safe.
+
+# number of responses to keep around
+DEFAULT_MAX_OUTPUTS = 256
+
+# number of distinct settings to keep modules around for
+DEFAULT_MAX_MODULE_CACHES = 8
+
+# number of compilation targets to keep unused modules around for
+DEFAULT_MAX_MODULE_AGE = 256
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Vyper programming language for EVM - Compiler Server",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument(
+        "--version", action="version", version=f"{vyper.__version__}+commit.{vyper.__commit__}"
+    )
+    parser.add_argument(
+        "--socket",
+        help="Listen on this unix socket instead of stdin/stdout.",
+        default=None,
+        dest="socket_path",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Cache compiler outputs in this directory (defaults to $VYPER_CACHE_DIR, if set). "
+        "Cached outputs are trusted, so the directory must not be writable by untrusted users",
+        dest="cache_dir",
+    )
+    parser.add_argument("--no-cache", help="Disable the compiler output cache", action="store_true")
+
+    args = parser.parse_args(argv)
+
+    server = CompilerServer(cache=get_cache(args.cache_dir, args.no_cache))
+    if args.socket_path is not None:
+        serve_unix_socket(server, args.socket_path)
+    else:
+        serve_stream(server, sys.stdin, sys.stdout)
+
+
+class CompilerServer:
+    """
+    Compile standard json requests, keeping compiler state warm between
+    requests.
+    """
+
+    def __init__(
+        self, cache: Optional[CompilationCache] = None, max_outputs: int = DEFAULT_MAX_OUTPUTS
+    ):
+        self.cache = cache
+        self.max_outputs = max_outputs
+        self.session = BuildSession(
+            max_module_caches=DEFAULT_MAX_MODULE_CACHES, max_module_age=DEFAULT_MAX_MODULE_AGE
+        )
+
+        # request hash -> response
+        self._outputs: OrderedDict[str, str] = OrderedDict()
+
+    def handle_request(self, request: str) -> str:
+        request = request.strip()
+
+        # standard json compilation is pure, so the response only depends
+        # on the request (which contains the source files).
+        key = sha256sum(request)
+        if key in self._outputs:
+            self._outputs.move_to_end(key)
+            return self._outputs[key]
+
+        output = compile_json(
+            request, exc_handler_to_dict, "<request>", self.cache, session=self.session
+        )
+        response = json.dumps(output, sort_keys=True, default=str)
+
+        if not _has_errors(output):
+            self._outputs[key] = response
+            while len(self._outputs) > self.max_outputs:
+                self._outputs.popitem(last=False)
+
+        return response
+
+
+def _has_errors(output: dict) -> bool:
+    return any(e.get("severity") == "error" for e in output.get("errors", []))
+
+
+def serve_stream(server: CompilerServer, in_stream: IO[str], out_stream: IO[str]) -> None:
+    # serve requests until `in_stream` is exhausted
+    for line in in_stream:
+        if not line.strip():
+            continue
+        out_stream.write(server.handle_request(line) + "\n")
+        out_stream.flush()
+
+
+def serve_unix_socket(server: CompilerServer, socket_path: str) -> None:
+    class _Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                line = line.decode("utf-8")
+                if not line.strip():
+                    continue
+                response = server.handle_request(line) + "\n"
+                self.wfile.write(response.encode("utf-8"))
+                self.wfile.flush()
+
+    # note: UnixStreamServer handles one connection at a time
+    try:
+        with socketserver.UnixStreamServer(socket_path, _Handler) as s:
+            s.serve_forever()
+    finally:
+        with contextlib.suppress(OSError):
+            os.unlink(socket_path)
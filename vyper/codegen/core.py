@@ -1,3 +1,6 @@
+import contextlib
+from typing import Generator, Optional
+
 import vyper.codegen.context as ctx
 from vyper.codegen.ir_node import Encoding, IRnode
 from vyper.compiler.settings import _opt_codesize, _opt_gas, _opt_none
@@ -31,7 +34,7 @@ from vyper.semantics.types import (
 from vyper.semantics.types.shortcuts import BYTES32_T, INT256_T, UINT256_T
 from vyper.semantics.types.subscriptable import SArrayT
 from vyper.semantics.types.user import FlagT
-from vyper.utils import GAS_COPY_WORD, GAS_IDENTITY, GAS_IDENTITYWORD, ceil32
+from vyper.utils import GAS_COPY_WORD, GAS_IDENTITY, GAS_IDENTITYWORD, MemoryPositions, ceil32
 
 DYNAMIC_ARRAY_OVERHEAD = 1
 
@@ -635,6 +638,21 @@ def has_length_word(typ):
     return isinstance(typ, (DArrayT, _BytestringT))
 
 
+def _bounds_check(ix, bound, array_t):
+    # NOTE: there are optimization rules for the bounds check when
+    # ix or bound is literal
+    with ix.cache_when_complex("ix") as (b1, ix):
+        LT = "slt" if ix.typ.is_signed else "lt"
+        # note: this is optimized out for unsigned integers
+        is_negative = [LT, ix, 0]
+        # always use unsigned ge, since bound is always an unsigned quantity
+        is_oob = ["ge", ix, bound]
+        checked_ix = ["seq", ["assert", ["iszero", ["or", is_negative, is_oob]]], ix]
+        ix = b1.resolve(IRnode.from_list(checked_ix))
+    ix.set_error_msg(f"{array_t} bounds check")
+    return ix
+
+
 # TODO simplify this code, especially the ABI decoding
 def _get_element_ptr_array(parent, key, array_bounds_check):
     assert is_array_like(parent.typ)
@@ -662,17 +680,7 @@ def _get_element_ptr_array(parent, key, array_bounds_check):
     if array_bounds_check:
         is_darray = isinstance(parent.typ, DArrayT)
         bound = get_dyn_array_count(parent) if is_darray else parent.typ.count
-        # NOTE: there are optimization rules for the bounds check when
-        # ix or bound is literal
-        with ix.cache_when_complex("ix") as (b1, ix):
-            LT = "slt" if ix.typ.is_signed else "lt"
-            # note: this is optimized out for unsigned integers
-            is_negative = [LT, ix, 0]
-            # always use unsigned ge, since bound is always an unsigned quantity
-            is_oob = ["ge", ix, bound]
-            checked_ix = ["seq", ["assert", ["iszero", ["or", is_negative, is_oob]]], ix]
-            ix = b1.resolve(IRnode.from_list(checked_ix))
-        ix.set_error_msg(f"{parent.typ} bounds check")
+        ix = _bounds_check(ix, bound, parent.typ)
 
     if parent.encoding == Encoding.ABI:
         if parent.location in (STORAGE, TRANSIENT):  # pragma: nocover
@@ -730,6 +738,90 @@ def get_element_ptr(parent, key, array_bounds_check=True):
         return b.resolve(ret)
 
 
+# data sections for constant arrays which are read directly from code
+# instead of being copied to memory, keyed by the VarInfo of the constant.
+# they are collected while generating the IR for a module (cf.
+# `generate_ir_for_module`), separately for runtime code and initcode.
+_code_constants: Optional[dict] = None
+
+
+@contextlib.contextmanager
+def collect_code_constants() -> Generator:
+    global _code_constants
+    tmp = _code_constants
+    try:
+        _code_constants = {False: {}, True: {}}
+        yield
+    finally:
+        _code_constants = tmp
+
+
+def code_constants_ir(is_ctor_context):
+    assert _code_constants is not None
+    sections = _code_constants[is_ctor_context].values()
+    return [["data", label, data] for label, data in sections]
+
+
+def _packed_width(values, signed):
+    # the number of bytes needed to represent all of `values`
+    if signed:
+        bits = max((~v if v < 0 else v).bit_length() + 1 for v in values)
+    else:
+        bits = max(v.bit_length() for v in values)
+    return max(1, (bits + 7) // 8)
+
+
+def code_constant_element(varinfo, values, key, context):
+    """
+    Read an element of the constant array `varinfo` from a data section
+    of the code, the cost of which does not depend on the length of the
+    array. `values` are the words of the array as laid out in memory.
+
+    Returns None if data sections are not being collected.
+    """
+    if _code_constants is None:
+        return None
+
+    array_t = varinfo.typ
+    subtype = array_t.value_type
+
+    if subtype._is_prim_word:
+        # pack the elements into as few bytes as possible
+        signed = is_numeric_type(subtype) and subtype.is_signed
+        width = _packed_width(values, signed)
+    else:
+        # (nested) arrays are copied to memory as is
+        width = subtype.memory_bytes_required
+
+    sections = _code_constants[context.is_ctor_context]
+    if varinfo not in sections:
+        label = f"constant_{varinfo.decl_node.target.id}_{len(sections)}"
+        if subtype._is_prim_word:
+            data = b"".join((v % 2 ** (8 * width)).to_bytes(width, "big") for v in values)
+        else:
+            data = b"".join((v % 2**256).to_bytes(32, "big") for v in values)
+        sections[varinfo] = (label, data)
+    label, _ = sections[varinfo]
+
+    ix = _bounds_check(unwrap_location(key), array_t.count, array_t)
+    src = ["add", ["symbol", label], _mul(ix, width)]
+
+    if subtype._is_prim_word:
+        # note: for the last element, this reads past the end of the
+        # data section, the trailing bytes are shifted out.
+        dst = MemoryPositions.FREE_VAR_SPACE
+        ret = ["seq", ["codecopy", dst, src, 32], ["mload", dst]]
+        if width < 32:
+            ret = shr(256 - 8 * width, ret)
+            if signed:
+                ret = ["signextend", width - 1, ret]
+        return IRnode.from_list(ret, typ=subtype)
+
+    buf = context.new_internal_variable(subtype)
+    ret = ["seq", ["codecopy", buf, src, width], buf]
+    return IRnode.from_list(ret, typ=subtype, location=MEMORY)
+
+
 def LOAD(ptr: IRnode) -> IRnode:
     if ptr.location is None:  # pragma: nocover
         raise CompilerPanic("cannot dereference non-pointer type")
@@ -8,6 +8,7 @@ from vyper.codegen.core import (
     append_dyn_array,
     check_assign,
     clamp,
+    code_constant_element,
     data_location_to_address_space,
     dummy_node_for_type,
     ensure_in_memory,
@@ -29,6 +30,7 @@ from vyper.codegen.core import (
 )
 from vyper.codegen.ir_node import IRnode
 from vyper.codegen.keccak256_helper import keccak256_helper
+from vyper.compiler.settings import _opt_codesize
 from vyper.evm.address_space import MEMORY
 from vyper.evm.opcodes import version_check
 from vyper.exceptions import (
@@ -42,6 +44,7 @@ from vyper.exceptions import (
     tag_exceptions,
 )
 from vyper.semantics.analysis.utils import get_expr_writes
+from vyper.semantics.data_locations import DataLocation
 from vyper.semantics.types import (
     AddressT,
     BoolT,
@@ -67,6 +70,22 @@ from vyper.warnings import VyperWarning, vyper_warn
 ENVIRONMENT_VARIABLES = {"block", "msg", "tx", "chain"}
 
 
+# static arrays (possibly nested) of single-word types, which are laid
+# out in memory as a flat sequence of words
+def _is_word_array(typ):
+    if not isinstance(typ, SArrayT):
+        return False
+    while isinstance(typ, SArrayT):
+        typ = typ.value_type
+    return typ._is_prim_word
+
+
+def _flatten_multi(ir_node):
+    if ir_node.value != "multi":
+        return [ir_node]
+    return [x for arg in ir_node.args for x in _flatten_multi(arg)]
+
+
 class Expr:
     # TODO: Once other refactors are made reevaluate all inline imports
 
@@ -345,6 +364,9 @@ class Expr:
             return get_element_ptr(sub, self.expr.attr)
 
     def parse_Subscript(self):
+        if (ret := self._parse_code_constant_subscript()) is not None:
+            return ret
+
         sub = Expr(self.expr.value, self.context).ir_node
         if sub.value == "multi":
             # force literal to memory, e.g.
@@ -379,6 +401,40 @@ class Expr:
         ir_node.mutable = sub.mutable
         return ir_node
 
+    def _parse_code_constant_subscript(self):
+        # read elements of constant arrays directly from code, e.g.
+        # TABLE: constant(uint256[256])
+        # ...
+        # return TABLE[ix]
+        # materializing the array in memory would cost gas (and, at every
+        # use site, code) proportional to the length of the array.
+        expr_info = self.expr.value._expr_info
+        if expr_info is None or expr_info.var_info is None:
+            return None
+        varinfo = expr_info.var_info
+        # only module-level `constant(...)` declarations (e.g. loop variables
+        # are not modifiable either, but have a location)
+        if varinfo.location != DataLocation.UNSET:
+            return None
+        decl = varinfo.decl_node
+        if not isinstance(decl, vy_ast.VariableDecl) or not decl.is_constant:
+            return None
+        if not _is_word_array(varinfo.typ):
+            return None
+        # nested arrays are stored as full words, copying the literals to
+        # memory is usually more compact.
+        if _opt_codesize() and not varinfo.typ.value_type._is_prim_word:
+            return None
+
+        words = _flatten_multi(Expr(varinfo.decl_node.value, self.context).ir_node)
+        if not all(isinstance(w.value, int) for w in words):  # pragma: nocover
+            return None
+        assert len(words) * 32 == varinfo.typ.memory_bytes_required
+        values = [w.value for w in words]
+
+        index = Expr.parse_value_expr(self.expr.slice, self.context)
+        return code_constant_element(varinfo, values, index, self.context)
+
     def parse_BinOp(self):
         left = Expr.parse_value_expr(self.expr.left, self.context)
         right = Expr.parse_value_expr(self.expr.right, self.context)
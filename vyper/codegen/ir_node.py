@@ -2,7 +2,6 @@ import contextlib
 import copy
 import re
 from enum import Enum, auto
-from functools import cached_property
 from typing import Any, List, Optional, Union
 
 import vyper.ast as vy_ast
@@ -127,17 +126,75 @@ class _WithBuilder:
             return ret
 
 
+class _cached_slot:
+    """
+    Like `functools.cached_property`, but caches the value in the slot
+    `_cached_<name>`, so that the instance `__dict__` is not allocated.
+    """
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.__doc__ = fn.__doc__
+
+    def __set_name__(self, owner, name):
+        self.slot = f"_cached_{name}"
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            return getattr(obj, self.slot)
+        except AttributeError:
+            ret = self.fn(obj)
+            setattr(obj, self.slot, ret)
+            return ret
+
+
+# properties of IRnode which are cached with `_cached_slot`
+_CACHED_PROPERTIES = (
+    "unique_symbols",
+    "referenced_variables",
+    "variable_writes",
+    "contains_risky_call",
+    "contains_writeable_call",
+    "contains_self_call",
+)
+_CACHE_SLOTS = tuple(f"_cached_{name}" for name in _CACHED_PROPERTIES)
+
+
 # Data structure for IR parse tree
 class IRnode:
+    # codegen creates a lot of IRnodes, so keep them compact
+    __slots__ = (
+        "value",
+        "args",
+        "typ",
+        "location",
+        "ast_source",
+        "error_msg",
+        "annotation",
+        "mutable",
+        "add_gas_estimate",
+        "encoding",
+        "as_hex",
+        "is_self_call",
+        "valency",
+        "_gas",
+        "_passthrough_metadata",
+        # for attributes which are only set on few nodes (e.g.
+        # `_referenced_variables`, `is_source_bytes_literal`), and for
+        # overriding class attributes like `repr_show_gas` on an instance.
+        # the dict is only allocated when it is used.
+        "__dict__",
+    ) + _CACHE_SLOTS
+
     repr_show_gas = False
-    _gas: int
+    _gas: Optional[int]
     valency: int
     args: List["IRnode"]
     value: Union[str, int]
     is_self_call: bool
-    passthrough_metadata: dict[str, Any]
-    func_ir: Any
-    common_ir: Any
+    _passthrough_metadata: Optional[dict[str, Any]]
 
     # for bytestrings, if we have `is_source_bytes_literal`, we can perform
     # certain optimizations like eliding the copy.
@@ -175,15 +232,16 @@ class IRnode:
         self.encoding = encoding
         self.as_hex = AS_HEX_DEFAULT
         self.is_self_call = is_self_call
-        self.passthrough_metadata = passthrough_metadata or {}
-        self.func_ir = None
-        self.common_ir = None
+        # most nodes do not have metadata, allocate it on demand
+        self._passthrough_metadata = passthrough_metadata or None
+        # computed on demand, see `gas`
+        self._gas = None
 
         assert self.value is not None, "None is not allowed as IRnode value"
 
         # Determine this node's valency (1 if it pushes a value on the stack,
         # 0 otherwise) and checks to make sure the number and valencies of
-        # children are correct. Also, find an upper bound on gas consumption
+        # children are correct.
         # Numbers
         if isinstance(self.value, int):
             assert len(self.args) == 0, "int can't have arguments"
@@ -192,25 +250,20 @@ class IRnode:
             assert -(2**255) <= self.value < 2**256, "out of range"
 
             self.valency = 1
-            self._gas = 5
         elif isinstance(self.value, bytes):
             # a literal bytes value, probably inside a "data" node.
             assert len(self.args) == 0, "bytes can't have arguments"
 
             self.valency = 0
-            self._gas = 0
 
         elif isinstance(self.value, str):
             # Opcodes and pseudo-opcodes (e.g. clamp)
             if self.value.upper() in get_ir_opcodes():
-                _, ins, outs, gas = get_ir_opcodes()[self.value.upper()]
+                _, ins, outs, _ = get_ir_opcodes()[self.value.upper()]
                 self.valency = outs
                 assert (
                     len(self.args) == ins
                 ), f"Number of arguments mismatched: {self.value} {self.args}"
-                # We add 2 per stack height at push time and take it back
-                # at pop time; this makes `break` easier to handle
-                self._gas = gas + 2 * (outs - ins)
                 for arg in self.args:
                     # pop and pass are used to push/pop values on the stack to be
                     # consumed for internal functions, therefore we whitelist this as a zero valency
@@ -219,34 +272,8 @@ class IRnode:
                     assert (
                         arg.valency == 1 or arg.value in zero_valency_whitelist
                     ), f"invalid argument to `{self.value}`: {arg}"
-
-                    self._gas += arg.gas
-                # Dynamic gas cost: 8 gas for each byte of logging data
-                if self.value.upper()[0:3] == "LOG" and isinstance(self.args[1].value, int):
-                    self._gas += self.args[1].value * 8
-                # Dynamic gas cost: non-zero-valued call
-                if self.value.upper() == "CALL" and self.args[2].value != 0:
-                    self._gas += 34000
-                # Dynamic gas cost: filling sstore (ie. not clearing)
-                elif self.value.upper() == "SSTORE" and self.args[1].value != 0:
-                    self._gas += 15000
-                # Dynamic gas cost: calldatacopy
-                elif self.value.upper() in ("CALLDATACOPY", "CODECOPY", "EXTCODECOPY"):
-                    size = 34000
-                    size_arg_index = 3 if self.value.upper() == "EXTCODECOPY" else 2
-                    size_arg = self.args[size_arg_index]
-                    if isinstance(size_arg.value, int):
-                        size = size_arg.value
-                    self._gas += ceil32(size) // 32 * 3
-                # Gas limits in call
-                if self.value.upper() == "CALL" and isinstance(self.args[0].value, int):
-                    self._gas += self.args[0].value
             # If statements
             elif self.value == "if":
-                if len(self.args) == 3:
-                    self._gas = self.args[0].gas + max(self.args[1].gas, self.args[2].gas) + 3
-                if len(self.args) == 2:
-                    self._gas = self.args[0].gas + self.args[1].gas + 17
                 assert (
                     self.args[0].valency > 0
                 ), f"zerovalent argument as a test to an if statement: {self.args[0]}"
@@ -262,7 +289,6 @@ class IRnode:
                     self.args[1].valency == 1 or self.args[1].value == "pass"
                 ), f"zerovalent argument to with statement: {self.args[1]}"
                 self.valency = self.args[2].valency
-                self._gas = sum([arg.gas for arg in self.args]) + 5
             # Repeat statements: repeat <index_name> <startval> <rounds> <rounds_bound> <body>
             elif self.value == "repeat":
                 assert (
@@ -273,7 +299,6 @@ class IRnode:
                 start = self.args[1]
                 repeat_count = self.args[2]
                 repeat_bound = self.args[3]
-                body = self.args[4]
 
                 assert (
                     isinstance(repeat_bound.value, int) and repeat_bound.value > 0
@@ -284,19 +309,9 @@ class IRnode:
 
                 self.valency = 0
 
-                self._gas = counter_ptr.gas + start.gas
-                self._gas += 3  # gas for repeat_bound
-                int_bound = int(repeat_bound.value)
-                self._gas += int_bound * (body.gas + 50) + 30
-
-                if repeat_count != repeat_bound:
-                    # gas for assert(repeat_count <= repeat_bound)
-                    self._gas += 18
-
             # Seq statements: seq <statement> <statement> ...
             elif self.value == "seq":
                 self.valency = self.args[-1].valency if self.args else 0
-                self._gas = sum([arg.gas for arg in self.args]) + 30
 
             # GOTO is a jump with args
             # e.g. (goto my_label x y z) will push x y and z onto the stack,
@@ -308,14 +323,12 @@ class IRnode:
                     ), f"zerovalent argument to goto {arg}"
 
                 self.valency = 0
-                self._gas = sum([arg.gas for arg in self.args])
             elif self.value == "label":
                 assert (
                     self.args[1].value == "var_list"
                 ), f"2nd argument to label must be var_list, {self}"
                 assert len(args) == 3, f"label should have 3 args but has {len(args)}, {self}"
                 self.valency = 0
-                self._gas = 1 + sum(t.gas for t in self.args)
             elif self.value == "unique_symbol":
                 # a label which enforces uniqueness, and does not appear
                 # in generated bytecode. this is useful for generating
@@ -324,7 +337,10 @@ class IRnode:
                 # must be distinct from all `unique_symbol`s AS WELL AS all
                 # `label`s, otherwise IR-to-assembly will raise an exception.
                 self.valency = 0
-                self._gas = 0
+            elif self.value == "data":
+                # a data section, which is appended to the end of the
+                # code and does not push anything onto the stack
+                self.valency = 0
 
             # var_list names a variable number stack variables
             elif self.value == "var_list":
@@ -332,7 +348,6 @@ class IRnode:
                     if not isinstance(arg.value, str) or len(arg.args) > 0:  # pragma: nocover
                         raise CodegenPanic(f"var_list only takes strings: {self.args}")
                 self.valency = 0
-                self._gas = 0
 
             # Multi statements: multi <expr> <expr> ...
             elif self.value == "multi":
@@ -341,32 +356,134 @@ class IRnode:
                         arg.valency > 0
                     ), f"Multi expects all children to not be zerovalent: {arg}"
                 self.valency = sum([arg.valency for arg in self.args])
-                self._gas = sum([arg.gas for arg in self.args])
             elif self.value == "deploy":
                 self.valency = 0
                 assert len(self.args) == 3, f"`deploy` should have three args {self}"
-                self._gas = NullAttractor()  # unknown
             # Stack variables
             else:
                 self.valency = 1
-                self._gas = 3
         else:  # pragma: nocover
             raise CompilerPanic(f"Invalid value for IR AST node: {self.value}")
         assert isinstance(self.args, list)
 
-    # deepcopy is a perf hotspot; it pays to optimize it a little
-    def __deepcopy__(self, memo):
+    # find an upper bound on gas consumption. this is only needed for
+    # gas estimates, so it is computed on demand (see `gas`).
+    def _compute_gas(self) -> int:
+        if isinstance(self.value, int):
+            return 5
+        if isinstance(self.value, bytes):
+            return 0
+
+        assert isinstance(self.value, str)
+        # Opcodes and pseudo-opcodes (e.g. clamp)
+        if self.value.upper() in get_ir_opcodes():
+            _, ins, outs, gas = get_ir_opcodes()[self.value.upper()]
+            # We add 2 per stack height at push time and take it back
+            # at pop time; this makes `break` easier to handle
+            gas = gas + 2 * (outs - ins)
+            for arg in self.args:
+                gas += arg.gas
+            # Dynamic gas cost: 8 gas for each byte of logging data
+            if self.value.upper()[0:3] == "LOG" and isinstance(self.args[1].value, int):
+                gas += self.args[1].value * 8
+            # Dynamic gas cost: non-zero-valued call
+            if self.value.upper() == "CALL" and self.args[2].value != 0:
+                gas += 34000
+            # Dynamic gas cost: filling sstore (ie. not clearing)
+            elif self.value.upper() == "SSTORE" and self.args[1].value != 0:
+                gas += 15000
+            # Dynamic gas cost: calldatacopy
+            elif self.value.upper() in ("CALLDATACOPY", "CODECOPY", "EXTCODECOPY"):
+                size = 34000
+                size_arg_index = 3 if self.value.upper() == "EXTCODECOPY" else 2
+                size_arg = self.args[size_arg_index]
+                if isinstance(size_arg.value, int):
+                    size = size_arg.value
+                gas += ceil32(size) // 32 * 3
+            # Gas limits in call
+            if self.value.upper() == "CALL" and isinstance(self.args[0].value, int):
+                gas += self.args[0].value
+            return gas
+        if self.value == "if":
+            if len(self.args) == 3:
+                return self.args[0].gas + max(self.args[1].gas, self.args[2].gas) + 3
+            return self.args[0].gas + self.args[1].gas + 17
+        if self.value == "with":
+            return sum([arg.gas for arg in self.args]) + 5
+        if self.value == "repeat":
+            counter_ptr, start, repeat_count, repeat_bound, body = self.args
+            gas = counter_ptr.gas + start.gas
+            gas += 3  # gas for repeat_bound
+            int_bound = int(repeat_bound.value)
+            gas += int_bound * (body.gas + 50) + 30
+
+            if repeat_count != repeat_bound:
+                # gas for assert(repeat_count <= repeat_bound)
+                gas += 18
+            return gas
+        if self.value == "seq":
+            return sum([arg.gas for arg in self.args]) + 30
+        if self.value in ("goto", "exit_to", "multi"):
+            return sum([arg.gas for arg in self.args])
+        if self.value == "label":
+            return 1 + sum(t.gas for t in self.args)
+        if self.value in ("unique_symbol", "var_list"):
+            return 0
+        if self.value == "deploy":
+            return NullAttractor()  # unknown
+        # Stack variables
+        return 3
+
+    def _shallow_copy(self) -> "IRnode":
         cls = self.__class__
         ret = cls.__new__(cls)
-        ret.__dict__ = self.__dict__.copy()
+        for attr in self.__slots__:
+            if attr == "__dict__":
+                ret.__dict__.update(self.__dict__)
+                continue
+            try:
+                setattr(ret, attr, getattr(self, attr))
+            except AttributeError:
+                # optional slot which is not set
+                pass
+        return ret
+
+    # deepcopy is a perf hotspot; it pays to optimize it a little
+    def __deepcopy__(self, memo):
+        ret = self._shallow_copy()
         ret.args = [copy.deepcopy(arg) for arg in ret.args]
         return ret
 
+    def copy_with(self, **kwargs) -> "IRnode":
+        """
+        Shallow copy of this node with the given attributes replaced, e.g.
+        `node.copy_with(args=new_args)`. The children are shared with the
+        original node, which allows rewriting a tree persistently: only the
+        spine leading to a rewritten node needs to be copied.
+        """
+        ret = self._shallow_copy()
+        # drop cached values, they might depend on the replaced attributes
+        for attr in _CACHE_SLOTS:
+            if hasattr(ret, attr):
+                delattr(ret, attr)
+        ret._gas = None
+        for attr, val in kwargs.items():
+            setattr(ret, attr, val)
+        return ret
+
     # TODO would be nice to rename to `gas_estimate` or `gas_bound`
     @property
     def gas(self):
+        if self._gas is None:
+            self._gas = self._compute_gas()
         return self._gas + self.add_gas_estimate
 
+    @property
+    def passthrough_metadata(self) -> dict[str, Any]:
+        if self._passthrough_metadata is None:
+            self._passthrough_metadata = {}
+        return self._passthrough_metadata
+
     @property
     def is_empty_intrinsic(self):
         if self.value == "~empty":
@@ -418,7 +535,7 @@ class IRnode:
     # which changes the child `.unique_symbols`. in the future it would
     # be good to tighten down the hatches so it is harder to modify
     # IRnode member variables.
-    @cached_property
+    @_cached_slot
     def unique_symbols(self):
         ret = set()
         if self.value == "unique_symbol":
@@ -482,7 +599,7 @@ class IRnode:
 
         return _WithBuilder(self, name, should_inline)
 
-    @cached_property
+    @_cached_slot
     def referenced_variables(self):
         ret = getattr(self, "_referenced_variables", set())
 
@@ -494,7 +611,7 @@ class IRnode:
 
         return ret
 
-    @cached_property
+    @_cached_slot
     def variable_writes(self):
         ret = getattr(self, "_writes", set())
 
@@ -506,7 +623,7 @@ class IRnode:
 
         return ret
 
-    @cached_property
+    @_cached_slot
     def contains_risky_call(self):
         ret = self.value in ("call", "delegatecall", "staticcall", "create", "create2")
 
@@ -518,7 +635,7 @@ class IRnode:
 
         return ret
 
-    @cached_property
+    @_cached_slot
     def contains_writeable_call(self):
         ret = self.value in ("call", "delegatecall", "create", "create2")
 
@@ -530,7 +647,7 @@ class IRnode:
 
         return ret
 
-    @cached_property
+    @_cached_slot
     def contains_self_call(self):
         return getattr(self, "is_self_call", False) or any(x.contains_self_call for x in self.args)
 
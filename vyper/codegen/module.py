@@ -418,6 +418,11 @@ def _selector_section_linear(external_functions, module_t):
 
 # take a ModuleT, and generate the runtime and deploy IR
 def generate_ir_for_module(module_t: ModuleT) -> tuple[IRnode, IRnode]:
+    with core.collect_code_constants():
+        return _generate_ir_for_module(module_t)
+
+
+def _generate_ir_for_module(module_t: ModuleT) -> tuple[IRnode, IRnode]:
     # order functions so that each function comes after all of its callees
     id_generator = IDGenerator()
     runtime_reachable = _runtime_reachable_functions(module_t, id_generator)
@@ -461,6 +466,11 @@ def generate_ir_for_module(module_t: ModuleT) -> tuple[IRnode, IRnode]:
     runtime.append(["label", "fallback", ["var_list"], fallback_ir])
 
     runtime.extend(internal_functions_ir)
+    # data sections for constants which are read from code
+    runtime.extend(core.code_constants_ir(is_ctor_context=False))
+    # a single IRnode, so that it is shared between the runtime and deploy
+    # IR (see `vyper.ir.optimizer.optimize`)
+    runtime_ir = IRnode.from_list(runtime)
 
     deploy_code: List[Any] = ["seq"]
     immutables_len = module_t.immutable_section_bytes
@@ -505,14 +515,18 @@ def generate_ir_for_module(module_t: ModuleT) -> tuple[IRnode, IRnode]:
             deploy_code.append(["iload", max(0, immutables_len - 32)])
 
         deploy_code.append(init_func_ir)
-        deploy_code.append(["deploy", init_mem_used, runtime, immutables_len])
+        # note: these data sections need to come before the data sections
+        # generated for the "deploy" node (in particular, the metadata
+        # needs to be at the end of initcode)
+        deploy_code.extend(core.code_constants_ir(is_ctor_context=True))
+        deploy_code.append(["deploy", init_mem_used, runtime_ir, immutables_len])
         # internal functions come at end of initcode
         deploy_code.extend(ctor_internal_func_irs)
 
     else:
         if immutables_len != 0:  # pragma: nocover
             raise CompilerPanic("unreachable")
-        deploy_code.append(["deploy", 0, runtime, 0])
+        deploy_code.append(["deploy", 0, runtime_ir, 0])
 
     # compile all remaining internal functions so that _ir_info is populated
     # (whether or not it makes it into the final IR artifact)
@@ -528,4 +542,4 @@ def generate_ir_for_module(module_t: ModuleT) -> tuple[IRnode, IRnode]:
             id_generator.ensure_id(fn_t)
             _ = _ir_for_internal_function(fn_t.ast_def, module_t, False)
 
-    return IRnode.from_list(deploy_code), IRnode.from_list(runtime)
+    return IRnode.from_list(deploy_code), runtime_ir
@@ -1,55 +1,87 @@
+import contextlib
+import warnings
 from pathlib import Path
-from typing import Callable, Dict, Optional
+from typing import TYPE_CHECKING, Callable, Dict, Optional
 
-import vyper.codegen.core as codegen
-import vyper.compiler.output as output
+from vyper.compiler.cache import (
+    CacheEntry,
+    CompilationCache,
+    compute_cache_key,
+    is_cacheable,
+    replay_warnings,
+)
 from vyper.compiler.input_bundle import FileInput, InputBundle, JSONInput, PathLike
-from vyper.compiler.phases import CompilerData
 from vyper.compiler.settings import Settings, anchor_settings, get_global_settings
+from vyper.compiler.timings import record_timings
 from vyper.typing import OutputFormats, StorageLayout
 
+if TYPE_CHECKING:
+    from vyper.compiler.phases import CompilerData
+    from vyper.compiler.session import BuildSession
+
+# NOTE: the compiler proper (vyper.compiler.phases and the output builders
+# in vyper.compiler.output) is imported lazily, so that importing this
+# package (e.g. for `vyper --version`, or for the settings) is cheap.
+
+
+def _output_builder(name: str) -> Callable:
+    def build(compiler_data: "CompilerData"):
+        import vyper.compiler.output as output
+
+        return getattr(output, name)(compiler_data)
+
+    return build
+
+
 OUTPUT_FORMATS = {
     # requires vyper_module
-    "ast_dict": output.build_ast_dict,
+    "ast_dict": _output_builder("build_ast_dict"),
     # requires annotated_vyper_module
-    "annotated_ast_dict": output.build_annotated_ast_dict,
-    "layout": output.build_layout_output,
-    "devdoc": output.build_devdoc,
-    "userdoc": output.build_userdoc,
-    "archive": output.build_archive,
-    "archive_b64": output.build_archive_b64,
-    "integrity": output.build_integrity,
-    "solc_json": output.build_solc_json,
+    "annotated_ast_dict": _output_builder("build_annotated_ast_dict"),
+    "layout": _output_builder("build_layout_output"),
+    "devdoc": _output_builder("build_devdoc"),
+    "userdoc": _output_builder("build_userdoc"),
+    "archive": _output_builder("build_archive"),
+    "archive_b64": _output_builder("build_archive_b64"),
+    "integrity": _output_builder("build_integrity"),
+    "solc_json": _output_builder("build_solc_json"),
     # requires ir_node
-    "external_interface": output.build_external_interface_output,
-    "interface": output.build_interface_output,
-    "bb": output.build_bb_output,
-    "bb_runtime": output.build_bb_runtime_output,
-    "cfg": output.build_cfg_output,
-    "cfg_runtime": output.build_cfg_runtime_output,
-    "ir": output.build_ir_output,
-    "ir_runtime": output.build_ir_runtime_output,
-    "ir_dict": output.build_ir_dict_output,
-    "ir_runtime_dict": output.build_ir_runtime_dict_output,
-    "method_identifiers": output.build_method_identifiers_output,
-    "metadata": output.build_metadata_output,
-    "settings_dict": output.build_settings_output,
+    "external_interface": _output_builder("build_external_interface_output"),
+    "interface": _output_builder("build_interface_output"),
+    "bb": _output_builder("build_bb_output"),
+    "bb_runtime": _output_builder("build_bb_runtime_output"),
+    "cfg": _output_builder("build_cfg_output"),
+    "cfg_runtime": _output_builder("build_cfg_runtime_output"),
+    "ir": _output_builder("build_ir_output"),
+    "ir_runtime": _output_builder("build_ir_runtime_output"),
+    "ir_dict": _output_builder("build_ir_dict_output"),
+    "ir_runtime_dict": _output_builder("build_ir_runtime_dict_output"),
+    "method_identifiers": _output_builder("build_method_identifiers_output"),
+    "metadata": _output_builder("build_metadata_output"),
+    "settings_dict": _output_builder("build_settings_output"),
     # requires assembly
-    "abi": output.build_abi_output,
-    "asm": output.build_asm_output,
-    "asm_runtime": output.build_asm_runtime_output,
-    "source_map": output.build_source_map_output,
-    "source_map_runtime": output.build_source_map_runtime_output,
+    "abi": _output_builder("build_abi_output"),
+    "asm": _output_builder("build_asm_output"),
+    "asm_runtime": _output_builder("build_asm_runtime_output"),
+    "source_map": _output_builder("build_source_map_output"),
+    "source_map_runtime": _output_builder("build_source_map_runtime_output"),
     # requires bytecode
-    "bytecode": output.build_bytecode_output,
-    "bytecode_runtime": output.build_bytecode_runtime_output,
-    "blueprint_bytecode": output.build_blueprint_bytecode_output,
-    "opcodes": output.build_opcodes_output,
-    "opcodes_runtime": output.build_opcodes_runtime_output,
-    "symbol_map": output.build_symbol_map,
-    "symbol_map_runtime": output.build_symbol_map_runtime,
+    "bytecode": _output_builder("build_bytecode_output"),
+    "bytecode_runtime": _output_builder("build_bytecode_runtime_output"),
+    "blueprint_bytecode": _output_builder("build_blueprint_bytecode_output"),
+    "opcodes": _output_builder("build_opcodes_output"),
+    "opcodes_runtime": _output_builder("build_opcodes_runtime_output"),
+    "symbol_map": _output_builder("build_symbol_map"),
+    "symbol_map_runtime": _output_builder("build_symbol_map_runtime"),
+    # requires all of the above
+    "timings": _output_builder("build_timings_output"),
+    "venom_pass_stats": _output_builder("build_venom_pass_stats_output"),
 }
 
+# outputs which report on the compilation itself, and need it to be
+# recorded (see vyper.compiler.timings)
+PROFILING_OUTPUT_FORMATS = ("timings", "venom_pass_stats")
+
 INTERFACE_OUTPUT_FORMATS = [
     "ast_dict",
     "annotated_ast_dict",
@@ -71,6 +103,8 @@ def compile_from_file_input(
     no_bytecode_metadata: bool = False,
     show_gas_estimates: bool = False,
     exc_handler: Optional[Callable] = None,
+    cache: Optional[CompilationCache] = None,
+    session: Optional["BuildSession"] = None,
 ) -> dict:
     """
     Main entry point into the compiler.
@@ -102,12 +136,18 @@ def compile_from_file_input(
         Do not add metadata to bytecode. Defaults to False
     experimental_codegen: bool
         Use experimental codegen. Defaults to False
+    cache: CompilationCache, optional
+        On-disk cache to serve outputs from (and store outputs to).
+    session: BuildSession, optional
+        Session to share imported modules with other compilation targets.
 
     Returns
     -------
     Dict
         Compiler output as `{'output key': "output data"}`
     """
+    from vyper.compiler.phases import CompilerData
+
     settings = settings or get_global_settings() or Settings()
 
     compiler_data = CompilerData(
@@ -118,13 +158,72 @@ def compile_from_file_input(
         storage_layout=storage_layout_override,
         show_gas_estimates=show_gas_estimates,
         no_bytecode_metadata=no_bytecode_metadata,
+        session=session,
     )
 
+    if cache is not None:
+        return cached_outputs_from_compiler_data(cache, compiler_data, output_formats, exc_handler)
+
     return outputs_from_compiler_data(compiler_data, output_formats, exc_handler)
 
 
+def cached_outputs_from_compiler_data(
+    cache: CompilationCache,
+    compiler_data: "CompilerData",
+    output_formats: Optional[OutputFormats] = None,
+    exc_handler: Optional[Callable] = None,
+) -> dict:
+    """
+    Same as `outputs_from_compiler_data`, but serve the outputs from `cache`
+    if they are available, and store them to `cache` otherwise.
+
+    Warnings emitted during compilation are stored alongside the outputs
+    and replayed on a cache hit, so that the user sees the same
+    diagnostics regardless of whether the cache was hit or not.
+    """
+    if output_formats is None:
+        output_formats = ("bytecode",)
+
+    if not is_cacheable(output_formats):
+        return outputs_from_compiler_data(compiler_data, output_formats, exc_handler)
+
+    # record warnings so they can be stored with the outputs. they get
+    # re-emitted afterwards, under the caller's warning filters.
+    exc = None
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        try:
+            key = compute_cache_key(compiler_data, output_formats)
+            entry = cache.get(key)
+        except Exception:
+            # the compilation is going to fail. don't touch the cache,
+            # let the regular pipeline report the error.
+            key, entry = None, None
+
+        if key is not None and entry is None:
+            try:
+                outputs = outputs_from_compiler_data(compiler_data, output_formats, exc_handler)
+            except Exception as e:
+                exc = e
+            else:
+                recorded = [(w.category.__name__, str(w.message)) for w in caught]
+                entry = CacheEntry(outputs, recorded)
+                cache.put(key, entry)
+
+    if key is None or exc is not None:
+        for w in caught:
+            warnings.warn(w.message, stacklevel=2)
+        if exc is not None:
+            raise exc
+        return outputs_from_compiler_data(compiler_data, output_formats, exc_handler)
+
+    assert entry is not None  # mypy hint
+    replay_warnings(entry.warnings)
+    return entry.outputs
+
+
 def outputs_from_compiler_data(
-    compiler_data: CompilerData,
+    compiler_data: "CompilerData",
     output_formats: Optional[OutputFormats] = None,
     exc_handler: Optional[Callable] = None,
 ):
@@ -133,7 +232,18 @@ def outputs_from_compiler_data(
 
     ret = {}
 
-    with anchor_settings(compiler_data.settings):
+    timings_ctx: contextlib.AbstractContextManager = contextlib.nullcontext()
+    profiling_formats = [f for f in output_formats if f in PROFILING_OUTPUT_FORMATS]
+    if len(profiling_formats) > 0:
+        # record the phases triggered by all the other outputs, and
+        # generate the profiling outputs once everything else is done.
+        # memory tracing is slow, only do it if it is going to be reported.
+        trace_memory = "timings" in profiling_formats
+        timings_ctx = record_timings(compiler_data.timings, trace_memory=trace_memory)
+        output_formats = [f for f in output_formats if f not in PROFILING_OUTPUT_FORMATS]
+        output_formats += profiling_formats
+
+    with timings_ctx, anchor_settings(compiler_data.settings):
         for output_format in output_formats:
             if output_format not in OUTPUT_FORMATS:
                 raise ValueError(f"Unsupported format type {repr(output_format)}")
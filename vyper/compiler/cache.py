@@ -0,0 +1,285 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import time
+import warnings
+from dataclasses import dataclass, field
+from pathlib import Path, PurePath
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+
+from vyper.utils import get_long_version
+
+if TYPE_CHECKING:
+    from vyper.compiler.phases import CompilerData
+    from vyper.typing import OutputFormats
+
+# an on-disk, content-addressed cache of compiler outputs. entries are
+# keyed by everything which can influence the output of the compiler
+# (the integrity sum of the sources, the resolved settings, the compiler
+# version and the requested output formats), so a cache hit can be
+# served without parsing more than is required to compute the
+# integrity sum.
+
+VYPER_CACHE_DIR = os.environ.get("VYPER_CACHE_DIR")
+
+# 512MB
+DEFAULT_CACHE_MAX_SIZE = 512 * 1024 * 1024
+
+# bump this if the layout of cache entries changes
+_CACHE_FORMAT_VERSION = 2
+
+# entries are plain json (and never pickles), so that reading a cache
+# entry cannot execute code.
+_ENTRY_SUFFIX = ".json"
+
+# output formats which are not plain data (e.g. they are IR objects which
+# are printed by the caller, they depend on the input bundle layout, or
+# they report on the compilation itself), and so are never served from the
+# cache.
+UNCACHEABLE_FORMATS = frozenset(
+    (
+        "ir",
+        "ir_runtime",
+        "bb",
+        "bb_runtime",
+        "archive",
+        "archive_b64",
+        "solc_json",
+        "timings",
+        "venom_pass_stats",
+    )
+)
+
+
+@dataclass
+class CacheEntry:
+    outputs: dict[str, Any]
+    # (category name, message) of the warnings emitted during compilation,
+    # replayed on a cache hit.
+    warnings: list[tuple[str, str]] = field(default_factory=list)
+
+
+def is_cacheable(output_formats: "OutputFormats") -> bool:
+    return not any(f in UNCACHEABLE_FORMATS for f in output_formats)
+
+
+def compute_cache_key(compiler_data: "CompilerData", output_formats: "OutputFormats") -> str:
+    """
+    Compute the cache key for a compilation. This runs parsing and import
+    resolution (in order to compute the integrity sum), but no analysis.
+    """
+    import vyper.codegen.ir_node as ir_node
+
+    # source ids and paths of imported modules show up in outputs (e.g.
+    # source maps and ast output), so they are part of the key as well.
+    imported = compiler_data.resolved_imports.compiler_inputs
+    file_input = compiler_data.file_input
+    inputs = [(file_input.source_id, file_input.path, file_input.resolved_path)]
+    inputs += sorted(
+        ((inp.source_id, inp.path, inp.resolved_path) for inp in imported),
+        key=lambda t: (t[0], PurePath(t[1]).as_posix()),
+    )
+
+    key_data = {
+        "cache_version": _CACHE_FORMAT_VERSION,
+        "compiler_version": get_long_version(),
+        "integrity_sum": compiler_data.integrity_sum,
+        "expected_integrity_sum": compiler_data.expected_integrity_sum,
+        "settings": compiler_data.settings.as_dict(),
+        "output_formats": list(output_formats),
+        "inputs": [(i, PurePath(p).as_posix(), PurePath(r).as_posix()) for (i, p, r) in inputs],
+        "show_gas_estimates": compiler_data.show_gas_estimates,
+        "no_bytecode_metadata": compiler_data.no_bytecode_metadata,
+        "hex_ir": ir_node.AS_HEX_DEFAULT,
+        # module paths in the output are relative to the working directory
+        "cwd": os.getcwd(),
+    }
+    s = json.dumps(key_data, sort_keys=True)
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+
+
+class CompilationCache:
+    """
+    A size-bounded, on-disk cache of compiler outputs.
+
+    Each entry is stored in its own file. Reading an entry bumps its
+    modification time, and when the total size of the cache exceeds
+    `max_size`, the least recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir: str | Path, max_size: int = DEFAULT_CACHE_MAX_SIZE):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # statistics, handy for tooling and for tests
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / (key + _ENTRY_SUFFIX)
+
+    def _entries(self) -> Iterator[os.DirEntry]:
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(_ENTRY_SUFFIX) and entry.is_file():
+                    yield entry
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        path = self._entry_path(key)
+        try:
+            with path.open("rb") as f:
+                ret = _decode_entry(f.read())
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # corrupted or incompatible entry, treat it as a miss
+            with contextlib.suppress(OSError):
+                path.unlink()
+            self.misses += 1
+            return None
+
+        # mark as recently used
+        self._touch(path)
+
+        self.hits += 1
+        return ret
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        try:
+            data = _encode_entry(entry)
+        except Exception:
+            # some output is not serializable, don't cache it.
+            return
+
+        # write to a temporary file and then rename it into place, so that
+        # concurrent compiler processes never observe a partial entry.
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._entry_path(key))
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            raise
+
+        self._touch(self._entry_path(key))
+        self._evict()
+
+    def _touch(self, path: Path) -> None:
+        # filesystem timestamps can be coarse, so set the (last used)
+        # timestamp explicitly with the highest available resolution.
+        t = time.time_ns()
+        with contextlib.suppress(OSError):
+            os.utime(path, ns=(t, t))
+
+    def _evict(self) -> None:
+        entries = []
+        total_size = 0
+        for entry in self._entries():
+            with contextlib.suppress(OSError):
+                st = entry.stat()
+                entries.append((st.st_mtime_ns, entry.path, st.st_size))
+                total_size += st.st_size
+
+        if total_size <= self.max_size:
+            return
+
+        # least recently used first
+        entries.sort()
+        for _, path, size in entries:
+            if total_size <= self.max_size:
+                break
+            with contextlib.suppress(OSError):
+                os.unlink(path)
+                total_size -= size
+
+    def clear(self) -> None:
+        for entry in self._entries():
+            with contextlib.suppress(OSError):
+                os.unlink(entry.path)
+
+
+# outputs are mostly json already, except for tuples and dicts with
+# non-string keys (e.g. the pc maps in source map outputs), which get
+# tagged so that a cache hit returns exactly the original outputs.
+_TUPLE_TAG = "__tuple__"
+_DICT_TAG = "__dict__"
+
+
+def _to_json(obj: Any) -> Any:
+    if isinstance(obj, tuple):
+        return {_TUPLE_TAG: [_to_json(item) for item in obj]}
+    if isinstance(obj, list):
+        return [_to_json(item) for item in obj]
+    if isinstance(obj, dict):
+        if all(isinstance(k, str) for k in obj) and obj.keys() not in ({_TUPLE_TAG}, {_DICT_TAG}):
+            return {k: _to_json(v) for k, v in obj.items()}
+        return {_DICT_TAG: [[_to_json(k), _to_json(v)] for k, v in obj.items()]}
+    return obj
+
+
+def _from_json_object(obj: dict) -> Any:
+    if obj.keys() == {_TUPLE_TAG}:
+        return tuple(obj[_TUPLE_TAG])
+    if obj.keys() == {_DICT_TAG}:
+        return {k: v for k, v in obj[_DICT_TAG]}
+    return obj
+
+
+def _encode_entry(entry: CacheEntry) -> bytes:
+    data = {"outputs": _to_json(entry.outputs), "warnings": entry.warnings}
+    ret = json.dumps(data).encode("utf-8")
+    # refuse outputs which json would silently change (e.g. int enums)
+    if _decode_entry(ret) != entry:
+        raise ValueError("outputs do not roundtrip through json")
+    return ret
+
+
+def _decode_entry(data: bytes) -> CacheEntry:
+    obj = json.loads(data, object_hook=_from_json_object)
+    outputs, recorded = obj["outputs"], obj["warnings"]
+    if not isinstance(outputs, dict) or not isinstance(recorded, list):
+        raise ValueError("malformed cache entry")
+    recorded = [(str(category), str(message)) for (category, message) in recorded]
+    return CacheEntry(outputs, recorded)
+
+
+def get_cache(
+    cache_dir: Optional[str] = None, no_cache: bool = False
+) -> Optional[CompilationCache]:
+    """
+    Get the cache for a CLI invocation. `--cache-dir` takes precedence
+    over the VYPER_CACHE_DIR environment variable, and `--no-cache`
+    disables the cache altogether.
+    """
+    if no_cache:
+        return None
+    cache_dir = cache_dir or VYPER_CACHE_DIR
+    if not cache_dir:
+        return None
+    return CompilationCache(cache_dir)
+
+
+def _warning_category(name: str) -> type[Warning]:
+    # look up a recorded warning category by name. only warnings defined
+    # by vyper or python are known, anything else is a UserWarning.
+    import builtins
+
+    import vyper.warnings
+
+    for namespace in (vyper.warnings, builtins):
+        category = getattr(namespace, name, None)
+        if isinstance(category, type) and issubclass(category, Warning):
+            return category
+    return UserWarning
+
+
+def replay_warnings(recorded: list[tuple[str, str]]) -> None:
+    # re-emit warnings which were recorded as (category name, message) pairs
+    for category, message in recorded:
+        warnings.warn(_warning_category(category)(message), stacklevel=2)
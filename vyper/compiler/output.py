@@ -16,7 +16,6 @@ from vyper.ir import compile_ir
 from vyper.semantics.types.function import ContractFunctionT, FunctionVisibility, StateMutability
 from vyper.typing import StorageLayout
 from vyper.utils import safe_relpath
-from vyper.venom.ir_node_to_venom import _pass_via_stack, _returns_word
 from vyper.warnings import ContractSizeLimit, vyper_warn
 
 
@@ -268,6 +267,8 @@ def build_metadata_output(compiler_data: CompilerData) -> dict:
         ret["function_id"] = func_t._function_id
 
         if func_t.is_internal and compiler_data.settings.experimental_codegen:
+            from vyper.venom.ir_node_to_venom import _pass_via_stack, _returns_word
+
             pass_via_stack = _pass_via_stack(func_t)
             pass_via_stack_list = [
                 arg for (arg, is_stack_arg) in pass_via_stack.items() if is_stack_arg
@@ -486,6 +487,22 @@ def build_bytecode_runtime_output(compiler_data: CompilerData) -> str:
     return f"0x{compiler_data.bytecode_runtime.hex()}"
 
 
+def build_timings_output(compiler_data: CompilerData) -> dict:
+    # run the full pipeline, so that all the phases are recorded
+    _ = compiler_data.bytecode
+    _ = compiler_data.bytecode_runtime
+    return compiler_data.timings.as_dict()
+
+
+def build_venom_pass_stats_output(compiler_data: CompilerData) -> list:
+    # run the venom pipeline, so that all the passes are recorded.
+    # (the legacy pipeline does not run any venom passes)
+    if compiler_data.settings.experimental_codegen:
+        _ = compiler_data.venom_runtime
+        _ = compiler_data.venom_deploytime
+    return [stats.as_dict() for stats in compiler_data.timings.passes]
+
+
 def build_opcodes_output(compiler_data: CompilerData) -> str:
     return _build_opcodes(compiler_data.bytecode)
 
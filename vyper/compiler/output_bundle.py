@@ -206,6 +206,8 @@ class SolcJSONWriter(OutputBundleWriter):
                 s["evmVersion"] = s.pop("evm_version")
             if "experimental_codegen" in s:
                 s["experimentalCodegen"] = s.pop("experimental_codegen")
+            if "venom_pipeline" in s:
+                s["venomPipeline"] = s.pop("venom_pipeline")
 
             self._output["settings"].update(s)
 
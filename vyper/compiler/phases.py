@@ -9,6 +9,7 @@ from vyper.ast import natspec
 from vyper.codegen import module
 from vyper.codegen.ir_node import IRnode
 from vyper.compiler.input_bundle import FileInput, FilesystemInputBundle, InputBundle, JSONInput
+from vyper.compiler.session import BuildSession
 from vyper.compiler.settings import (
     OptimizationLevel,
     Settings,
@@ -16,7 +17,8 @@ from vyper.compiler.settings import (
     merge_settings,
     should_run_legacy_optimizer,
 )
-from vyper.ir import compile_ir, optimizer
+from vyper.compiler.timings import Timings, timed_phase
+from vyper.ir import compile_ir
 from vyper.semantics import analyze_module, set_data_positions, validate_compilation_target
 from vyper.semantics.analysis.data_positions import generate_layout_export
 from vyper.semantics.analysis.imports import resolve_imports
@@ -24,7 +26,6 @@ from vyper.semantics.types.function import ContractFunctionT
 from vyper.semantics.types.module import ModuleT
 from vyper.typing import StorageLayout
 from vyper.utils import ERC5202_PREFIX, sha256sum
-from vyper.venom import DeployInfo, generate_assembly_experimental, generate_venom
 from vyper.warnings import VyperWarning, vyper_warn
 
 DEFAULT_CONTRACT_PATH = PurePath("VyperContract.vy")
@@ -69,6 +70,7 @@ class CompilerData:
         storage_layout: JSONInput = None,
         show_gas_estimates: bool = False,
         no_bytecode_metadata: bool = False,
+        session: Optional[BuildSession] = None,
     ) -> None:
         """
         Initialization method.
@@ -85,6 +87,9 @@ class CompilerData:
             Show gas estimates for abi and ir output modes
         no_bytecode_metadata: bool, optional
             Do not add metadata to bytecode. Defaults to False
+        session: BuildSession, optional
+            Share parsed and analyzed imported modules with the other
+            compilation targets of the session
         """
 
         if isinstance(file_input, str):
@@ -101,6 +106,9 @@ class CompilerData:
         self.original_settings = settings
         self.input_bundle = input_bundle or FilesystemInputBundle([Path(".")])
         self.expected_integrity_sum = integrity_sum
+        self.session = session
+        # per-phase timings, recorded while `timings` output is generated
+        self.timings = Timings()
 
     @cached_property
     def source_code(self):
@@ -118,13 +126,14 @@ class CompilerData:
     def vyper_module(self):
         is_vyi = self.contract_path.suffix == ".vyi"
 
-        ast = vy_ast.parse_to_ast(
-            self.source_code,
-            self.source_id,
-            module_path=self.contract_path.as_posix(),
-            resolved_path=self.file_input.resolved_path.as_posix(),
-            is_interface=is_vyi,
-        )
+        with timed_phase("parse"):
+            ast = vy_ast.parse_to_ast(
+                self.source_code,
+                self.source_id,
+                module_path=self.contract_path.as_posix(),
+                resolved_path=self.file_input.resolved_path.as_posix(),
+                is_interface=is_vyi,
+            )
 
         return ast
 
@@ -155,12 +164,19 @@ class CompilerData:
             return sha256sum(layout_sum + imports_integrity_sum)
         return imports_integrity_sum
 
+    @cached_property
+    def _module_cache(self):
+        if self.session is None:
+            return None
+        return self.session.module_cache(self.settings)
+
     @cached_property
     def _resolve_imports(self):
         # deepcopy so as to not interfere with `-f ast` output
         vyper_module = copy.deepcopy(self.vyper_module)
-        with self.input_bundle.search_path(Path(vyper_module.resolved_path).parent):
-            imports = resolve_imports(vyper_module, self.input_bundle)
+        with timed_phase("import_resolution"):
+            with self.input_bundle.search_path(Path(vyper_module.resolved_path).parent):
+                imports = resolve_imports(vyper_module, self.input_bundle, self._module_cache)
 
         # check integrity sum
         integrity_sum = self._compute_integrity_sum(imports._integrity_sum)
@@ -188,8 +204,12 @@ class CompilerData:
     @cached_property
     def _annotate(self) -> tuple[natspec.NatspecOutput, vy_ast.Module]:
         module = self._resolve_imports[0]
-        analyze_module(module)
-        nspec = natspec.parse_natspec(module)
+        with timed_phase("analysis"):
+            if self._module_cache is not None:
+                self._module_cache.analyze(module, self.resolved_imports)
+            else:
+                analyze_module(module)
+            nspec = natspec.parse_natspec(module)
         return nspec, module
 
     @cached_property
@@ -208,7 +228,8 @@ class CompilerData:
         """
         module_t = self.annotated_vyper_module._metadata["type"]
 
-        validate_compilation_target(module_t)
+        with timed_phase("validation"):
+            validate_compilation_target(module_t)
         return self.annotated_vyper_module
 
     @cached_property
@@ -217,9 +238,9 @@ class CompilerData:
         storage_layout = None
         if self.storage_layout_override is not None:
             storage_layout = self.storage_layout_override.data
-        set_data_positions(module_ast, storage_layout)
-
-        return generate_layout_export(module_ast)
+        with timed_phase("storage_layout"):
+            set_data_positions(module_ast, storage_layout)
+            return generate_layout_export(module_ast)
 
     @property
     def global_ctx(self) -> ModuleT:
@@ -253,13 +274,20 @@ class CompilerData:
         fs = self.annotated_vyper_module.get_children(vy_ast.FunctionDef)
         return {f.name: f._metadata["func_type"] for f in fs}
 
+    # NOTE: venom is imported lazily, it is only needed for the
+    # experimental codegen pipeline (or for venom output formats).
     @cached_property
     def venom_runtime(self):
-        runtime_venom = generate_venom(self.ir_runtime, self.settings)
-        return runtime_venom
+        from vyper.venom import generate_venom
+
+        ir_runtime = self.ir_runtime
+        with timed_phase("venom_generation_runtime"):
+            return generate_venom(ir_runtime, self.settings)
 
     @cached_property
     def venom_deploytime(self):
+        from vyper.venom import DeployInfo, generate_venom
+
         data_sections = {"runtime_begin": self.bytecode_runtime}
         if self.bytecode_metadata is not None:
             data_sections["cbor_metadata"] = self.bytecode_metadata
@@ -269,10 +297,11 @@ class CompilerData:
             immutables_len=self.compilation_target._metadata["type"].immutable_section_bytes,
         )
 
-        venom_ctx = generate_venom(
-            self.ir_nodes, self.settings, data_sections=data_sections, deploy_info=deploy_info
-        )
-        return venom_ctx
+        ir_nodes = self.ir_nodes
+        with timed_phase("venom_generation"):
+            return generate_venom(
+                ir_nodes, self.settings, data_sections=data_sections, deploy_info=deploy_info
+            )
 
     @cached_property
     def assembly(self) -> list:
@@ -281,14 +310,18 @@ class CompilerData:
             metadata = bytes.fromhex(self.integrity_sum)
 
         if self.settings.experimental_codegen:
+            from vyper.venom import generate_assembly_experimental
+
             assert self.settings.optimize is not None  # mypy hint
-            return generate_assembly_experimental(
-                self.venom_deploytime, optimize=self.settings.optimize
-            )
+            venom_ctx = self.venom_deploytime
+            with timed_phase("assembly"):
+                return generate_assembly_experimental(venom_ctx, optimize=self.settings.optimize)
         else:
-            return generate_assembly(
-                self.ir_nodes, self.settings.optimize, compiler_metadata=metadata
-            )
+            ir_nodes = self.ir_nodes
+            with timed_phase("assembly"):
+                return generate_assembly(
+                    ir_nodes, self.settings.optimize, compiler_metadata=metadata
+                )
 
     @cached_property
     def bytecode_metadata(self) -> Optional[bytes]:
@@ -309,16 +342,22 @@ class CompilerData:
     @cached_property
     def assembly_runtime(self) -> list:
         if self.settings.experimental_codegen:
+            from vyper.venom import generate_assembly_experimental
+
             assert self.settings.optimize is not None  # mypy hint
-            return generate_assembly_experimental(
-                self.venom_runtime, optimize=self.settings.optimize
-            )
+            venom_ctx = self.venom_runtime
+            with timed_phase("assembly_runtime"):
+                return generate_assembly_experimental(venom_ctx, optimize=self.settings.optimize)
         else:
-            return generate_assembly(self.ir_runtime, self.settings.optimize)
+            ir_runtime = self.ir_runtime
+            with timed_phase("assembly_runtime"):
+                return generate_assembly(ir_runtime, self.settings.optimize)
 
     @cached_property
     def _bytecode(self) -> tuple[bytes, dict[str, Any]]:
-        return generate_bytecode(self.assembly)
+        assembly = self.assembly
+        with timed_phase("bytecode"):
+            return generate_bytecode(assembly)
 
     @property
     def bytecode(self) -> bytes:
@@ -330,7 +369,9 @@ class CompilerData:
 
     @cached_property
     def _bytecode_runtime(self) -> tuple[bytes, dict[str, Any]]:
-        return generate_bytecode(self.assembly_runtime)
+        assembly_runtime = self.assembly_runtime
+        with timed_phase("bytecode_runtime"):
+            return generate_bytecode(assembly_runtime)
 
     @property
     def bytecode_runtime(self) -> bytes:
@@ -374,12 +415,17 @@ def generate_ir_nodes(global_ctx: ModuleT, settings: Settings) -> tuple[IRnode,
     # make IR output the same between runs
     codegen.reset_names()
 
-    with anchor_settings(settings):
+    with timed_phase("ir_generation"), anchor_settings(settings):
         ir_nodes, ir_runtime = module.generate_ir_for_module(global_ctx)
 
     if should_run_legacy_optimizer(settings):
-        ir_nodes = optimizer.optimize(ir_nodes)
-        ir_runtime = optimizer.optimize(ir_runtime)
+        from vyper.ir import optimizer
+
+        with timed_phase("legacy_optimizer"):
+            # share the cache, the runtime IR is embedded in the deploy IR
+            cache: dict = {}
+            ir_nodes = optimizer.optimize(ir_nodes, cache)
+            ir_runtime = optimizer.optimize(ir_runtime, cache)
 
     return ir_nodes, ir_runtime
 
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import json
+import warnings
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Hashable, Iterator, Optional
+
+from vyper.compiler.input_bundle import BUILTIN, CompilerInput, FileInput, PathLike
+from vyper.compiler.settings import Settings
+from vyper.utils import sha256sum
+from vyper.warnings import record_warnings
+
+if TYPE_CHECKING:
+    from vyper import ast as vy_ast
+    from vyper.semantics.analysis.base import ImportInfo
+    from vyper.semantics.analysis.imports import ImportAnalyzer
+
+# data structures for sharing work between the compilation targets of a
+# build (e.g. a `vyper a.vy b.vy` or a standard json run). the main thing
+# which gets shared is imported modules: a library which is imported by
+# many compilation targets only needs to be parsed and analyzed once.
+#
+# NOTE: codegen and storage allocation write per-target state (positions,
+# function ids, IR info) onto the types of the shared modules, so targets
+# sharing a session must be compiled one after another, and the outputs
+# of a target must be generated before the next target is compiled.
+
+
+@dataclass
+class _CachedModule:
+    module: vy_ast.Module
+    file_key: Hashable
+    # a hash of the modules which the imports of this module resolve to,
+    # set once its imports have been resolved (see `ModuleCache.load`)
+    imports_key: Optional[str] = None
+    # the last compilation target which used the module
+    last_used: int = 0
+    # warnings emitted while parsing and analyzing the module, which get
+    # replayed when a later compilation target reuses the module.
+    parse_warnings: list[Warning] = field(default_factory=list)
+    analysis_warnings: list[Warning] = field(default_factory=list)
+
+
+# resolves an import statement of a module against the input bundle of the
+# current compilation target: (module, level, module name) -> compiler input.
+# raises FileNotFoundError
+FindImport = Callable[["vy_ast.Module", int, str], CompilerInput]
+
+
+class ModuleCache:
+    """
+    Memoizes parsed (and, once a compilation target has analyzed them,
+    analyzed) modules. Modules are keyed by file contents and the hashes
+    of the modules their imports resolve to, so that when a file changes,
+    only the modules which (transitively) import it have to be redone.
+    If `max_age` is given, modules which were not used by the last
+    `max_age` compilation targets are dropped.
+    """
+
+    def __init__(self, max_age: Optional[int] = None):
+        self.max_age = max_age
+        self._generation = 0
+
+        # (file key, imports key) -> module with resolved imports
+        self._modules: dict[tuple[Hashable, str], _CachedModule] = {}
+        # file key -> a module with that file key. its import statements
+        # are the same for all modules with that file key.
+        self._sources: dict[Hashable, _CachedModule] = {}
+        self._by_id: dict[int, _CachedModule] = {}
+
+    def clear(self) -> None:
+        self._modules.clear()
+        self._sources.clear()
+        self._by_id.clear()
+
+    def _file_key(self, file: CompilerInput, search_paths: list[PathLike]) -> Hashable:
+        return (file.sha256sum, file.source_id, file.path, file.resolved_path, tuple(search_paths))
+
+    def load(
+        self,
+        file: FileInput,
+        search_paths: list[PathLike],
+        parse: Callable[[FileInput], vy_ast.Module],
+        find_import: FindImport,
+        memo: dict[Hashable, Optional[str]],
+    ) -> vy_ast.Module:
+        """
+        Get the module for a file, reusing a module with the same file
+        contents if its imports still resolve to the same modules.
+        `memo` memoizes imports keys for the current compilation target.
+        """
+        file_key = self._file_key(file, search_paths)
+        imports_key = self._imports_key(file_key, search_paths, find_import, memo)
+        if imports_key is not None:
+            if (entry := self._modules.get((file_key, imports_key))) is not None:
+                _replay(entry.parse_warnings)
+                return entry.module
+
+        with record_warnings() as caught:
+            module = parse(file)
+
+        entry = _CachedModule(module, file_key, parse_warnings=[w.message for w in caught])
+        self._by_id[id(module)] = entry
+        return module
+
+    def _imports_key(
+        self,
+        file_key: Hashable,
+        search_paths: list[PathLike],
+        find_import: FindImport,
+        memo: dict[Hashable, Optional[str]],
+    ) -> Optional[str]:
+        # compute the imports key which a module with the given file key
+        # would get in the current compilation target, or None if some
+        # import can't be resolved to a cached module.
+        if file_key in memo:
+            return memo[file_key]
+        # guard against import cycles
+        memo[file_key] = None
+
+        if (source := self._sources.get(file_key)) is None:
+            return None
+
+        acc = []
+        for info, level in _import_infos(source.module):
+            try:
+                compiler_input = find_import(source.module, level, info.qualified_module_name)
+            except FileNotFoundError:
+                return None
+
+            subkey = ""
+            if isinstance(compiler_input, FileInput) and compiler_input.source_id != BUILTIN:
+                import_key = self._file_key(compiler_input, search_paths)
+                if (key := self._imports_key(import_key, search_paths, find_import, memo)) is None:
+                    return None
+                subkey = key
+            acc.append(_import_key(compiler_input, subkey))
+
+        ret = sha256sum("".join(acc))
+        memo[file_key] = ret
+        return ret
+
+    def _resolved_imports_key(self, module: vy_ast.Module) -> str:
+        # compute the imports key of a module from its resolved imports
+        acc = []
+        for info, _ in _import_infos(module):
+            subkey = ""
+            if (entry := self._by_id.get(id(info.parsed))) is not None:
+                # imports are resolved before the modules importing them
+                assert entry.imports_key is not None
+                subkey = entry.imports_key
+            acc.append(_import_key(info.compiler_input, subkey))
+        return sha256sum("".join(acc))
+
+    def is_resolved(self, module: vy_ast.Module) -> bool:
+        entry = self._by_id.get(id(module))
+        return entry is not None and entry.imports_key is not None
+
+    def mark_resolved(self, modules) -> None:
+        # `modules` are in import order, i.e. the imports of a module
+        # come before the module itself
+        self._generation += 1
+        for module in modules:
+            if (entry := self._by_id.get(id(module))) is None:
+                continue
+            entry.last_used = self._generation
+            if entry.imports_key is not None:
+                continue
+            entry.imports_key = self._resolved_imports_key(module)
+            self._modules[(entry.file_key, entry.imports_key)] = entry
+            self._sources[entry.file_key] = entry
+
+        if self.max_age is not None:
+            self._evict(self._generation - self.max_age)
+
+    def _evict(self, generation: int) -> None:
+        # a module is used whenever a module which imports it is used, so
+        # modules are never evicted before the modules which import them.
+        for key, entry in list(self._modules.items()):
+            if entry.last_used > generation:
+                continue
+            del self._modules[key]
+            del self._by_id[id(entry.module)]
+            if self._sources.get(entry.file_key) is entry:
+                del self._sources[entry.file_key]
+
+    def analyze(self, module: vy_ast.Module, import_analysis: ImportAnalyzer) -> None:
+        """
+        Analyze a compilation target, reusing the analysis of imported
+        modules which were already analyzed by a previous target.
+        """
+        from vyper import ast as vy_ast
+        from vyper.semantics import analyze_module
+
+        entries = []
+        for imported in import_analysis.compiler_inputs.values():
+            if (entry := self._by_id.get(id(imported))) is not None:
+                entries.append(entry)
+
+        fresh = []
+        for entry in entries:
+            if "type" in entry.module._metadata:
+                _reset_codegen_state(entry.module)
+                _replay(entry.analysis_warnings)
+            else:
+                fresh.append(entry)
+
+        try:
+            with record_warnings() as caught:
+                analyze_module(module)
+        except Exception:
+            # the shared modules might be partially analyzed, start over.
+            self.clear()
+            raise
+
+        # attribute warnings to the module they point to, so that they can
+        # be replayed when the module gets reused.
+        fresh_modules = {id(entry.module): entry for entry in fresh}
+        for w in caught:
+            annotations = getattr(w.message, "annotations", None) or []
+            for node in annotations:
+                if isinstance(node, tuple):
+                    node = node[1]
+                if not isinstance(node, vy_ast.VyperNode):
+                    continue
+                entry = fresh_modules.get(id(node.module_node))
+                if entry is not None:
+                    entry.analysis_warnings.append(w.message)
+                break
+
+
+def _import_infos(module: vy_ast.Module) -> Iterator[tuple[ImportInfo, int]]:
+    # the resolved imports of a module, with the level of the import
+    from vyper import ast as vy_ast
+
+    for s in module.get_children((vy_ast.Import, vy_ast.ImportFrom)):
+        level = s.level if isinstance(s, vy_ast.ImportFrom) else 0
+        for info in s._metadata["import_infos"]:
+            yield info, level
+
+
+def _import_key(compiler_input: CompilerInput, subkey: str) -> str:
+    key = (compiler_input.source_id, str(compiler_input.resolved_path), compiler_input.sha256sum)
+    return sha256sum(json.dumps([*key, subkey]))
+
+
+def _replay(messages: list[Warning]) -> None:
+    for message in messages:
+        warnings.warn(message, stacklevel=3)
+
+
+def _reset_codegen_state(module: vy_ast.Module) -> None:
+    # reset the state which storage allocation and codegen write onto the
+    # types of a module, so that the module can be compiled again as part
+    # of another compilation target.
+    module_t = module._metadata["type"]
+
+    fn_ts = list(module_t.functions.values())
+    for varinfo in module_t.variables.values():
+        varinfo.position = None
+        if varinfo.is_public:
+            fn_ts.append(varinfo.getter_ast._metadata["func_type"])
+
+    for fn_t in fn_ts:
+        fn_t._ir_info = None
+        fn_t._function_id = None
+        if hasattr(fn_t, "reentrancy_key_position"):
+            del fn_t.reentrancy_key_position
+
+
+class BuildSession:
+    """
+    State shared by all compilation targets of a build.
+
+    Imported modules are memoized per resolved settings, since analysis
+    depends on settings like the EVM version. If `max_module_caches` is
+    given, only the memoization tables of the most recently used settings
+    are kept around, and if `max_module_age` is given, modules which were
+    not used by the last `max_module_age` compilation targets are dropped,
+    which bounds the memory usage of long-running sessions.
+    """
+
+    def __init__(
+        self, max_module_caches: Optional[int] = None, max_module_age: Optional[int] = None
+    ):
+        self._module_caches: OrderedDict[str, ModuleCache] = OrderedDict()
+        self.max_module_caches = max_module_caches
+        self.max_module_age = max_module_age
+
+    def module_cache(self, settings: Settings) -> ModuleCache:
+        key = json.dumps(settings.as_dict(), sort_keys=True)
+        if key not in self._module_caches:
+            self._module_caches[key] = ModuleCache(self.max_module_age)
+        self._module_caches.move_to_end(key)
+
+        if self.max_module_caches is not None:
+            while len(self._module_caches) > self.max_module_caches:
+                self._module_caches.popitem(last=False)
+
+        return self._module_caches[key]
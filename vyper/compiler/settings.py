@@ -1,6 +1,7 @@
 import contextlib
 import dataclasses
 import os
+import shlex
 from dataclasses import dataclass
 from enum import Enum
 from typing import Generator, Optional
@@ -60,6 +61,8 @@ class Settings:
     debug: Optional[bool] = None
     enable_decimals: Optional[bool] = None
     nonreentrancy_by_default: Optional[bool] = None
+    # venom pass pipeline, see vyper.venom.pipeline.parse_pipeline
+    venom_pipeline: Optional[str] = None
 
     def __post_init__(self):
         # sanity check inputs
@@ -73,6 +76,8 @@ class Settings:
             assert isinstance(self.enable_decimals, bool)
         if self.nonreentrancy_by_default is not None:
             assert isinstance(self.nonreentrancy_by_default, bool)
+        if self.venom_pipeline is not None:
+            assert isinstance(self.venom_pipeline, str)
 
     # CMC 2024-04-10 consider hiding the `enable_decimals` member altogether
     def get_enable_decimals(self) -> bool:
@@ -92,6 +97,8 @@ class Settings:
             ret.append(" --debug")
         if self.enable_decimals is True:
             ret.append(" --enable-decimals")
+        if self.venom_pipeline is not None:
+            ret.append(" --venom-pipeline " + shlex.quote(self.venom_pipeline))
 
         return "".join(ret)
 
@@ -0,0 +1,223 @@
+import contextlib
+import dataclasses
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+# structured per-phase timing and memory instrumentation, surfaced as the
+# `timings` output format. phases are recorded while a `Timings` object
+# is active (see `record_timings`), otherwise `timed_phase` is a no-op.
+#
+# since compiler phases are lazy and trigger each other (e.g. computing
+# the bytecode triggers codegen, which triggers analysis), phases nest.
+# the recorded time of a phase excludes the time spent in nested phases,
+# so that the times of all phases add up to the total compilation time.
+# the recorded memory is the peak traced memory (relative to the start of
+# the phase) including nested phases.
+#
+# additionally, each run of a venom pass is recorded individually (see
+# `PassStats`), for the `venom_pass_stats` output.
+
+
+@dataclass
+class PhaseTiming:
+    # number of times the phase ran
+    count: int = 0
+    # wall time in seconds, excluding nested phases
+    wall_time: float = 0.0
+    # peak memory allocated while the phase ran, in bytes
+    peak_memory: int = 0
+
+    def as_dict(self) -> dict:
+        return {"count": self.count, "wall_time": self.wall_time, "peak_memory": self.peak_memory}
+
+
+@dataclass
+class PassStats:
+    # the enclosing (non-pass) phase, e.g. "venom_generation_runtime"
+    stage: Optional[str]
+    # the function the pass ran on, or None for global passes
+    function: Optional[str]
+    pass_name: str
+    # the nth run of this pass on this function (starting from 1)
+    run: int
+    # wall time in seconds, including nested passes
+    wall_time: float
+    instructions_before: int
+    instructions_after: int
+    basic_blocks_before: int
+    basic_blocks_after: int
+    # analysis cache requests served from the cache / computed
+    analysis_hits: int
+    analysis_misses: int
+
+    def as_dict(self) -> dict:
+        return dataclasses.asdict(self)
+
+
+@dataclass
+class _Frame:
+    name: str
+    start_time: float
+    start_memory: int
+    peak_memory: int
+    nested_time: float = 0.0
+
+
+@dataclass
+class Timings:
+    # phase name -> timing, in order of first occurrence
+    phases: dict[str, PhaseTiming] = field(default_factory=dict)
+    # venom pass runs, in order of completion
+    passes: list[PassStats] = field(default_factory=list)
+    _stack: list[_Frame] = field(default_factory=list)
+    _pass_runs: dict[tuple, int] = field(default_factory=dict)
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    def _enter(self, name: str) -> None:
+        current, peak = _traced_memory()
+        if len(self._stack) > 0:
+            # stash the peak of the enclosing phase, since we reset it below
+            parent = self._stack[-1]
+            parent.peak_memory = max(parent.peak_memory, peak)
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+        self._stack.append(_Frame(name, time.perf_counter(), current, current))
+
+    def _exit(self) -> None:
+        frame = self._stack.pop()
+        elapsed = time.perf_counter() - frame.start_time
+
+        _, peak = _traced_memory()
+        frame.peak_memory = max(frame.peak_memory, peak)
+
+        if len(self._stack) > 0:
+            parent = self._stack[-1]
+            parent.nested_time += elapsed
+            parent.peak_memory = max(parent.peak_memory, frame.peak_memory)
+
+        timing = self.phases.setdefault(frame.name, PhaseTiming())
+        timing.count += 1
+        timing.wall_time += elapsed - frame.nested_time
+        timing.peak_memory = max(timing.peak_memory, frame.peak_memory - frame.start_memory)
+
+    def current_stage(self) -> Optional[str]:
+        # the innermost phase which is not a venom pass
+        for frame in reversed(self._stack):
+            if not frame.name.startswith("venom_pass:"):
+                return frame.name
+        return None
+
+    def record_pass(
+        self,
+        stage: Optional[str],
+        function: Optional[str],
+        pass_name: str,
+        wall_time: float,
+        before: tuple[int, int, int, int],
+        after: tuple[int, int, int, int],
+    ) -> None:
+        """
+        Record a venom pass run. `before` and `after` are tuples of
+        (instructions, basic blocks, analysis hits, analysis misses).
+        """
+        key = (stage, function, pass_name)
+        run = self._pass_runs.get(key, 0) + 1
+        self._pass_runs[key] = run
+
+        stats = PassStats(
+            stage=stage,
+            function=function,
+            pass_name=pass_name,
+            run=run,
+            wall_time=wall_time,
+            instructions_before=before[0],
+            instructions_after=after[0],
+            basic_blocks_before=before[1],
+            basic_blocks_after=after[1],
+            analysis_hits=after[2] - before[2],
+            analysis_misses=after[3] - before[3],
+        )
+        self.passes.append(stats)
+
+    def as_dict(self) -> dict:
+        return {name: timing.as_dict() for name, timing in self.phases.items()}
+
+    def format_pass_stats(self) -> str:
+        """
+        Format the venom pass runs as a human readable table.
+        """
+        header = ("stage", "function", "pass", "run", "ms", "insts", "bbs", "hits", "misses")
+        rows = [header]
+        for s in self.passes:
+            rows.append(
+                (
+                    s.stage or "-",
+                    s.function or "<global>",
+                    s.pass_name,
+                    str(s.run),
+                    f"{s.wall_time * 1000:.3f}",
+                    f"{s.instructions_before}->{s.instructions_after}",
+                    f"{s.basic_blocks_before}->{s.basic_blocks_after}",
+                    str(s.analysis_hits),
+                    str(s.analysis_misses),
+                )
+            )
+
+        widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+        lines = ["  ".join(c.ljust(w) for c, w in zip(row, widths)).rstrip() for row in rows]
+        return "\n".join(lines)
+
+
+def _traced_memory() -> tuple[int, int]:
+    if not tracemalloc.is_tracing():
+        return 0, 0
+    return tracemalloc.get_traced_memory()
+
+
+_active_timings: Optional[Timings] = None
+
+
+def get_active_timings() -> Optional[Timings]:
+    return _active_timings
+
+
+@contextlib.contextmanager
+def record_timings(timings: Timings, trace_memory: bool = True) -> Iterator[None]:
+    """
+    Record compiler phases into `timings` within this context. If
+    `trace_memory` is set, memory is traced using `tracemalloc`, which is
+    started (and stopped at the end) if it is not already running.
+    """
+    global _active_timings
+    prev = _active_timings
+    _active_timings = timings
+
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        yield
+    finally:
+        _active_timings = prev
+        if started_tracing:
+            tracemalloc.stop()
+
+
+@contextlib.contextmanager
+def timed_phase(name: str) -> Iterator[None]:
+    if _active_timings is None:
+        yield
+        return
+
+    with _active_timings.phase(name):
+        yield
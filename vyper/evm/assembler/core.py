@@ -5,7 +5,6 @@ from vyper.evm.assembler.instructions import (
     CONSTREF,
     DATA_ITEM,
     PUSH,
-    PUSH_N,
     PUSH_OFST,
     PUSHLABEL,
     AssemblyInstruction,
@@ -65,8 +64,9 @@ def _assembly_to_evm(
 
         elif isinstance(item, PUSHLABEL):
             # push a symbol to stack
+            # (with the smallest PUSH which fits, see `resolve_symbols`)
             label = item.label
-            bytecode = _compile_push_instruction(PUSH_N(symbol_map[label], n=SYMBOL_SIZE))
+            bytecode = _compile_push_instruction(PUSH(symbol_map[label]))
             ret.extend(bytecode)
 
         elif isinstance(item, Label):
@@ -79,11 +79,10 @@ def _assembly_to_evm(
             # PUSH_OFST (const foo) 32
             if isinstance(item.label, Label):
                 ofst = symbol_map[item.label] + item.ofst
-                bytecode = _compile_push_instruction(PUSH_N(ofst, SYMBOL_SIZE))
             else:
                 assert isinstance(item.label, CONSTREF)
                 ofst = const_map[item.label] + item.ofst
-                bytecode = _compile_push_instruction(PUSH(ofst))
+            bytecode = _compile_push_instruction(PUSH(ofst))
 
             ret.extend(bytecode)
 
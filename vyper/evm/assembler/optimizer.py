@@ -1,129 +1,14 @@
-from vyper.evm.assembler.instructions import (
-    DATA_ITEM,
-    PUSH_OFST,
-    PUSHLABEL,
-    DataHeader,
-    Label,
-    is_label,
-)
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from vyper.evm.assembler.instructions import DATA_ITEM, PUSH_OFST, PUSHLABEL, DataHeader, Label
 from vyper.exceptions import CompilerPanic
 from vyper.ir.optimizer import COMMUTATIVE_OPS
 
 _TERMINAL_OPS = ("JUMP", "RETURN", "REVERT", "STOP", "INVALID")
 
-
-def _prune_unreachable_code(assembly):
-    # delete code between terminal ops and JUMPDESTS as those are
-    # unreachable
-    changed = False
-    i = 0
-    while i < len(assembly) - 1:
-        if assembly[i] in _TERMINAL_OPS:
-            # find the next jumpdest or data section
-            for j in range(i + 1, len(assembly)):
-                next_is_reachable = isinstance(assembly[j], (Label, DataHeader))
-                if next_is_reachable:
-                    break
-            else:
-                # fixup an off-by-one if we made it to the end of the assembly
-                # without finding an jumpdest or sublist
-                j = len(assembly)
-            changed |= j > i + 1
-            del assembly[i + 1 : j]
-
-        i += 1
-
-    return changed
-
-
-def _prune_inefficient_jumps(assembly):
-    # prune sequences `PUSHLABEL x JUMP LABEL x` to `LABEL x`
-    changed = False
-    i = 0
-    while i < len(assembly) - 2:
-        if (
-            isinstance(assembly[i], PUSHLABEL)
-            and assembly[i + 1] == "JUMP"
-            and is_label(assembly[i + 2])
-            and assembly[i + 2] == assembly[i].label
-        ):
-            # delete PUSHLABEL x JUMP
-            changed = True
-            del assembly[i : i + 2]
-        else:
-            i += 1
-
-    return changed
-
-
-def _optimize_inefficient_jumps(assembly):
-    # optimize sequences
-    # `PUSHLABEL common JUMPI PUSHLABEL x JUMP LABEL common`
-    # to `ISZERO PUSHLABEL x JUMPI LABEL common`
-    changed = False
-    i = 0
-    while i < len(assembly) - 4:
-        if (
-            isinstance(assembly[i], PUSHLABEL)
-            and assembly[i + 1] == "JUMPI"
-            and isinstance(assembly[i + 2], PUSHLABEL)
-            and assembly[i + 3] == "JUMP"
-            and isinstance(assembly[i + 4], Label)
-            and assembly[i].label == assembly[i + 4]
-        ):
-            changed = True
-            assembly[i] = "ISZERO"
-            assembly[i + 1] = assembly[i + 2]
-            assembly[i + 2] = "JUMPI"
-            del assembly[i + 3 : i + 4]
-        else:
-            i += 1
-
-    return changed
-
-
-def _merge_jumpdests(assembly):
-    # When we have multiple JUMPDESTs in a row, or when a JUMPDEST
-    # is immediately followed by another JUMP, we can skip the
-    # intermediate jumps.
-    # (Usually a chain of JUMPs is created by a nested block,
-    # or some nested if statements.)
-    changed = False
-    i = 0
-    while i < len(assembly) - 2:
-        if is_label(assembly[i]):
-            current_symbol = assembly[i]
-            if is_label(assembly[i + 1]):
-                # LABEL x LABEL y
-                # replace all instances of PUSHLABEL x with PUSHLABEL y
-                # (could also remove PUSH_OFST and DATA_ITEM, but doesn't
-                #  affect correctness)
-                new_symbol = assembly[i + 1]
-                if new_symbol != current_symbol:
-                    for j in range(len(assembly)):
-                        if (
-                            isinstance(assembly[j], PUSHLABEL)
-                            and assembly[j].label == current_symbol
-                        ):
-                            assembly[j].label = new_symbol
-                            changed = True
-            elif isinstance(assembly[i + 1], PUSHLABEL) and assembly[i + 2] == "JUMP":
-                # LABEL x PUSHLABEL y JUMP
-                # replace all instances of PUSHLABEL x with PUSHLABEL y
-                # (could also remove PUSH_OFST and DATA_ITEM, but doesn't
-                #  affect correctness)
-                new_symbol = assembly[i + 1].label
-                for j in range(len(assembly)):
-                    if isinstance(assembly[j], PUSHLABEL) and assembly[j].label == current_symbol:
-                        assembly[j].label = new_symbol
-                        changed = True
-
-        i += 1
-
-    return changed
-
-
-_RETURNS_ZERO_OR_ONE = {
+_RETURNS_ZERO_OR_ONE = (
     "LT",
     "GT",
     "SLT",
@@ -134,128 +19,420 @@ _RETURNS_ZERO_OR_ONE = {
     "STATICCALL",
     "CALLCODE",
     "DELEGATECALL",
-}
-
+)
 
-def _merge_iszero(assembly):
-    changed = False
+_SWAP_OPS = tuple(f"SWAP{i}" for i in range(1, 17))
+
+
+@dataclass(frozen=True)
+class PeepholeRule:
+    """
+    A rewrite rule for the assembly optimizer. `apply(opt, node)` tries to
+    rewrite the assembly at (and following) `node`, and returns whether it
+    changed anything. it is only called for nodes whose item is one of the
+    `triggers`, which are either opcodes (str) or item types.
+    `window` is the number of items the rule looks at (starting at `node`),
+    it determines which nodes are revisited after a rewrite.
+    """
+
+    name: str
+    triggers: tuple[Any, ...]
+    apply: Callable[["PeepholeOptimizer", int], bool]
+    window: int
+
+
+class PeepholeOptimizer:
+    """
+    Worklist-driven peephole optimizer. The assembly is kept in a linked
+    list (indexed by the original position of each item), and every rewrite
+    only schedules the items whose windows overlap the rewritten items for
+    another visit, so the total work is linear in the size of the assembly
+    (rather than rescanning the whole assembly until nothing changes).
+    """
+
+    def __init__(self, assembly: list, rules: tuple[PeepholeRule, ...]):
+        self.items = list(assembly)
+        n = len(self.items)
+        self._end = n
+        self._next = list(range(1, n + 1))
+        self._prev = list(range(-1, n - 1))
+        self._alive = [True] * n
+        self._head = 0
+
+        # rewrites can enable matches of windows starting this many items
+        # before the rewritten item
+        self._lookbehind = max((rule.window for rule in rules), default=1) - 1
+
+        self._rules_by_opcode: dict[str, list[PeepholeRule]] = {}
+        self._rules_by_type: dict[type, list[PeepholeRule]] = {}
+        for rule in rules:
+            for trigger in rule.triggers:
+                if isinstance(trigger, str):
+                    self._rules_by_opcode.setdefault(trigger, []).append(rule)
+                else:
+                    self._rules_by_type.setdefault(trigger, []).append(rule)
+
+        # initially, every node is visited
+        self._worklist = deque(range(n))
+        self._queued = [True] * n
+
+        # number of references (PUSHLABEL, PUSH_OFST, DATA_ITEM) to each label
+        self.label_refs: dict[Label, int] = {}
+        # the PUSHLABEL nodes referencing each label
+        self.pushlabels: dict[Label, dict[int, None]] = {}
+        # the nodes defining each label
+        self.label_defs: dict[Label, list[int]] = {}
+        for node, item in enumerate(self.items):
+            self._register(node, item)
+
+        # statistics, for benchmarks
+        self.visits = 0
+        self.rewrites = 0
+
+    def run(self) -> None:
+        max_rewrites = 1024 * (self._end + 1)
+        while len(self._worklist) > 0:
+            node = self._worklist.popleft()
+            self._queued[node] = False
+            if not self._alive[node]:
+                continue
+            self.visits += 1
+
+            item = self.items[node]
+            if isinstance(item, str):
+                rules = self._rules_by_opcode.get(item, ())
+            else:
+                rules = self._rules_by_type.get(type(item), ())
+
+            for rule in rules:
+                if rule.apply(self, node):
+                    self.rewrites += 1
+                    if self.rewrites > max_rewrites:  # pragma: nocover
+                        raise CompilerPanic("infinite loop detected during assembly reduction")
+                    self._enqueue(node)
+                    break
 
-    i = 0
-    # list of opcodes that return 0 or 1
-    while i < len(assembly) - 2:
-        if (
-            isinstance(assembly[i], str)
-            and assembly[i] in _RETURNS_ZERO_OR_ONE
-            and assembly[i + 1 : i + 3] == ["ISZERO", "ISZERO"]
-        ):
-            changed = True
-            # drop the extra iszeros
-            del assembly[i + 1 : i + 3]
-        else:
-            i += 1
-    i = 0
-    while i < len(assembly) - 3:
-        # ISZERO ISZERO could map truthy to 1,
-        # but it could also just be a no-op before JUMPI.
-        if (
-            assembly[i : i + 2] == ["ISZERO", "ISZERO"]
-            and isinstance(assembly[i + 2], PUSHLABEL)
-            and assembly[i + 3] == "JUMPI"
-        ):
-            changed = True
-            del assembly[i : i + 2]
+    def result(self) -> list:
+        ret = []
+        node = self._head
+        while node != self._end:
+            ret.append(self.items[node])
+            node = self._next[node]
+        return ret
+
+    # navigation
+
+    def next(self, node: int) -> int | None:
+        ret = self._next[node]
+        return None if ret == self._end else ret
+
+    def window(self, node: int, size: int) -> list[int]:
+        """
+        Return (up to) `size` nodes starting at `node`.
+        """
+        ret = [node]
+        while len(ret) < size:
+            node = self._next[node]
+            if node == self._end:
+                break
+            ret.append(node)
+        return ret
+
+    def match(self, node: int, pattern: tuple) -> list[int] | None:
+        """
+        Return the nodes starting at `node` if their items are equal to `pattern`.
+        """
+        ret = []
+        for expected in pattern:
+            if node == self._end or self.items[node] != expected:
+                return None
+            ret.append(node)
+            node = self._next[node]
+        return ret
+
+    # rewrites
+
+    def delete(self, node: int) -> None:
+        assert self._alive[node]
+        self._unregister(node, self.items[node])
+        prev, next_ = self._prev[node], self._next[node]
+        if prev == -1:
+            self._head = next_
         else:
-            i += 1
-
-    return changed
-
-
-def _prune_unused_jumpdests(assembly):
-    changed = False
-
-    used_jumpdests: set[Label] = set()
-
-    # find all used jumpdests
-    for item in assembly:
+            self._next[prev] = next_
+        if next_ != self._end:
+            self._prev[next_] = prev
+        self._alive[node] = False
+
+        if next_ != self._end:
+            self._touch(next_)
+        elif prev != -1:
+            self._touch(prev)
+
+    def replace(self, node: int, item: Any) -> None:
+        assert self._alive[node]
+        self._unregister(node, self.items[node])
+        self.items[node] = item
+        self._register(node, item)
+        self._touch(node)
+
+    def relabel(self, old: Label, new: Label) -> bool:
+        """
+        Replace all instances of PUSHLABEL `old` with PUSHLABEL `new`.
+        """
+        users = self.pushlabels.pop(old, None)
+        if not users:
+            return False
+        count = len(users)
+        self.label_refs[old] -= count
+        self.label_refs[new] = self.label_refs.get(new, 0) + count
+        new_users = self.pushlabels.setdefault(new, {})
+        for node in users:
+            # (mutate the PUSHLABEL in place, like the other rewrites do)
+            self.items[node].label = new
+            new_users[node] = None
+            self._touch(node)
+
+        if self.label_refs[old] == 0:
+            self._enqueue_defs(old)
+        self._enqueue_defs(new)
+        return True
+
+    # bookkeeping
+
+    def _enqueue(self, node: int) -> None:
+        if not self._queued[node]:
+            self._queued[node] = True
+            self._worklist.append(node)
+
+    def _enqueue_defs(self, label: Label) -> None:
+        for node in self.label_defs.get(label, ()):
+            self._enqueue(node)
+
+    def _touch(self, node: int) -> None:
+        # revisit all windows which can contain `node`
+        self._enqueue(node)
+        for _ in range(self._lookbehind):
+            node = self._prev[node]
+            if node == -1:
+                break
+            self._enqueue(node)
+
+    def _add_ref(self, label: Label, delta: int) -> None:
+        refs = self.label_refs.get(label, 0) + delta
+        self.label_refs[label] = refs
+        if refs == 0:
+            # the label might be unused now
+            self._enqueue_defs(label)
+
+    def _register(self, node: int, item: Any) -> None:
         if isinstance(item, PUSHLABEL):
-            used_jumpdests.add(item.label)
-
-        if isinstance(item, PUSH_OFST) and isinstance(item.label, Label):
-            used_jumpdests.add(item.label)
+            self._add_ref(item.label, 1)
+            self.pushlabels.setdefault(item.label, {})[node] = None
+            # the label might be forwarded now
+            self._enqueue_defs(item.label)
+        elif isinstance(item, PUSH_OFST) and isinstance(item.label, Label):
+            self._add_ref(item.label, 1)
+        elif isinstance(item, DATA_ITEM) and isinstance(item.data, Label):
+            # symbols used in data sections are likely used for a jumptable.
+            self._add_ref(item.data, 1)
+        elif isinstance(item, Label):
+            self.label_defs.setdefault(item, []).append(node)
+
+    def _unregister(self, node: int, item: Any) -> None:
+        if isinstance(item, PUSHLABEL):
+            del self.pushlabels[item.label][node]
+            self._add_ref(item.label, -1)
+        elif isinstance(item, PUSH_OFST) and isinstance(item.label, Label):
+            self._add_ref(item.label, -1)
+        elif isinstance(item, DATA_ITEM) and isinstance(item.data, Label):
+            self._add_ref(item.data, -1)
+        elif isinstance(item, Label):
+            self.label_defs[item].remove(node)
 
-        if isinstance(item, DATA_ITEM) and isinstance(item.data, Label):
-            # add symbols used in data sections as they are likely
-            # used for a jumptable.
-            used_jumpdests.add(item.data)
-
-    # delete jumpdests that aren't used
-    i = 0
-    while i < len(assembly):
-        if is_label(assembly[i]) and assembly[i] not in used_jumpdests:
-            changed = True
-            del assembly[i]
-        else:
-            i += 1
 
+def _prune_unreachable_code(opt: PeepholeOptimizer, node: int) -> bool:
+    # delete code between terminal ops and JUMPDESTS as those are
+    # unreachable
+    changed = False
+    next_ = opt.next(node)
+    while next_ is not None and not isinstance(opt.items[next_], (Label, DataHeader)):
+        following = opt.next(next_)
+        opt.delete(next_)
+        changed = True
+        next_ = following
     return changed
 
 
-def _stack_peephole_opts(assembly):
-    changed = False
-    i = 0
-    while i < len(assembly) - 2:
-        if assembly[i : i + 3] == ["DUP1", "SWAP2", "SWAP1"]:
-            changed = True
-            del assembly[i + 2]
-            assembly[i] = "SWAP1"
-            assembly[i + 1] = "DUP2"
-            continue
-        # usually generated by with statements that return their input like
-        # (with x (...x))
-        if assembly[i : i + 3] == ["DUP1", "SWAP1", "POP"]:
-            # DUP1 SWAP1 POP == no-op
-            changed = True
-            del assembly[i : i + 3]
-            continue
-        # usually generated by nested with statements that don't return like
-        # (with x (with y ...))
-        if assembly[i : i + 3] == ["SWAP1", "POP", "POP"]:
-            # SWAP1 POP POP == POP POP
-            changed = True
-            del assembly[i]
-            continue
-        if (
-            isinstance(assembly[i], str)
-            and assembly[i].startswith("SWAP")
-            and assembly[i] == assembly[i + 1]
-        ):
-            changed = True
-            del assembly[i : i + 2]
-        if assembly[i] == "SWAP1" and str(assembly[i + 1]).lower() in COMMUTATIVE_OPS:
-            changed = True
-            del assembly[i]
-        if assembly[i] == "DUP1" and assembly[i + 1] == "SWAP1":
-            changed = True
-            del assembly[i + 1]
-        i += 1
-
-    return changed
+def _prune_inefficient_jumps(opt: PeepholeOptimizer, node: int) -> bool:
+    # prune sequences `PUSHLABEL x JUMP LABEL x` to `LABEL x`
+    nodes = opt.window(node, 3)
+    if len(nodes) < 3:
+        return False
+    pushlabel, jump, label = (opt.items[i] for i in nodes)
+    if jump == "JUMP" and isinstance(label, Label) and label == pushlabel.label:
+        # delete PUSHLABEL x JUMP
+        opt.delete(nodes[0])
+        opt.delete(nodes[1])
+        return True
+    return False
+
+
+def _optimize_inefficient_jumps(opt: PeepholeOptimizer, node: int) -> bool:
+    # optimize sequences
+    # `PUSHLABEL common JUMPI PUSHLABEL x JUMP LABEL common`
+    # to `ISZERO PUSHLABEL x JUMPI LABEL common`
+    nodes = opt.window(node, 5)
+    if len(nodes) < 5:
+        return False
+    items = [opt.items[i] for i in nodes]
+    if (
+        items[1] == "JUMPI"
+        and isinstance(items[2], PUSHLABEL)
+        and items[3] == "JUMP"
+        and isinstance(items[4], Label)
+        and items[0].label == items[4]
+    ):
+        opt.replace(nodes[0], "ISZERO")
+        opt.replace(nodes[1], items[2])
+        opt.replace(nodes[2], "JUMPI")
+        opt.delete(nodes[3])
+        return True
+    return False
+
+
+def _merge_jumpdests(opt: PeepholeOptimizer, node: int) -> bool:
+    # When we have multiple JUMPDESTs in a row, or when a JUMPDEST
+    # is immediately followed by another JUMP, we can skip the
+    # intermediate jumps.
+    # (Usually a chain of JUMPs is created by a nested block,
+    # or some nested if statements.)
+    # (could also remove PUSH_OFST and DATA_ITEM, but doesn't
+    #  affect correctness)
+    current_symbol = opt.items[node]
+    new_symbol = _jump_target(opt, node)
+    if new_symbol is None:
+        return False
+
+    # follow chains of jumps to their end, so that long chains do not
+    # need to be forwarded one step at a time
+    seen = {current_symbol}
+    while new_symbol not in seen:
+        defs = opt.label_defs.get(new_symbol)
+        if not defs or (target := _jump_target(opt, defs[0])) is None:
+            break
+        seen.add(new_symbol)
+        new_symbol = target
+
+    if new_symbol == current_symbol:
+        # `LABEL x PUSHLABEL x JUMP`, an empty infinite loop
+        return False
+
+    # replace all instances of PUSHLABEL x with PUSHLABEL y
+    return opt.relabel(current_symbol, new_symbol)
+
+
+def _jump_target(opt: PeepholeOptimizer, node: int) -> Label | None:
+    # the label which jumping to the label at `node` is equivalent to
+    # jumping to, if any
+    nodes = opt.window(node, 3)
+    if len(nodes) >= 2 and isinstance(opt.items[nodes[1]], Label):
+        # LABEL x LABEL y
+        return opt.items[nodes[1]]
+    if (
+        len(nodes) == 3
+        and isinstance(opt.items[nodes[1]], PUSHLABEL)
+        and opt.items[nodes[2]] == "JUMP"
+    ):
+        # LABEL x PUSHLABEL y JUMP
+        return opt.items[nodes[1]].label
+    return None
+
+
+def _merge_iszero(opt: PeepholeOptimizer, node: int) -> bool:
+    # drop the extra iszeros after opcodes that return 0 or 1
+    if (nodes := opt.match(node, (opt.items[node], "ISZERO", "ISZERO"))) is not None:
+        opt.delete(nodes[1])
+        opt.delete(nodes[2])
+        return True
+    return False
+
+
+def _merge_iszero_jumpi(opt: PeepholeOptimizer, node: int) -> bool:
+    # ISZERO ISZERO could map truthy to 1,
+    # but it could also just be a no-op before JUMPI.
+    nodes = opt.window(node, 4)
+    if len(nodes) < 4:
+        return False
+    items = [opt.items[i] for i in nodes]
+    if items[1] == "ISZERO" and isinstance(items[2], PUSHLABEL) and items[3] == "JUMPI":
+        opt.delete(nodes[0])
+        opt.delete(nodes[1])
+        return True
+    return False
+
+
+def _prune_unused_jumpdests(opt: PeepholeOptimizer, node: int) -> bool:
+    # delete jumpdests that aren't used
+    if opt.label_refs.get(opt.items[node], 0) == 0:
+        opt.delete(node)
+        return True
+    return False
+
+
+def _stack_peephole_opts(opt: PeepholeOptimizer, node: int) -> bool:
+    if (nodes := opt.match(node, ("DUP1", "SWAP2", "SWAP1"))) is not None:
+        opt.delete(nodes[2])
+        opt.replace(nodes[0], "SWAP1")
+        opt.replace(nodes[1], "DUP2")
+        return True
+    # usually generated by with statements that return their input like
+    # (with x (...x))
+    if (nodes := opt.match(node, ("DUP1", "SWAP1", "POP"))) is not None:
+        # DUP1 SWAP1 POP == no-op
+        for i in nodes:
+            opt.delete(i)
+        return True
+    # usually generated by nested with statements that don't return like
+    # (with x (with y ...))
+    if opt.match(node, ("SWAP1", "POP", "POP")) is not None:
+        # SWAP1 POP POP == POP POP
+        opt.delete(node)
+        return True
+
+    item = opt.items[node]
+    next_ = opt.next(node)
+    if next_ is None:
+        return False
+    next_item = opt.items[next_]
+    if item.startswith("SWAP") and item == next_item:
+        opt.delete(node)
+        opt.delete(next_)
+        return True
+    if item == "SWAP1" and str(next_item).lower() in COMMUTATIVE_OPS:
+        opt.delete(node)
+        return True
+    if item == "DUP1" and next_item == "SWAP1":
+        opt.delete(next_)
+        return True
+    return False
+
+
+# NOTE: for each item, the rules are tried in this order
+DEFAULT_RULES: tuple[PeepholeRule, ...] = (
+    PeepholeRule("prune_unreachable_code", _TERMINAL_OPS, _prune_unreachable_code, window=2),
+    PeepholeRule("merge_iszero", _RETURNS_ZERO_OR_ONE, _merge_iszero, window=3),
+    PeepholeRule("merge_iszero_jumpi", ("ISZERO",), _merge_iszero_jumpi, window=4),
+    PeepholeRule("merge_jumpdests", (Label,), _merge_jumpdests, window=3),
+    PeepholeRule("prune_inefficient_jumps", (PUSHLABEL,), _prune_inefficient_jumps, window=3),
+    PeepholeRule("optimize_inefficient_jumps", (PUSHLABEL,), _optimize_inefficient_jumps, window=5),
+    PeepholeRule("prune_unused_jumpdests", (Label,), _prune_unused_jumpdests, window=1),
+    PeepholeRule("stack_peephole_opts", ("DUP1",) + _SWAP_OPS, _stack_peephole_opts, window=3),
+)
 
 
 # optimize assembly, in place
-def optimize_assembly(assembly):
-    for _ in range(1024):
-        changed = False
-
-        changed |= _prune_unreachable_code(assembly)
-        changed |= _merge_iszero(assembly)
-        changed |= _merge_jumpdests(assembly)
-        changed |= _prune_inefficient_jumps(assembly)
-        changed |= _optimize_inefficient_jumps(assembly)
-        changed |= _prune_unused_jumpdests(assembly)
-        changed |= _stack_peephole_opts(assembly)
-
-        if not changed:
-            return
-
-    raise CompilerPanic("infinite loop detected during assembly reduction")  # pragma: nocover
+def optimize_assembly(assembly: list, rules: tuple[PeepholeRule, ...] = DEFAULT_RULES) -> None:
+    opt = PeepholeOptimizer(assembly, rules)
+    opt.run()
+    assembly[:] = opt.result()
@@ -1,4 +1,4 @@
-from typing import Any, TypeVar
+from typing import Any, Optional, TypeVar
 
 from vyper.evm.assembler.instructions import (
     CONST,
@@ -16,7 +16,7 @@ from vyper.evm.opcodes import get_opcodes
 from vyper.exceptions import CompilerPanic
 from vyper.utils import OrderedSet
 
-SYMBOL_SIZE = 2  # size of a PUSH instruction for a code symbol
+SYMBOL_SIZE = 2  # size of a code symbol in a data section
 
 
 T = TypeVar("T")
@@ -35,6 +35,14 @@ def resolve_symbols(
     """
     Construct symbol map from assembly list
 
+    Pushes of code symbols (PUSHLABEL and PUSH_OFST of a label) use the
+    smallest PUSH instruction which fits the value of the symbol. Since
+    the size of the pushes in turn affects the value of the symbols, the
+    symbols are resolved iteratively: starting from the smallest possible
+    pushes, the symbol map is recomputed with the push sizes implied by the
+    previous symbol map until it does not change anymore. Symbol values can
+    only grow between iterations, so this converges.
+
     Returns:
         symbol_map: dict from labels to values
         const_map: dict from CONSTREFs to values
@@ -48,39 +56,51 @@ def resolve_symbols(
         "error_map": {},
     }
 
-    symbol_map: dict[Label, int] = {}
     const_map: dict[CONSTREF, int] = {}
 
-    pc: int = 0
-
     # resolve constants
     for item in assembly:
         if isinstance(item, CONST):
             # should this be merged into the symbol map?
             _add_to_symbol_map(const_map, CONSTREF(item.name), item.value)
 
-    # resolve labels (i.e. JUMPDEST locations) to actual code locations,
-    # and simultaneously build the source map.
+    # relax the pushes of code symbols until the symbol map is stable
+    symbol_map: dict[Label, int] = {}
+    while True:
+        new_symbol_map = _resolve_labels(assembly, const_map, symbol_map, None)
+        if new_symbol_map == symbol_map:
+            break
+        symbol_map = new_symbol_map
+
+    # build the source map with the final layout
+    _resolve_labels(assembly, const_map, symbol_map, source_map)
+
+    source_map["breakpoints"] = list(source_map["breakpoints"])
+    source_map["pc_breakpoints"] = list(source_map["pc_breakpoints"])
+
+    return symbol_map, const_map, source_map
+
+
+def _resolve_labels(
+    assembly: list[AssemblyInstruction],
+    const_map: dict[CONSTREF, int],
+    symbol_map: dict[Label, int],
+    source_map: Optional[dict[str, Any]],
+) -> dict[Label, int]:
+    """
+    Resolve labels (i.e. JUMPDEST locations) to actual code locations,
+    assuming the pushes of code symbols have the sizes implied by
+    `symbol_map` (where missing symbols count as 0), and build the source
+    map if `source_map` is given.
+    """
+    ret: dict[Label, int] = {}
+    pc: int = 0
+
     for i, item in enumerate(assembly):
-        # add it to the source map
-        note_line_num(source_map, pc, item)
-
-        # update pc_jump_map
-        if item == "JUMP":
-            assert i != 0  # otherwise we can get assembly[-1]
-            last = assembly[i - 1]
-            if isinstance(last, PUSHLABEL) and last.label.label.startswith("internal"):
-                if last.label.label.endswith("cleanup"):
-                    # exit an internal function
-                    source_map["pc_jump_map"][pc] = "o"
-                else:
-                    # enter an internal function
-                    source_map["pc_jump_map"][pc] = "i"
-            else:
-                # everything else
-                source_map["pc_jump_map"][pc] = "-"
-        elif item in ("JUMPI", "JUMPDEST"):
-            source_map["pc_jump_map"][pc] = "-"
+        if source_map is not None:
+            # add it to the source map
+            note_line_num(source_map, pc, item)
+            _note_jump(source_map, pc, assembly, i, item)
 
         if item == "DEBUG":
             continue  # "debug" opcode does not go into bytecode
@@ -90,22 +110,22 @@ def resolve_symbols(
 
         # update pc
         if isinstance(item, Label):
-            _add_to_symbol_map(symbol_map, item, pc)
+            _add_to_symbol_map(ret, item, pc)
             pc += 1  # jumpdest
 
         elif isinstance(item, DataHeader):
             # Don't increment pc as the symbol itself doesn't go into code
-            _add_to_symbol_map(symbol_map, item.label, pc)
+            _add_to_symbol_map(ret, item.label, pc)
 
         elif isinstance(item, PUSHLABEL):
-            pc += SYMBOL_SIZE + 1  # PUSH2 highbits lowbits
+            pc += calc_push_size(symbol_map.get(item.label, 0))
 
         elif isinstance(item, PUSH_OFST):
             assert isinstance(item.ofst, int), item
-            # [PUSH_OFST, (Label foo), bar] -> PUSH2 (foo+bar)
+            # [PUSH_OFST, (Label foo), bar] -> PUSHN (foo+bar)
             # [PUSH_OFST, _mem_foo, bar] -> PUSHN (foo+bar)
             if isinstance(item.label, Label):
-                pc += SYMBOL_SIZE + 1  # PUSH2 highbits lowbits
+                pc += calc_push_size(symbol_map.get(item.label, 0) + item.ofst)
             elif isinstance(item.label, CONSTREF):
                 const = const_map[item.label]
                 val = const + item.ofst
@@ -126,13 +146,29 @@ def resolve_symbols(
             assert isinstance(item, str) and item in get_opcodes(), item
             pc += 1
 
-    source_map["breakpoints"] = list(source_map["breakpoints"])
-    source_map["pc_breakpoints"] = list(source_map["pc_breakpoints"])
-
     # magic -- probably the assembler should actually add this label
-    _add_to_symbol_map(symbol_map, Label("code_end"), pc)
+    _add_to_symbol_map(ret, Label("code_end"), pc)
 
-    return symbol_map, const_map, source_map
+    return ret
+
+
+def _note_jump(source_map: dict[str, Any], pc: int, assembly: list, i: int, item):
+    # update pc_jump_map
+    if item == "JUMP":
+        assert i != 0  # otherwise we can get assembly[-1]
+        last = assembly[i - 1]
+        if isinstance(last, PUSHLABEL) and last.label.label.startswith("internal"):
+            if last.label.label.endswith("cleanup"):
+                # exit an internal function
+                source_map["pc_jump_map"][pc] = "o"
+            else:
+                # enter an internal function
+                source_map["pc_jump_map"][pc] = "i"
+        else:
+            # everything else
+            source_map["pc_jump_map"][pc] = "-"
+    elif item in ("JUMPI", "JUMPDEST"):
+        source_map["pc_jump_map"][pc] = "-"
 
 
 def note_line_num(line_number_map, pc, item):
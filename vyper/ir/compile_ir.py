@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import contextlib
-import copy
 from typing import Any, Optional
 
 import cbor2
@@ -78,22 +77,27 @@ def _runtime_code_offsets(ctor_mem_size, runtime_codelen):
 # like `return return_ofst return_len`. this is kind of brittle because
 # it assumes the arguments are already on the stack, to be replaced
 # by better liveness analysis.
-# NOTE: modifies input in-place
 def _rewrite_return_sequences(ir_node, label_params=None):
-    args = ir_node.args
+    # rewrite persistently, i.e. without mutating `ir_node`: subtrees which
+    # are not rewritten are shared with the original tree.
+    if ir_node.value == "label":
+        label_params = set(t.value for t in ir_node.args[1].args)
+
+    args = [_rewrite_return_sequences(t, label_params) for t in ir_node.args]
+    value = ir_node.value
 
-    if ir_node.value == "return":
+    if value == "return":
         if args[0].value == "ret_ofst" and args[1].value == "ret_len":
-            ir_node.args[0].value = "pass"
-            ir_node.args[1].value = "pass"
-    if ir_node.value == "exit_to":
+            args[0] = args[0].copy_with(value="pass")
+            args[1] = args[1].copy_with(value="pass")
+    if value == "exit_to":
         # handle exit from private function
         if args[0].value == "return_pc":
-            ir_node.value = "jump"
-            args[0].value = "pass"
+            value = "jump"
+            args[0] = args[0].copy_with(value="pass")
         else:
             # handle jump to cleanup
-            ir_node.value = "seq"
+            value = "seq"
 
             _t = ["seq"]
             if "return_buffer" in label_params:
@@ -101,15 +105,22 @@ def _rewrite_return_sequences(ir_node, label_params=None):
 
             dest = args[0].value
             # works for both internal and external exit_to
-            more_args = ["pass" if t.value == "return_pc" else t for t in args[1:]]
+            more_args: list = []
+            for t in args[1:]:
+                if t.value == "return_pc":
+                    more_args.append("pass")
+                elif t.ast_source is None:
+                    # (`from_list` would set the ast_source in place, but
+                    # `t` is shared with `ir_node`)
+                    more_args.append(t.copy_with(ast_source=ir_node.ast_source))
+                else:
+                    more_args.append(t)
             _t.append(["goto", dest] + more_args)
-            ir_node.args = IRnode.from_list(_t, ast_source=ir_node.ast_source).args
-
-    if ir_node.value == "label":
-        label_params = set(t.value for t in ir_node.args[1].args)
+            args = IRnode.from_list(_t, ast_source=ir_node.ast_source).args
 
-    for t in args:
-        _rewrite_return_sequences(t, label_params)
+    if value == ir_node.value and all(a is b for a, b in zip(args, ir_node.args)):
+        return ir_node
+    return ir_node.copy_with(value=value, args=args)
 
 
 ##############################
@@ -133,9 +144,9 @@ def compile_to_assembly(
             be `None` for runtime code). the value is opaque, and will be
             passed directly to `cbor2.dumps()`.
     """
-    # don't mutate the ir since the original might need to be output, e.g. `-f ir,asm`
-    code = copy.deepcopy(code)
-    _rewrite_return_sequences(code)
+    # note: the rewrite does not mutate the ir since the original might
+    # need to be output, e.g. `-f ir,asm`
+    code = _rewrite_return_sequences(code)
 
     res = _IRnodeLowerer(optimize, compiler_metadata).compile_to_assembly(code)
 
@@ -1,5 +1,5 @@
 import operator
-from typing import List, Optional, Tuple, Union
+from typing import Any, List, Optional, Tuple, Union
 
 from vyper.codegen.ir_node import IRnode
 from vyper.evm.opcodes import version_check
@@ -416,15 +416,73 @@ def _check_symbols(symbols, ir_node):
         raise CompilerPanic(f"missing symbols: {symbols - to_check}")
 
 
-def optimize(node: IRnode) -> IRnode:
-    _, ret = _optimize(node, parent=None)
+def optimize(node: IRnode, cache: Optional[dict] = None) -> IRnode:
+    """
+    Optimize an IR tree. `cache` memoizes the optimized subtrees, it can
+    be shared between calls so that subtrees which are shared between
+    trees (e.g. the runtime code, which is embedded in the deploy code)
+    are only optimized once.
+    """
+    if cache is None:
+        cache = {}
+    _, ret = _optimize(node, None, cache)
     return ret
 
 
-def _optimize(node: IRnode, parent: Optional[IRnode]) -> Tuple[bool, IRnode]:
-    starting_symbols = node.unique_symbols
+# subtrees are memoized by identity, and by the opcode of the parent if
+# the result depends on it: binops are optimized against their parent (see
+# `_optimize_binop`), and a node can turn into a binop which is optimized
+# against the same parent (e.g. `(seq x)` => `x`).
+def _cache_key(node: IRnode, parent: Optional[IRnode], uses_parent: bool) -> tuple:
+    if uses_parent:
+        return (id(node), _parent_op(parent))
+    return (id(node),)
 
-    res = [_optimize(arg, node) for arg in node.args]
+
+def _parent_op(parent: Optional[IRnode]) -> Any:
+    return parent.value if parent is not None else None
+
+
+def _uses_parent(node: IRnode, cache: dict) -> bool:
+    # whether the optimization of `node` (which is in the cache) depends on
+    # its parent
+    return _cache_key(node, None, False) not in cache
+
+
+# attributes which `IRnode.from_list` may update in place when a node is
+# used as an argument of a new node
+_FROM_LIST_ATTRS = ("typ", "location", "ast_source", "error_msg", "encoding")
+
+
+def _optimize(node: IRnode, parent: Optional[IRnode], cache: dict) -> Tuple[bool, IRnode]:
+    key = _cache_key(node, parent, False)
+    if key not in cache:
+        key = _cache_key(node, parent, True)
+    if key in cache:
+        _, changed, ret, attrs = cache[key]
+        if changed:
+            # the node occurs more than once. give each occurrence its own
+            # root (as if it were optimized again), since the parent might
+            # update it in place.
+            ret = ret.copy_with(**dict(zip(_FROM_LIST_ATTRS, attrs)))
+        return changed, ret
+
+    changed, ret, uses_parent = _optimize_r(node, parent, cache)
+
+    # (keep a reference to `node` so that its id is not reused)
+    attrs = tuple(getattr(ret, attr) for attr in _FROM_LIST_ATTRS) if changed else None
+    cache[_cache_key(node, parent, uses_parent)] = (node, changed, ret, attrs)
+    # the result is a fixed point of the optimizer, so that optimizing
+    # a rebuilt node does not visit its (already optimized) children again
+    cache.setdefault(_cache_key(ret, parent, uses_parent), (ret, False, ret, None))
+
+    return changed, ret
+
+
+def _optimize_r(node: IRnode, parent: Optional[IRnode], cache: dict) -> Tuple[bool, IRnode, bool]:
+    # returns whether the node changed, the optimized node, and whether the
+    # result depends on the parent
+    res = [_optimize(arg, node, cache) for arg in node.args]
     argz: list
     if len(res) == 0:
         args_changed, argz = False, []
@@ -441,9 +499,9 @@ def _optimize(node: IRnode, parent: Optional[IRnode]) -> Tuple[bool, IRnode]:
     annotation = node.annotation
     add_gas_estimate = node.add_gas_estimate
     is_self_call = node.is_self_call
-    passthrough_metadata = node.passthrough_metadata
 
     changed = False
+    uses_parent = False
 
     # in general, we cannot enforce the symbols check. for instance,
     # the dead branch eliminator will almost always trip the symbols check.
@@ -453,7 +511,7 @@ def _optimize(node: IRnode, parent: Optional[IRnode]) -> Tuple[bool, IRnode]:
     def finalize(val, args):
         if not changed and not args_changed:
             # skip IRnode.from_list, which may be (compile-time) expensive
-            return False, node
+            return False, node, uses_parent
 
         ir_builder = [val, *args]
         ret = IRnode.from_list(
@@ -465,14 +523,14 @@ def _optimize(node: IRnode, parent: Optional[IRnode]) -> Tuple[bool, IRnode]:
             annotation=annotation,
             add_gas_estimate=add_gas_estimate,
             is_self_call=is_self_call,
-            passthrough_metadata=passthrough_metadata,
+            passthrough_metadata=node.passthrough_metadata,
         )
 
         if should_check_symbols:
-            _check_symbols(starting_symbols, ret)
+            _check_symbols(node.unique_symbols, ret)
 
-        _, ret = _optimize(ret, parent)
-        return True, ret
+        _, optimized = _optimize(ret, parent, cache)
+        return True, optimized, uses_parent or _uses_parent(ret, cache)
 
     if value == "seq":
         changed |= _merge_memzero(argz)
@@ -485,12 +543,14 @@ def _optimize(node: IRnode, parent: Optional[IRnode]) -> Tuple[bool, IRnode]:
         # (seq x) => (x) for cleanliness and
         # to avoid blocking other optimizations
         if len(argz) == 1:
-            return True, _optimize(argz[0], parent)[1]
+            _, ret = _optimize(argz[0], parent, cache)
+            return True, ret, _uses_parent(argz[0], cache)
 
         return finalize(value, argz)
 
     if value in arith:
-        parent_op = parent.value if parent is not None else None
+        uses_parent = True
+        parent_op = _parent_op(parent)
 
         res = _optimize_binop(value, argz, annotation, parent_op)
         if res is not None:
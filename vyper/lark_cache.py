@@ -0,0 +1,112 @@
+import contextlib
+import hashlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+import lark
+from lark import Lark
+from lark.load_grammar import load_grammar
+
+# an on-disk cache of lark parsers. building the LALR tables for a grammar
+# takes much longer than loading them, and the tables are rebuilt in every
+# process (e.g. every `venom` invocation or test worker) otherwise.
+# entries are keyed by the grammar, the parser options and the lark and
+# python versions, so a stale entry is never loaded.
+#
+# the cache lives in a per-user directory (the entries are pickles, so
+# they should not be shared between users). set VYPER_LARK_CACHE_DIR to
+# use a different directory, or to the empty string to disable the cache.
+
+
+def _default_cache_dir() -> Optional[Path]:
+    if "VYPER_LARK_CACHE_DIR" in os.environ:
+        cache_dir = os.environ["VYPER_LARK_CACHE_DIR"]
+        return Path(cache_dir) if cache_dir else None
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME")
+    if xdg_cache_home:
+        return Path(xdg_cache_home) / "vyper" / "parsers"
+    try:
+        return Path.home() / ".cache" / "vyper" / "parsers"
+    except RuntimeError:
+        # no home directory
+        return None
+
+
+LARK_CACHE_DIR = _default_cache_dir()
+
+
+def _cache_key(grammar: str, options: dict[str, Any], runtime_options: dict[str, Any]) -> str:
+    # options are strings or classes, whose repr is stable across
+    # processes. runtime options are instances, use their classes.
+    key_data = [
+        grammar,
+        sorted((k, repr(v)) for k, v in options.items()),
+        sorted((k, repr(type(v))) for k, v in runtime_options.items()),
+        lark.__version__,
+        sys.version,
+    ]
+    return hashlib.sha256(repr(key_data).encode("utf-8")).hexdigest()
+
+
+def _load(path: Path, grammar: str, runtime_options: dict[str, Any]) -> Optional[Lark]:
+    try:
+        with path.open("rb") as f:
+            # (this is how lark loads its own cache)
+            parser = Lark.__new__(Lark)._load(f, **runtime_options)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # corrupted or incompatible entry, rebuild it
+        with contextlib.suppress(OSError):
+            path.unlink()
+        return None
+
+    # lark does not save the grammar with the parser tables, restore it
+    # (e.g. `hypothesis.extra.lark` uses it). loading the grammar is much
+    # cheaper than building the tables.
+    parser.source_grammar = grammar
+    parser.grammar, _ = load_grammar(
+        grammar, parser.source_path, parser.options.import_paths, parser.options.keep_all_tokens
+    )
+    parser.ignore_tokens = list(parser.lexer_conf.ignore)
+    return parser
+
+
+def _save(parser: Lark, path: Path) -> None:
+    # write to a temporary file and then rename it into place, so that
+    # concurrent processes never observe a partial entry.
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    except OSError:
+        # e.g. read-only home directory, go without the cache
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            parser.save(f)
+        os.replace(tmp, path)
+    except Exception:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+
+
+def cached_lark(grammar: str, postlex: Any = None, transformer: Any = None, **options: Any) -> Lark:
+    """
+    Build a LALR parser for `grammar`, or load it from the on-disk cache.
+    `options` are passed on to `Lark`.
+    """
+    options["parser"] = "lalr"
+    # options which are not saved with the parser tables
+    runtime_options = {"postlex": postlex, "transformer": transformer}
+    if LARK_CACHE_DIR is None:
+        return Lark(grammar, **runtime_options, **options)
+
+    path = LARK_CACHE_DIR / f"lark_{_cache_key(grammar, options, runtime_options)}.pickle"
+    parser = _load(path, grammar, runtime_options)
+    if parser is None:
+        parser = Lark(grammar, **runtime_options, **options)
+        _save(parser, path)
+    return parser
@@ -1,4 +1,5 @@
 import json
+from bisect import bisect_right
 from collections import defaultdict
 from typing import Generic, Optional, TypeVar
 
@@ -119,7 +120,18 @@ class OverridingStorageAllocator:
     """
 
     def __init__(self):
-        self.occupied_slots: dict[int, str] = {}
+        # reserved slot ranges [start, end), disjoint and sorted by start
+        self._starts: list[int] = []
+        self._ranges: list[tuple[int, int, str]] = []
+
+    def get_var_name(self, slot: int) -> Optional[str]:
+        """
+        Return the name of the variable which reserved `slot`, if any
+        """
+        i = bisect_right(self._starts, slot) - 1
+        if i >= 0 and slot < self._ranges[i][1]:
+            return self._ranges[i][2]
+        return None
 
     def reserve_slot_range(self, first_slot: int, n_slots: int, var_name: str) -> None:
         """
@@ -127,25 +139,38 @@ class OverridingStorageAllocator:
         This will raise an error if a storage slot has already been allocated.
         It is responsibility of calling function to ensure first_slot is an int
         """
-        list_to_check = [x + first_slot for x in range(n_slots)]
-        self._reserve_slots(list_to_check, var_name)
+        if n_slots <= 0:
+            return
+        end_slot = first_slot + n_slots
 
-    def _reserve_slots(self, slots: list[int], var_name: str) -> None:
-        for slot in slots:
-            self._reserve_slot(slot, var_name)
+        # errors are reported for the first invalid slot in the range
+        if first_slot < 0 or first_slot >= 2**256:
+            raise _out_of_bounds(first_slot, var_name)
 
-    def _reserve_slot(self, slot: int, var_name: str) -> None:
-        if slot < 0 or slot >= 2**256:
-            raise StorageLayoutException(
-                f"Invalid storage slot for var {var_name}, out of bounds: {slot}"
-            )
-        if slot in self.occupied_slots:
-            collided_var = self.occupied_slots[slot]
-            raise StorageLayoutException(
-                f"Storage collision! Tried to assign '{var_name}' to slot {slot} but it has "
-                f"already been reserved by '{collided_var}'"
-            )
-        self.occupied_slots[slot] = var_name
+        i = bisect_right(self._starts, first_slot)
+        if i > 0 and self._ranges[i - 1][1] > first_slot:
+            # a range which starts before first_slot overlaps
+            raise _collision(first_slot, var_name, self._ranges[i - 1][2])
+        if i < len(self._ranges) and self._ranges[i][0] < end_slot:
+            collision_start, _, collided_var = self._ranges[i]
+            raise _collision(collision_start, var_name, collided_var)
+
+        if end_slot > 2**256:
+            raise _out_of_bounds(2**256, var_name)
+
+        self._starts.insert(i, first_slot)
+        self._ranges.insert(i, (first_slot, end_slot, var_name))
+
+
+def _out_of_bounds(slot: int, var_name: str) -> StorageLayoutException:
+    return StorageLayoutException(f"Invalid storage slot for var {var_name}, out of bounds: {slot}")
+
+
+def _collision(slot: int, var_name: str, collided_var: str) -> StorageLayoutException:
+    return StorageLayoutException(
+        f"Storage collision! Tried to assign '{var_name}' to slot {slot} but it has "
+        f"already been reserved by '{collided_var}'"
+    )
 
 
 def _fetch_path(path: list[str], layout: StorageLayout, node: vy_ast.VyperNode):
@@ -224,7 +249,7 @@ def _allocate_with_overrides_r(
             )
 
         # prevent other storage variables from using the same slot
-        if allocator.occupied_slots.get(global_nonreentrant_slot) != GLOBAL_NONREENTRANT_KEY:
+        if allocator.get_var_name(global_nonreentrant_slot) != GLOBAL_NONREENTRANT_KEY:
             allocator.reserve_slot_range(
                 global_nonreentrant_slot, NONREENTRANT_KEY_SIZE, GLOBAL_NONREENTRANT_KEY
             )
@@ -3,7 +3,7 @@ import dataclasses as dc
 import json
 from dataclasses import asdict, dataclass
 from pathlib import Path, PurePath
-from typing import Any, Iterator, Optional
+from typing import TYPE_CHECKING, Any, Iterator, Optional
 
 import vyper.builtins.interfaces
 import vyper.builtins.stdlib
@@ -27,6 +27,9 @@ from vyper.exceptions import (
 from vyper.semantics.analysis.base import ImportInfo
 from vyper.utils import OrderedSet, safe_relpath, sha256sum
 
+if TYPE_CHECKING:
+    from vyper.compiler.session import ModuleCache
+
 """
 collect import statements and validate the import graph.
 this module is separated into its own pass so that we can resolve the import
@@ -89,12 +92,23 @@ class ImportAnalyzer:
     _compiler_inputs: dict[CompilerInput, vy_ast.Module]
     toplevel_module: vy_ast.Module
 
-    def __init__(self, input_bundle: InputBundle, graph: _ImportGraph, module_ast: vy_ast.Module):
+    def __init__(
+        self,
+        input_bundle: InputBundle,
+        graph: _ImportGraph,
+        module_ast: vy_ast.Module,
+        module_cache: Optional["ModuleCache"] = None,
+    ):
         self.input_bundle = input_bundle
         self.graph = graph
         self.toplevel_module = module_ast
         self._ast_of: dict[int, vy_ast.Module] = {}
 
+        # modules shared with other compilation targets, see
+        # `vyper.compiler.session`
+        self.module_cache = module_cache
+        self._imports_keys: dict = {}
+
         self.seen = OrderedSet()
 
         # keep around compiler inputs so when we construct the output
@@ -129,6 +143,11 @@ class ImportAnalyzer:
     def _resolve_imports_r(self, module_ast: vy_ast.Module):
         if module_ast in self.seen:
             return
+        if self.module_cache is not None and self.module_cache.is_resolved(module_ast):
+            # the imports of this module were already resolved by another
+            # compilation target, no need to walk the import statements.
+            self._collect_resolved_imports_r(module_ast)
+            return
         with self.graph.enter_path(module_ast):
             for node in module_ast.body:
                 with tag_exceptions(node):
@@ -139,6 +158,20 @@ class ImportAnalyzer:
 
         self.seen.add(module_ast)
 
+    def _collect_resolved_imports_r(self, module_ast: vy_ast.Module):
+        # same traversal order as `_resolve_imports_r`, so that compiler
+        # inputs end up in the same order.
+        for s in module_ast.get_children((vy_ast.Import, vy_ast.ImportFrom)):
+            for info in s._metadata["import_infos"]:
+                compiler_input = info.compiler_input
+                if isinstance(info.parsed, vy_ast.Module) and compiler_input.source_id != BUILTIN:
+                    self._ast_of[compiler_input.source_id] = info.parsed
+                    if info.parsed not in self.seen:
+                        self._collect_resolved_imports_r(info.parsed)
+                self._compiler_inputs[compiler_input] = info.parsed
+
+        self.seen.add(module_ast)
+
     def _handle_Import(self, node: vy_ast.Import):
         # import x.y as y
 
@@ -199,57 +232,75 @@ class ImportAnalyzer:
 
         self.graph.imported_modules[path] = node
 
-        err = None
-
         try:
-            path_vy = path.with_suffix(".vy")
-            file = self._load_file(path_vy, level)
-            assert isinstance(file, FileInput)  # mypy hint
+            file = self._load_import_file(path, level, self.graph.current_module)
+        except FileNotFoundError as err:
+            hint = None
+            if module_str.startswith("vyper.interfaces"):
+                hint = "try renaming `vyper.interfaces` to `ethereum.ercs`"
+
+            # copy search_paths, makes debugging a bit easier
+            search_paths = self.input_bundle.search_paths.copy()  # noqa: F841
+            raise ModuleNotFound(module_str, hint=hint) from err
+
+        if isinstance(file, JSONInput):
+            return file, file.data
 
-            module_ast = self._ast_from_file(file)
-            self._resolve_imports_r(module_ast)
+        assert isinstance(file, FileInput)  # mypy hint
+        module_ast = self._ast_from_file(file)
+        self._resolve_imports_r(module_ast)
+
+        return file, module_ast
 
-            return file, module_ast
+    # find the file an import refers to.
+    # raises FileNotFoundError
+    def _load_import_file(
+        self, path: PurePath, level: int, importer: vy_ast.Module
+    ) -> CompilerInput:
+        err = None
 
+        try:
+            file = self._load_file(path.with_suffix(".vy"), level, importer)
+            assert isinstance(file, FileInput)  # mypy hint
+            return file
         except FileNotFoundError as e:
             # escape `e` from the block scope, it can make things
             # easier to debug.
             err = e
 
         try:
-            file = self._load_file(path.with_suffix(".vyi"), level)
+            file = self._load_file(path.with_suffix(".vyi"), level, importer)
             assert isinstance(file, FileInput)  # mypy hint
-            module_ast = self._ast_from_file(file)
-            self._resolve_imports_r(module_ast)
-
-            return file, module_ast
-
+            return file
         except FileNotFoundError:
             pass
 
         try:
-            file = self._load_file(path.with_suffix(".json"), level)
+            file = self._load_file(path.with_suffix(".json"), level, importer)
             if isinstance(file, FileInput):
                 file = try_parse_abi(file)
             assert isinstance(file, JSONInput)  # mypy hint
-            return file, file.data
+            return file
         except FileNotFoundError:
             pass
 
-        hint = None
-        if module_str.startswith("vyper.interfaces"):
-            hint = "try renaming `vyper.interfaces` to `ethereum.ercs`"
+        assert err is not None  # mypy hint
+        raise err
 
-        # copy search_paths, makes debugging a bit easier
-        search_paths = self.input_bundle.search_paths.copy()  # noqa: F841
-        raise ModuleNotFound(module_str, hint=hint) from err
+    def _find_import(self, module_ast: vy_ast.Module, level: int, module_str: str) -> CompilerInput:
+        # resolve an import of a module from the module cache against the
+        # input bundle, without parsing anything (see `ModuleCache.load`)
+        if _is_builtin(level, module_str):
+            file, _ = _load_builtin_import(level, module_str)
+            return file
 
-    def _load_file(self, path: PathLike, level: int) -> CompilerInput:
-        ast = self.graph.current_module
+        path = _import_to_path(level, module_str)
+        return self._load_import_file(path, level, module_ast)
 
+    def _load_file(self, path: PathLike, level: int, importer: vy_ast.Module) -> CompilerInput:
         search_paths: list[PathLike]  # help mypy
         if level != 0:  # relative import
-            search_paths = [Path(ast.resolved_path).parent]
+            search_paths = [Path(importer.resolved_path).parent]
         else:
             search_paths = self.absolute_search_paths
 
@@ -262,7 +313,13 @@ class ImportAnalyzer:
         # two ASTs produced from the same source
         ast_of = self._ast_of
         if file.source_id not in ast_of:
-            ast_of[file.source_id] = _parse_ast(file)
+            if self.module_cache is not None:
+                search_paths = self.absolute_search_paths
+                ast_of[file.source_id] = self.module_cache.load(
+                    file, search_paths, _parse_ast, self._find_import, self._imports_keys
+                )
+            else:
+                ast_of[file.source_id] = _parse_ast(file)
 
         return ast_of[file.source_id]
 
@@ -375,9 +432,23 @@ def _load_builtin_import(level: int, module_str: str) -> tuple[CompilerInput, vy
     return file, builtin_ast
 
 
-def resolve_imports(module_ast: vy_ast.Module, input_bundle: InputBundle):
+def resolve_imports(
+    module_ast: vy_ast.Module,
+    input_bundle: InputBundle,
+    module_cache: Optional["ModuleCache"] = None,
+):
     graph = _ImportGraph()
-    analyzer = ImportAnalyzer(input_bundle, graph, module_ast)
-    analyzer.resolve_imports()
+    analyzer = ImportAnalyzer(input_bundle, graph, module_ast, module_cache)
+    if module_cache is None:
+        analyzer.resolve_imports()
+        return analyzer
+
+    try:
+        analyzer.resolve_imports()
+    except Exception:
+        # modules in the cache might have partially resolved imports
+        module_cache.clear()
+        raise
+    module_cache.mark_resolved(analyzer.seen)
 
     return analyzer
@@ -1,5 +1,5 @@
 import itertools
-from typing import Any, Callable, Iterable, List
+from typing import Any, Callable, Iterable, List, Optional
 
 from vyper import ast as vy_ast
 from vyper.exceptions import (
@@ -50,6 +50,33 @@ def _validate_op(node, types_list, validation_fn_name):
     raise err_list[0]
 
 
+# the types which an integer literal can be annotated with (these are all
+# the integer types), and their bounds. (built on first use, the types
+# module is not fully initialized when this module is imported)
+_int_literal_types: Optional[list[tuple[IntegerT, int, int]]] = None
+
+
+def _int_types_in_range(lower: int, upper: int) -> list:
+    # the integer types which can hold every value in [lower, upper]
+    global _int_literal_types
+    if _int_literal_types is None:
+        _int_literal_types = [
+            (t, *t.int_bounds) for t in types.PRIMITIVE_TYPES.values() if isinstance(t, IntegerT)
+        ]
+    return [t for (t, lo, hi) in _int_literal_types if lo <= lower and upper <= hi]
+
+
+def _int_literal_values(nodes: Iterable[vy_ast.VyperNode]) -> Optional[list[int]]:
+    # the values of `nodes` if they are all integer literals which have
+    # not been annotated with a type yet, otherwise None.
+    ret = []
+    for node in nodes:
+        if not isinstance(node, vy_ast.Int) or "type" in node._metadata:
+            return None
+        ret.append(node.value)
+    return ret
+
+
 def uses_state(var_accesses: Iterable[VarAccess]) -> bool:
     return any(s.variable.is_state_variable() for s in var_accesses)
 
@@ -299,6 +326,16 @@ class _ExprAnalyser:
 
     def types_from_Constant(self, node):
         # literal value (integer, string, etc)
+        if isinstance(node, vy_ast.Int):
+            # fast path, equivalent to validating the literal against
+            # every integer type
+            types_list = _int_types_in_range(node.value, node.value)
+            if types_list:
+                return types_list
+            raise OverflowException(
+                "Numeric literal is outside of allowable range for number types", node
+            )
+
         types_list = []
         for t in types.PRIMITIVE_TYPES.values():
             try:
@@ -513,6 +550,19 @@ def get_common_types(*nodes: vy_ast.VyperNode, filter_fn: Callable = None) -> Li
     """
     common_types = _ExprAnalyser().get_possible_types_from_node(nodes[0])
 
+    # fast path for lists of integer literals (e.g. lookup tables): the
+    # common types are the types of the first item which can hold the
+    # whole range of values.
+    values = _int_literal_values(nodes)
+    if values is not None:
+        lower, upper = min(values), max(values)
+        in_range = [
+            t for t in common_types if t.int_bounds[0] <= lower and upper <= t.int_bounds[1]
+        ]
+        if len(in_range) > 0:
+            return _filter_types(in_range, filter_fn)
+        # otherwise, take the slow path, which raises on the offending item
+
     for item in nodes[1:]:
         new_types = _ExprAnalyser().get_possible_types_from_node(item)
 
@@ -525,10 +575,13 @@ def get_common_types(*nodes: vy_ast.VyperNode, filter_fn: Callable = None) -> Li
 
         common_types = tmp
 
-    if filter_fn is not None:
-        common_types = [i for i in common_types if filter_fn(i)]
+    return _filter_types(common_types, filter_fn)
 
-    return common_types
+
+def _filter_types(types_list: List, filter_fn: Optional[Callable]) -> List:
+    if filter_fn is not None:
+        return [i for i in types_list if filter_fn(i)]
+    return types_list
 
 
 # TODO push this into `ArrayT.validate_literal()`
@@ -541,9 +594,18 @@ def _validate_literal_array(node, expected):
         if len(node.elements) > expected.length:
             return False
 
+    # fast path for lists of integer literals (e.g. lookup tables)
+    value_type = expected.value_type
+    values = _int_literal_values(node.elements)
+    if isinstance(value_type, IntegerT) and values is not None:
+        lower, upper = value_type.int_bounds
+        if lower <= min(values, default=lower) and max(values, default=upper) <= upper:
+            return True
+        # otherwise, take the slow path to find the offending item
+
     for item in node.elements:
         try:
-            validate_expected_type(item, expected.value_type)
+            validate_expected_type(item, value_type)
         except (InvalidType, TypeMismatch):
             return False
 
@@ -585,6 +647,12 @@ def validate_expected_type(node, expected_type):
             # fail block
             pass
 
+    if isinstance(node, vy_ast.Int) and "type" not in node._metadata:
+        # fast path for integer literals (e.g. the items of lookup tables)
+        for t in expected_type:
+            if isinstance(t, IntegerT) and t.int_bounds[0] <= node.value <= t.int_bounds[1]:
+                return
+
     given_types = _ExprAnalyser().get_possible_types_from_node(node)
 
     if isinstance(node, vy_ast.List):
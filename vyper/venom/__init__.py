@@ -5,8 +5,9 @@ from typing import Optional
 
 from vyper.codegen.ir_node import IRnode
 from vyper.compiler.settings import OptimizationLevel, Settings
-from vyper.evm.address_space import MEMORY, STORAGE, TRANSIENT
+from vyper.compiler.timings import get_active_timings
 from vyper.ir.compile_ir import AssemblyInstruction
+from vyper.venom import parallel
 from vyper.venom.analysis import FCGAnalysis
 from vyper.venom.analysis.analysis import IRAnalysesCache
 from vyper.venom.basicblock import IRAbstractMemLoc, IRLabel, IRLiteral
@@ -15,31 +16,8 @@ from vyper.venom.context import DeployInfo, IRContext
 from vyper.venom.function import IRFunction
 from vyper.venom.ir_node_to_venom import ir_node_to_venom
 from vyper.venom.memory_location import fix_mem_loc
-from vyper.venom.passes import (
-    CSE,
-    SCCP,
-    AlgebraicOptimizationPass,
-    AssignElimination,
-    BranchOptimizationPass,
-    CFGNormalization,
-    ConcretizeMemLocPass,
-    DFTPass,
-    FixCalloca,
-    FloatAllocas,
-    FunctionInlinerPass,
-    LoadElimination,
-    LowerDloadPass,
-    MakeSSA,
-    Mem2Var,
-    MemMergePass,
-    PhiEliminationPass,
-    ReduceLiteralsCodesize,
-    RemoveUnusedVariablesPass,
-    RevertToAssert,
-    SimplifyCFGPass,
-    SingleUseExpansion,
-)
-from vyper.venom.passes.dead_store_elimination import DeadStoreElimination
+from vyper.venom.passes import FixCalloca, FunctionInlinerPass
+from vyper.venom.pipeline import PIPELINES, Pipeline, get_pipeline
 from vyper.venom.venom_to_assembly import VenomCompiler
 
 DEFAULT_OPT_LEVEL = OptimizationLevel.default()
@@ -52,78 +30,9 @@ def generate_assembly_experimental(
     return compiler.generate_evm_assembly(optimize == OptimizationLevel.NONE)
 
 
-def _run_passes(fn: IRFunction, optimize: OptimizationLevel, ac: IRAnalysesCache) -> None:
+def _run_passes(fn: IRFunction, pipeline: Pipeline, ac: IRAnalysesCache) -> None:
     # Run passes on Venom IR
-    # TODO: Add support for optimization levels
-
-    FloatAllocas(ac, fn).run_pass()
-
-    SimplifyCFGPass(ac, fn).run_pass()
-
-    MakeSSA(ac, fn).run_pass()
-    PhiEliminationPass(ac, fn).run_pass()
-
-    # run constant folding before mem2var to reduce some pointer arithmetic
-    AlgebraicOptimizationPass(ac, fn).run_pass()
-    SCCP(ac, fn, remove_allocas=False).run_pass()
-    SimplifyCFGPass(ac, fn).run_pass()
-
-    AssignElimination(ac, fn).run_pass()
-    Mem2Var(ac, fn).run_pass()
-    MakeSSA(ac, fn).run_pass()
-    PhiEliminationPass(ac, fn).run_pass()
-    SCCP(ac, fn).run_pass()
-
-    SimplifyCFGPass(ac, fn).run_pass()
-    AssignElimination(ac, fn).run_pass()
-    AlgebraicOptimizationPass(ac, fn).run_pass()
-
-    LoadElimination(ac, fn).run_pass()
-    PhiEliminationPass(ac, fn).run_pass()
-    AssignElimination(ac, fn).run_pass()
-
-    SCCP(ac, fn).run_pass()
-    AssignElimination(ac, fn).run_pass()
-    RevertToAssert(ac, fn).run_pass()
-
-    SimplifyCFGPass(ac, fn).run_pass()
-    RemoveUnusedVariablesPass(ac, fn).run_pass()
-
-    DeadStoreElimination(ac, fn).run_pass(addr_space=MEMORY)
-    DeadStoreElimination(ac, fn).run_pass(addr_space=STORAGE)
-    DeadStoreElimination(ac, fn).run_pass(addr_space=TRANSIENT)
-
-    AssignElimination(ac, fn).run_pass()
-    RemoveUnusedVariablesPass(ac, fn).run_pass()
-    ConcretizeMemLocPass(ac, fn).run_pass()
-    SCCP(ac, fn).run_pass()
-    SimplifyCFGPass(ac, fn).run_pass()
-
-    # run memmerge before LowerDload
-    MemMergePass(ac, fn).run_pass()
-    LowerDloadPass(ac, fn).run_pass()
-    RemoveUnusedVariablesPass(ac, fn).run_pass()
-    BranchOptimizationPass(ac, fn).run_pass()
-
-    AlgebraicOptimizationPass(ac, fn).run_pass()
-
-    # This improves the performance of cse
-    RemoveUnusedVariablesPass(ac, fn).run_pass()
-
-    PhiEliminationPass(ac, fn).run_pass()
-    AssignElimination(ac, fn).run_pass()
-    CSE(ac, fn).run_pass()
-
-    AssignElimination(ac, fn).run_pass()
-    RemoveUnusedVariablesPass(ac, fn).run_pass()
-    SingleUseExpansion(ac, fn).run_pass()
-
-    if optimize == OptimizationLevel.CODESIZE:
-        ReduceLiteralsCodesize(ac, fn).run_pass()
-
-    DFTPass(ac, fn).run_pass()
-
-    CFGNormalization(ac, fn).run_pass()
+    pipeline.run(ac, fn)
 
 
 def _run_global_passes(ctx: IRContext, optimize: OptimizationLevel, ir_analyses: dict) -> None:
@@ -131,7 +40,12 @@ def _run_global_passes(ctx: IRContext, optimize: OptimizationLevel, ir_analyses:
     FunctionInlinerPass(ir_analyses, ctx, optimize).run_pass()
 
 
-def run_passes_on(ctx: IRContext, optimize: OptimizationLevel) -> None:
+def run_passes_on(
+    ctx: IRContext, optimize: OptimizationLevel, pipeline: Optional[Pipeline] = None
+) -> None:
+    if pipeline is None:
+        pipeline = PIPELINES[optimize]
+
     ir_analyses = {}
     # Validate calling convention invariants before running passes
     check_calling_convention(ctx)
@@ -147,32 +61,36 @@ def run_passes_on(ctx: IRContext, optimize: OptimizationLevel) -> None:
     assert ctx.entry_function is not None
     fcg = ir_analyses[ctx.entry_function].force_analysis(FCGAnalysis)
 
-    _run_fn_passes(ctx, fcg, ctx.entry_function, optimize, ir_analyses)
+    _run_fn_passes(ctx, fcg, ctx.entry_function, pipeline, ir_analyses)
 
 
 def _run_fn_passes(
-    ctx: IRContext, fcg: FCGAnalysis, fn: IRFunction, optimize: OptimizationLevel, ir_analyses: dict
+    ctx: IRContext, fcg: FCGAnalysis, fn: IRFunction, pipeline: Pipeline, ir_analyses: dict
 ):
-    visited: set[IRFunction] = set()
+    # callees are optimized before their callers
+    functions: list[IRFunction] = []
     assert ctx.entry_function is not None
-    _run_fn_passes_r(ctx, fcg, ctx.entry_function, optimize, ir_analyses, visited)
+    _call_graph_postorder_r(fcg, ctx.entry_function, set(), functions)
+
+    # (per-pass timings are only recorded in this process)
+    if parallel.JOBS > 1 and len(functions) > 1 and get_active_timings() is None:
+        parallel.run_fn_passes(ctx, functions, pipeline, ir_analyses, parallel.JOBS)
+        return
+
+    for fn in functions:
+        _run_passes(fn, pipeline, ir_analyses[fn])
 
 
-def _run_fn_passes_r(
-    ctx: IRContext,
-    fcg: FCGAnalysis,
-    fn: IRFunction,
-    optimize: OptimizationLevel,
-    ir_analyses: dict,
-    visited: set,
+def _call_graph_postorder_r(
+    fcg: FCGAnalysis, fn: IRFunction, visited: set, functions: list[IRFunction]
 ):
     if fn in visited:
         return
     visited.add(fn)
     for next_fn in fcg.get_callees(fn):
-        _run_fn_passes_r(ctx, fcg, next_fn, optimize, ir_analyses, visited)
+        _call_graph_postorder_r(fcg, next_fn, visited, functions)
 
-    _run_passes(fn, optimize, ir_analyses[fn])
+    functions.append(fn)
 
 
 def generate_venom(
@@ -195,6 +113,6 @@ def generate_venom(
 
     optimize = settings.optimize
     assert optimize is not None  # help mypy
-    run_passes_on(ctx, optimize)
+    run_passes_on(ctx, optimize, get_pipeline(settings))
 
     return ctx
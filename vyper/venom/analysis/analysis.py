@@ -14,6 +14,12 @@ class IRAnalysis:
     function: IRFunction
     analyses_cache: IRAnalysesCache
 
+    # whether the analysis only depends on `function`. if so, the analysis
+    # is kept alive on invalidation requests as long as the function has
+    # not been modified since the analysis was run (see `IRFunction.version`).
+    # analyses which look at other functions have to set this to False.
+    function_local: bool = True
+
     def __init__(self, analyses_cache: IRAnalysesCache, function: IRFunction):
         self.analyses_cache = analyses_cache
         self.function = function
@@ -42,10 +48,22 @@ class IRAnalysesCache:
 
     function: IRFunction
     analyses_cache: dict[Type[IRAnalysis], IRAnalysis]
+    # the function version each cached analysis was computed at
+    analysis_versions: dict[Type[IRAnalysis], int]
+    _invalidating: int
+
+    # number of analysis requests served from the cache / computed,
+    # for pass statistics
+    hits: int
+    misses: int
 
     def __init__(self, function: IRFunction):
         self.analyses_cache = {}
+        self.analysis_versions = {}
+        self._invalidating = 0
         self.function = function
+        self.hits = 0
+        self.misses = 0
 
     # python3.12:
     #   def request_analysis[T](self, analysis_cls: Type[T], *args, **kwargs) -> T:
@@ -56,24 +74,45 @@ class IRAnalysesCache:
         """
         assert issubclass(analysis_cls, IRAnalysis), f"{analysis_cls} is not an IRAnalysis"
         if analysis_cls in self.analyses_cache:
+            self.hits += 1
             ret = self.analyses_cache[analysis_cls]
             assert isinstance(ret, analysis_cls)  # help mypy
             return ret
 
+        self.misses += 1
         analysis = analysis_cls(self, self.function)
         self.analyses_cache[analysis_cls] = analysis
         analysis.analyze(*args, **kwargs)
+        self.analysis_versions[analysis_cls] = self.function.version
 
         return analysis
 
     def invalidate_analysis(self, analysis_cls: Type[IRAnalysis]):
         """
-        Invalidate a specific analysis. This will remove the analysis from the cache.
+        Invalidate a specific analysis. This will remove the analysis from the cache,
+        unless the function has not changed since the analysis was run.
         """
         assert issubclass(analysis_cls, IRAnalysis), f"{analysis_cls} is not an IRAnalysis"
+        if (
+            not self._invalidating
+            and analysis_cls.function_local
+            and self.analysis_versions.get(analysis_cls) == self.function.version
+        ):
+            return
+        self._remove_analysis(analysis_cls)
+
+    def _remove_analysis(self, analysis_cls: Type[IRAnalysis]):
+        self.analysis_versions.pop(analysis_cls, None)
         analysis = self.analyses_cache.pop(analysis_cls, None)
-        if analysis is not None:
+        if analysis is None:
+            return
+        # analyses invalidated by `analysis.invalidate()` depend on this one,
+        # so they are removed even if the function has not changed since.
+        self._invalidating += 1
+        try:
             analysis.invalidate()
+        finally:
+            self._invalidating -= 1
 
     def force_analysis(self, analysis_cls: Type[T], *args, **kwargs) -> T:
         """
@@ -82,6 +121,6 @@ class IRAnalysesCache:
         """
         assert issubclass(analysis_cls, IRAnalysis), f"{analysis_cls} is not an IRAnalysis"
         if analysis_cls in self.analyses_cache:
-            self.invalidate_analysis(analysis_cls)
+            self._remove_analysis(analysis_cls)
 
         return self.request_analysis(analysis_cls, *args, **kwargs)
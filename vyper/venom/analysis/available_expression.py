@@ -1,14 +1,12 @@
 from __future__ import annotations
 
-from collections import deque
 from dataclasses import dataclass
 from functools import cached_property, lru_cache
 
-import immutables
-
 import vyper.venom.effects as effects
 from vyper.venom.analysis.analysis import IRAnalysesCache, IRAnalysis
 from vyper.venom.analysis.cfg import CFGAnalysis
+from vyper.venom.analysis.dataflow import BitsetIndex, Direction, Meet, solve_dataflow
 from vyper.venom.analysis.dfg import DFGAnalysis
 from vyper.venom.basicblock import (
     COMMUTATIVE_INSTRUCTIONS,
@@ -141,104 +139,28 @@ def same_ops(a_ops: list[IROperand | _Expression], b_ops: list[IROperand | _Expr
     return True
 
 
-class _AvailableExpressions:
-    """
-    Class that holds available expression
-    and provides API for handling them
-    """
-
-    exprs: immutables.Map[_Expression, list[IRInstruction]]
-
-    def __init__(self):
-        self.exprs = immutables.Map()
-
-    def __eq__(self, other) -> bool:
-        if not isinstance(other, _AvailableExpressions):
-            return False
-
-        return self.exprs == other.exprs
-
-    def __repr__(self) -> str:
-        res = "available expr\n"
-        for key, val in self.exprs.items():
-            res += f"\t{key}: {val}\n"
-        return res
-
-    def add(self, expr: _Expression, src_inst: IRInstruction):
-        with self.exprs.mutate() as mt:
-            if expr not in mt:
-                mt[expr] = []
-            else:
-                mt[expr] = mt[expr].copy()
-            mt[expr].append(src_inst)
-            self.exprs = mt.finish()
-
-    def remove_effect(self, effect: Effects, ignore_msize):
-        if effect == effects.EMPTY:
-            return
-        to_remove = set()
-        for expr in self.exprs.keys():
-            op_effect = _get_effects(expr.opcode, ignore_msize)
-            if op_effect & effect != effects.EMPTY:
-                to_remove.add(expr)
-
-        with self.exprs.mutate() as mt:
-            for expr in to_remove:
-                del mt[expr]
-            self.exprs = mt.finish()
-
-    def get_source_instruction(self, expr: _Expression) -> IRInstruction | None:
-        """
-        Get source instruction of expression if currently available
-        """
-        tmp = self.exprs.get(expr)
-        if tmp is not None:
-            # arbitrarily choose the first instruction
-            return tmp[0]
-        return None
-
-    def copy(self) -> _AvailableExpressions:
-        res = _AvailableExpressions()
-        res.exprs = self.exprs
-        return res
-
-    @staticmethod
-    def lattice_meet(lattices: list[_AvailableExpressions]):
-        if len(lattices) == 0:
-            return _AvailableExpressions()
-        res = lattices[0].copy()
-        # compute intersection
-        for item in lattices[1:]:
-            tmp = res
-            res = _AvailableExpressions()
-            mt = res.exprs.mutate()
-            for expr, insts in item.exprs.items():
-                if expr not in tmp.exprs:
-                    continue
-                new_insts = []
-                for i in tmp.exprs[expr]:
-                    if i in insts:
-                        new_insts.append(i)
-                if len(new_insts) == 0:
-                    continue
-                mt[expr] = new_insts
-            res.exprs = mt.finish()
-        return res
-
-
 class AvailableExpressionAnalysis(IRAnalysis):
     """
     This analysis implements the standard available expression analysis,
     keeping track of effects and invalidated expressions.
     (https://en.wikipedia.org/wiki/Available_expression)
+
+    Sets of available expressions are represented as bitsets over the
+    instructions computing them.
     """
 
     inst_to_expr: dict[IRInstruction, _Expression]
     dfg: DFGAnalysis
     cfg: CFGAnalysis
-    inst_to_available: dict[IRInstruction, _AvailableExpressions]
-    bb_ins: dict[IRBasicBlock, _AvailableExpressions]
-    bb_outs: dict[IRBasicBlock, _AvailableExpressions]
+    inst_to_available: dict[IRInstruction, int]
+
+    # numbering of the instructions which make an expression available
+    _insts: BitsetIndex[IRInstruction]
+    # the instructions computing each expression
+    _expr_insts: dict[_Expression, int]
+    # the instructions whose expression has each effect (and is
+    # therefore invalidated by a write to it)
+    _effect_insts: dict[Effects, int]
 
     ignore_msize: bool
 
@@ -249,18 +171,19 @@ class AvailableExpressionAnalysis(IRAnalysis):
 
         self.inst_to_expr = dict()
         self.inst_to_available = dict()
-        self.bb_ins = dict()
-        self.bb_outs = dict()
+
+        self._insts = BitsetIndex()
+        self._expr_insts = dict()
+        self._effect_insts = {effect: 0 for effect in Effects}
 
         self.ignore_msize = not self._contains_msize()
 
     def analyze(self):
-        worklist = deque()
-        worklist.append(self.function.entry)
-        while len(worklist) > 0:
-            bb: IRBasicBlock = worklist.popleft()
-            if self._handle_bb(bb):
-                worklist.extend(self.cfg.cfg_out(bb))
+        # predecessors which have not been visited yet are taken to have
+        # no available expressions, so nothing is carried around loops.
+        solve_dataflow(
+            self.cfg, [self.function.entry], self._handle_bb, Direction.FORWARD, Meet.INTERSECTION
+        )
 
     # msize effect should be only necessery
     # to be handled when there is a possibility
@@ -273,29 +196,14 @@ class AvailableExpressionAnalysis(IRAnalysis):
                     return True
         return False
 
-    def _handle_bb(self, bb: IRBasicBlock) -> bool:
-        preds = self.cfg.cfg_in(bb)
-        available_exprs = _AvailableExpressions.lattice_meet(
-            [self.bb_outs.get(pred, _AvailableExpressions()) for pred in preds]
-        )
-
-        if bb in self.bb_ins and self.bb_ins[bb] == available_exprs:
-            return False
-
-        self.bb_ins[bb] = available_exprs.copy()
-
-        change = False
+    def _handle_bb(self, bb: IRBasicBlock, available_exprs: int) -> int:
         for inst in bb.instructions:
             if inst.opcode == "assign" or inst.is_pseudo or inst.is_bb_terminator:
                 continue
             if inst.num_outputs > 1:
                 continue
 
-            if (
-                inst not in self.inst_to_available
-                or available_exprs != self.inst_to_available[inst]
-            ):
-                self.inst_to_available[inst] = available_exprs.copy()
+            self.inst_to_available[inst] = available_exprs
 
             expr = self._mk_expr(inst, available_exprs)
             # get an existing instance if it is available,
@@ -305,7 +213,7 @@ class AvailableExpressionAnalysis(IRAnalysis):
             self._update_expr(inst, expr)
 
             write_effects = _get_write_effects(expr.opcode, self.ignore_msize)
-            available_exprs.remove_effect(write_effects, self.ignore_msize)
+            available_exprs &= ~self._get_invalidated(write_effects)
 
             # nonidempotent instructions affect other instructions,
             # but since it cannot be substituted it should not be
@@ -315,19 +223,35 @@ class AvailableExpressionAnalysis(IRAnalysis):
 
             expr_effects = _get_overlap_effects(expr.opcode, self.ignore_msize)
             if expr_effects == effects.EMPTY:
-                available_exprs.add(expr, inst)
+                available_exprs |= self._add_available(expr, inst)
 
-        if bb not in self.bb_outs or available_exprs != self.bb_outs[bb]:
-            self.bb_outs[bb] = available_exprs
-            # change is only necessery when the output of the
-            # basic block is changed (otherwise it wont affect rest)
-            change |= True
+        return available_exprs
 
-        return change
+    def _add_available(self, expr: _Expression, inst: IRInstruction) -> int:
+        """
+        Number `inst` as a source of `expr`, and return its bit
+        """
+        if inst in self._insts:
+            return self._insts.bit(inst)
+
+        bit = self._insts.bit(inst)
+        self._expr_insts[expr] = self._expr_insts.get(expr, 0) | bit
+        op_effect = _get_effects(expr.opcode, self.ignore_msize)
+        for effect in Effects:
+            if op_effect & effect:
+                self._effect_insts[effect] |= bit
+        return bit
+
+    def _get_invalidated(self, effect: Effects) -> int:
+        ret = 0
+        if effect == effects.EMPTY:
+            return ret
+        for e in Effects:
+            if effect & e:
+                ret |= self._effect_insts[e]
+        return ret
 
-    def _get_operand(
-        self, op: IROperand, available_exprs: _AvailableExpressions
-    ) -> IROperand | _Expression:
+    def _get_operand(self, op: IROperand, available_exprs: int) -> IROperand | _Expression:
         if not isinstance(op, IRVariable):
             return op
         inst = self.dfg.get_producing_instruction(op)
@@ -351,23 +275,32 @@ class AvailableExpressionAnalysis(IRAnalysis):
         return self.inst_to_expr[inst]
 
     def get_expression(self, inst: IRInstruction) -> tuple[_Expression, IRInstruction] | None:
-        available_exprs = self.inst_to_available.get(inst, _AvailableExpressions())
+        available_exprs = self.inst_to_available.get(inst, 0)
 
         expr = self.inst_to_expr.get(inst)
         if expr is None:
             return None
-        src = available_exprs.get_source_instruction(expr)
+        src = self._get_source_instruction(expr, available_exprs)
         if src is None:
             return None
         assert src != inst  # unreachable state
         return (expr, src)
 
     def get_from_same_bb(self, inst: IRInstruction, expr: _Expression) -> list[IRInstruction]:
-        available_exprs = self.inst_to_available.get(inst, _AvailableExpressions())
-        res = available_exprs.exprs[expr]
+        available_exprs = self.inst_to_available.get(inst, 0)
+        res = self._insts.iter(self._expr_insts.get(expr, 0) & available_exprs)
         return [i for i in res if i != inst and i.parent == inst.parent]
 
-    def _mk_expr(self, inst: IRInstruction, available_exprs: _AvailableExpressions) -> _Expression:
+    def _get_source_instruction(
+        self, expr: _Expression, available_exprs: int
+    ) -> IRInstruction | None:
+        """
+        Get source instruction of expression if currently available
+        """
+        # arbitrarily choose the first instruction
+        return self._insts.first(self._expr_insts.get(expr, 0) & available_exprs)
+
+    def _mk_expr(self, inst: IRInstruction, available_exprs: int) -> _Expression:
         operands: list[IROperand | _Expression] = [
             self._get_operand(op, available_exprs) for op in inst.operands
         ]
@@ -375,14 +308,12 @@ class AvailableExpressionAnalysis(IRAnalysis):
 
         return expr
 
-    def _get_available_expression(
-        self, expr: _Expression, available_exprs: _AvailableExpressions
-    ) -> _Expression:
+    def _get_available_expression(self, expr: _Expression, available_exprs: int) -> _Expression:
         """
         Check if the expression is already in available expressions
         is so then return that instance
         """
-        src_inst = available_exprs.get_source_instruction(expr)
+        src_inst = self._get_source_instruction(expr, available_exprs)
         if src_inst is not None:
             same_expr = self.inst_to_expr[src_inst]
             return same_expr
@@ -390,4 +321,11 @@ class AvailableExpressionAnalysis(IRAnalysis):
         return expr
 
     def _update_expr(self, inst: IRInstruction, expr: _Expression):
+        old_expr = self.inst_to_expr.get(inst)
         self.inst_to_expr[inst] = expr
+        if old_expr is None or inst not in self._insts or old_expr == expr:
+            return
+        # the expression of the instruction changed, move it over
+        bit = self._insts.bit(inst)
+        self._expr_insts[old_expr] &= ~bit
+        self._expr_insts[expr] = self._expr_insts.get(expr, 0) | bit
@@ -0,0 +1,170 @@
+from collections import deque
+from enum import Enum
+from typing import Callable, Generic, Iterable, Iterator, Optional, TypeVar
+
+from vyper.utils import OrderedSet
+from vyper.venom.analysis.cfg import CFGAnalysis
+from vyper.venom.basicblock import IRBasicBlock
+
+_T = TypeVar("_T")
+
+
+class BitsetIndex(Generic[_T]):
+    """
+    Dense numbering of items (variables, instructions, ...), so that sets
+    of items can be represented as python ints: bit `i` of a mask is set
+    iff the item numbered `i` is a member of the set.
+    Items are numbered in the order they are first seen, and sets decoded
+    from masks iterate in that order.
+    """
+
+    __slots__ = ("_index", "_items")
+
+    def __init__(self, items: Iterable[_T] = ()):
+        self._index: dict[_T, int] = {}
+        self._items: list[_T] = []
+        for item in items:
+            self.index(item)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item) -> bool:
+        return item in self._index
+
+    def index(self, item: _T) -> int:
+        """
+        Get the number of `item`, numbering it if it was not seen yet
+        """
+        ix = self._index.get(item)
+        if ix is None:
+            ix = len(self._items)
+            self._index[item] = ix
+            self._items.append(item)
+        return ix
+
+    def renumber(self, item: _T) -> int:
+        """
+        Give `item` a new (highest) number. Masks built before keep
+        referring to its old number.
+        """
+        ix = len(self._items)
+        self._index[item] = ix
+        self._items.append(item)
+        return ix
+
+    def bit(self, item: _T) -> int:
+        return 1 << self.index(item)
+
+    def mask(self, items: Iterable[_T]) -> int:
+        ret = 0
+        for item in items:
+            ret |= 1 << self.index(item)
+        return ret
+
+    @property
+    def full(self) -> int:
+        """
+        The mask containing every item numbered so far
+        """
+        return (1 << len(self._items)) - 1
+
+    def iter(self, mask: int) -> Iterator[_T]:
+        items = self._items
+        while mask:
+            low = mask & -mask
+            yield items[low.bit_length() - 1]
+            mask ^= low
+
+    def first(self, mask: int) -> Optional[_T]:
+        if mask == 0:
+            return None
+        return self._items[(mask & -mask).bit_length() - 1]
+
+    def to_set(self, mask: int) -> OrderedSet[_T]:
+        return OrderedSet(self.iter(mask))
+
+
+class Direction(Enum):
+    FORWARD = "forward"
+    BACKWARD = "backward"
+
+
+class Meet(Enum):
+    UNION = "union"
+    INTERSECTION = "intersection"
+
+
+BlockTransfer = Callable[[IRBasicBlock, int], int]
+EdgeTransfer = Callable[[IRBasicBlock, IRBasicBlock, int], int]
+
+
+def solve_dataflow(
+    cfg: CFGAnalysis,
+    blocks: Iterable[IRBasicBlock],
+    transfer: BlockTransfer,
+    direction: Direction,
+    meet: Meet,
+    top: int = 0,
+    boundary: int = 0,
+    edge: Optional[EdgeTransfer] = None,
+) -> tuple[dict[IRBasicBlock, int], dict[IRBasicBlock, int]]:
+    """
+    Worklist solver for dataflow problems over bitsets.
+
+    `transfer(bb, mask)` maps the facts at the start of `bb` to the facts at
+    its end (or the other way around for backward problems). `edge(src, dst,
+    mask)`, if given, adjusts the facts flowing along the cfg edge `src ->
+    dst` (e.g. for phi operands). Blocks without predecessors (successors for
+    backward problems) start from `boundary`, and blocks which have not been
+    visited yet contribute `top` to the meet.
+
+    The worklist is seeded with `blocks` (in order); blocks reached by
+    propagation from them are solved as well.
+
+    Returns the facts at the entry and at the exit of each solved block.
+    """
+    forward = direction == Direction.FORWARD
+    union = meet == Meet.UNION
+
+    ins: dict[IRBasicBlock, int] = {}
+    outs: dict[IRBasicBlock, int] = {}
+    # the facts the transfer function is applied to / produces
+    before, after = (ins, outs) if forward else (outs, ins)
+
+    worklist = deque(blocks)
+    queued = set(worklist)
+
+    while len(worklist) > 0:
+        bb = worklist.popleft()
+        queued.remove(bb)
+
+        sources = cfg.cfg_in(bb) if forward else cfg.cfg_out(bb)
+        if len(sources) == 0:
+            facts = boundary
+        else:
+            facts = -1 if not union else 0
+            for src in sources:
+                mask = after.get(src, top)
+                if edge is not None:
+                    mask = edge(src, bb, mask) if forward else edge(bb, src, mask)
+                if union:
+                    facts |= mask
+                else:
+                    facts &= mask
+
+        if bb in after and before[bb] == facts:
+            # the transfer function would produce the same result
+            continue
+        before[bb] = facts
+        res = transfer(bb, facts)
+        if bb in after and after[bb] == res:
+            continue
+        after[bb] = res
+
+        for dst in cfg.cfg_out(bb) if forward else cfg.cfg_in(bb):
+            if dst not in queued:
+                queued.add(dst)
+                worklist.append(dst)
+
+    return ins, outs
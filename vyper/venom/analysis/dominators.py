@@ -10,25 +10,29 @@ from vyper.venom.function import IRFunction
 class DominatorTreeAnalysis(IRAnalysis):
     """
     Dominator tree implementation. This class computes the dominator tree of a
-    function and provides methods to query the tree. The tree is computed using
-    the Lengauer-Tarjan algorithm.
+    function and provides methods to query the tree. The immediate dominators
+    are computed with the Cooper-Harvey-Kennedy algorithm ("A Simple, Fast
+    Dominance Algorithm") over the post-order indices of the CFG.
     """
 
     fn: IRFunction
     entry_block: IRBasicBlock
-    dominators: dict[IRBasicBlock, OrderedSet[IRBasicBlock]]
     immediate_dominators: dict[IRBasicBlock, IRBasicBlock]
     dominated: dict[IRBasicBlock, OrderedSet[IRBasicBlock]]
     dominator_frontiers: dict[IRBasicBlock, OrderedSet[IRBasicBlock]]
     cfg: CFGAnalysis
 
+    # pre- and post-order numbering of the dominator tree, `a` dominates `b`
+    # iff `b` is in the subtree of `a`.
+    _tree_pre: dict[IRBasicBlock, int]
+    _tree_post: dict[IRBasicBlock, int]
+
     def analyze(self):
         """
         Compute the dominator tree.
         """
         self.fn = self.function
         self.entry_block = self.fn.entry
-        self.dominators = {}
         self.immediate_dominators = {}
         self.dominated = {}
         self.dominator_frontiers = {}
@@ -38,8 +42,8 @@ class DominatorTreeAnalysis(IRAnalysis):
         self.cfg_post_walk = list(self.cfg.dfs_post_walk)
         self.cfg_post_order = {bb: idx for idx, bb in enumerate(self.cfg_post_walk)}
 
-        self._compute_dominators()
         self._compute_idoms()
+        self._number_tree()
         self._compute_df()
 
     def get_all_dominated_blocks(self, bb: IRBasicBlock) -> OrderedSet[IRBasicBlock]:
@@ -59,7 +63,10 @@ class DominatorTreeAnalysis(IRAnalysis):
         """
         Check if `dom` dominates `sub`.
         """
-        return dom in self.dominators[sub]
+        return (
+            self._tree_pre[dom] <= self._tree_pre[sub]
+            and self._tree_post[sub] <= self._tree_post[dom]
+        )
 
     def immediate_dominator(self, bb):
         """
@@ -67,48 +74,73 @@ class DominatorTreeAnalysis(IRAnalysis):
         """
         return self.immediate_dominators.get(bb)
 
-    def _compute_dominators(self):
+    def _compute_idoms(self):
         """
-        Compute dominators
+        Compute immediate dominators
         """
-        basic_blocks = self.cfg_post_walk
-        self.dominators = {bb: OrderedSet(basic_blocks) for bb in basic_blocks}
-        self.dominators[self.entry_block] = OrderedSet([self.entry_block])
+        entry = self.entry_block
+
+        idoms = {entry: entry}
+        # iterate in reverse post-order, so that (apart from back edges) the
+        # predecessors of a block are visited before the block itself
+        reverse_post_walk = [bb for bb in reversed(self.cfg_post_walk) if bb != entry]
         changed = True
-        count = len(basic_blocks) ** 2  # TODO: find a proper bound for this
+        # in reverse post-order, this converges in (loop nesting depth + 3)
+        # iterations, which is bounded by the number of blocks
+        count = len(self.cfg_post_walk) + 3
         while changed:
             count -= 1
             if count < 0:
                 raise CompilerPanic("Dominators computation failed to converge")
             changed = False
-            for bb in basic_blocks:
-                if bb == self.entry_block:
-                    continue
-                preds = self.cfg.cfg_in(bb)
-                if len(preds) == 0:
-                    continue
-                new_dominators = OrderedSet.intersection(*[self.dominators[pred] for pred in preds])
-                new_dominators.add(bb)
-                if new_dominators != self.dominators[bb]:
-                    self.dominators[bb] = new_dominators
+            for bb in reverse_post_walk:
+                new_idom = None
+                for pred in self.cfg.cfg_in(bb):
+                    if pred not in idoms:
+                        # not processed yet (or unreachable)
+                        continue
+                    if new_idom is None:
+                        new_idom = pred
+                    else:
+                        new_idom = self._intersect(idoms, pred, new_idom)
+                # (the dfs parent of `bb` comes before it in reverse post-order)
+                assert new_idom is not None
+                if idoms.get(bb) is not new_idom:
+                    idoms[bb] = new_idom
                     changed = True
 
-    def _compute_idoms(self):
-        """
-        Compute immediate dominators
-        """
-        self.immediate_dominators = {bb: None for bb in self.cfg_post_walk}
-        self.immediate_dominators[self.entry_block] = self.entry_block
-        for bb in self.cfg_post_walk:
-            if bb == self.entry_block:
-                continue
-            doms = sorted(self.dominators[bb], key=lambda x: self.cfg_post_order[x])
-            self.immediate_dominators[bb] = doms[1]
+        # (keep the post-order of the cfg, it determines the order of `dominated`)
+        self.immediate_dominators = {bb: idoms[bb] for bb in self.cfg_post_walk}
 
         self.dominated = {bb: OrderedSet() for bb in self.cfg_post_walk}
         for dom, target in self.immediate_dominators.items():
             self.dominated[target].add(dom)
 
+    def _number_tree(self):
+        """
+        Number the blocks of the dominator tree in pre- and post-order
+        """
+        self._tree_pre = {}
+        self._tree_post = {}
+        pre_count = 0
+        post_count = 0
+
+        entry = self.entry_block
+        self._tree_pre[entry] = pre_count
+        pre_count += 1
+        stack = [(entry, iter(self.dominated[entry]))]
+        while len(stack) > 0:
+            bb, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                self._tree_post[bb] = post_count
+                post_count += 1
+            elif child not in self._tree_pre:
+                self._tree_pre[child] = pre_count
+                pre_count += 1
+                stack.append((child, iter(self.dominated[child])))
+
     def _compute_df(self):
         """
         Compute dominance frontier
@@ -133,16 +165,16 @@ class DominatorTreeAnalysis(IRAnalysis):
             df.update(self.dominator_frontiers[bb])
         return df
 
-    def _intersect(self, bb1, bb2):
+    def _intersect(self, idoms, bb1, bb2):
         """
         Find the nearest common dominator of two basic blocks.
         """
         dfs_order = self.cfg_post_order
-        while bb1 != bb2:
+        while bb1 is not bb2:
             while dfs_order[bb1] < dfs_order[bb2]:
-                bb1 = self.immediate_dominators[bb1]
+                bb1 = idoms[bb1]
             while dfs_order[bb1] > dfs_order[bb2]:
-                bb2 = self.immediate_dominators[bb2]
+                bb2 = idoms[bb2]
         return bb1
 
     @property
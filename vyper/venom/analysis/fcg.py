@@ -10,6 +10,9 @@ class FCGAnalysis(IRAnalysis):
     Compute the function call graph for the context.
     """
 
+    # depends on the other functions in the context
+    function_local = False
+
     ctx: IRContext
     call_sites: dict[IRFunction, OrderedSet[IRInstruction]]
     callees: dict[IRFunction, OrderedSet[IRFunction]]
@@ -35,15 +38,39 @@ class FCGAnalysis(IRAnalysis):
     def get_callees(self, fn: IRFunction) -> OrderedSet[IRFunction]:
         return self.callees[fn]
 
+    def add_call_site(self, caller: IRFunction, inst: IRInstruction) -> None:
+        """
+        Update the call graph with a new `invoke` instruction in `caller`
+        """
+        callee = self._get_callee(inst)
+        self.callees[caller].add(callee)
+        self.call_sites[callee].add(inst)
+
+    def remove_function(self, fn: IRFunction) -> None:
+        """
+        Update the call graph for the removal of `fn` from the context.
+        The calls made from `fn` are removed as well.
+        """
+        for call_site in self.call_sites.pop(fn):
+            self.callees[call_site.parent.parent].discard(fn)
+
+        for bb in fn.get_basic_blocks():
+            for inst in bb.instructions:
+                if inst.opcode == "invoke":
+                    self.call_sites[self._get_callee(inst)].discard(inst)
+
+        del self.callees[fn]
+
+    def _get_callee(self, inst: IRInstruction) -> IRFunction:
+        label = inst.operands[0]
+        assert isinstance(label, IRLabel)  # mypy help
+        return self.ctx.get_function(label)
+
     def _analyze_function(self, fn: IRFunction) -> None:
         for bb in fn.get_basic_blocks():
             for inst in bb.instructions:
                 if inst.opcode == "invoke":
-                    label = inst.operands[0]
-                    assert isinstance(label, IRLabel)  # mypy help
-                    callee = self.ctx.get_function(label)
-                    self.callees[fn].add(callee)
-                    self.call_sites[callee].add(inst)
+                    self.add_call_site(fn, inst)
 
     def invalidate(self):
         pass
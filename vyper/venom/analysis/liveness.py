@@ -1,124 +1,203 @@
-from collections import deque
-
 from vyper.exceptions import CompilerPanic
 from vyper.utils import OrderedSet
 from vyper.venom.analysis import CFGAnalysis, IRAnalysis
+from vyper.venom.analysis.dataflow import BitsetIndex, Direction, Meet, solve_dataflow
 from vyper.venom.basicblock import IRBasicBlock, IRInstruction, IRVariable
 
 
 class LivenessAnalysis(IRAnalysis):
     """
     Compute liveness information for each instruction in the function.
+
+    Liveness of basic blocks is solved over bitsets of variables. Each basic
+    block then numbers its live variables in the order they become live
+    (walking backwards). Only the liveness at entry and exit of each block
+    is stored; the liveness of the instructions of a block is computed
+    when it is first requested.
     """
 
     cfg: CFGAnalysis
 
-    _out_vars: dict[IRBasicBlock, OrderedSet[IRVariable]]
-    inst_to_liveness: dict[IRInstruction, OrderedSet[IRVariable]]
+    # numbering of the variables live in each basic block; the liveness
+    # sets of a basic block are bitsets over its numbering.
+    _block_vars: dict[IRBasicBlock, BitsetIndex[IRVariable]]
+    _out_vars: dict[IRBasicBlock, int]
+    _in_vars: dict[IRBasicBlock, int]
+    # liveness of each instruction, computed on demand per basic block
+    _inst_liveness: dict[IRBasicBlock, dict[IRInstruction, int]]
 
     def analyze(self):
         self.cfg = self.analyses_cache.request_analysis(CFGAnalysis)
-
+        self._vars = BitsetIndex()
+
+        # upward exposed uses and definitions of each basic block
+        self._uses: dict[IRBasicBlock, int] = {}
+        self._defs: dict[IRBasicBlock, int] = {}
+        for bb in self.cfg.dfs_post_walk:
+            self._summarize(bb)
+
+        ins, _ = solve_dataflow(
+            self.cfg,
+            self.cfg.dfs_post_walk,
+            self._transfer,
+            Direction.BACKWARD,
+            Meet.UNION,
+            edge=self._edge,
+        )
+
+        self._block_vars = {}
         self._out_vars = {}
-        self.inst_to_liveness = {}
+        self._in_vars = {}
+        self._inst_liveness = {}
+        # successors first, so that the variable order of a block can be
+        # derived from the variable orders of its successors.
+        for bb in self.cfg.dfs_post_walk:
+            self._number_vars(bb, ins)
         for bb in self.function.get_basic_blocks():
-            self._out_vars[bb] = OrderedSet()
-            for inst in bb.instructions:
-                self.inst_to_liveness[inst] = OrderedSet()
-
-        worklist = deque(self.cfg.dfs_post_walk)
-
-        while len(worklist) > 0:
-            changed = False
-
-            bb = worklist.popleft()
-            changed |= self._calculate_out_vars(bb)
-            changed |= self._calculate_liveness(bb)
-            # recompute liveness for basic blocks pointing into
-            # this basic block
-            if changed:
-                worklist.extend(self.cfg.cfg_in(bb))
+            if bb in self._block_vars:
+                continue
+            if bb in ins:
+                self._number_vars(bb, ins)
+            else:
+                # unreachable, nothing is live
+                self._block_vars[bb] = BitsetIndex()
+                self._out_vars[bb] = 0
+                self._in_vars[bb] = 0
+                self._inst_liveness[bb] = dict.fromkeys(bb.instructions, 0)
+
+        del self._vars
+        del self._uses
+        del self._defs
+
+    def _summarize(self, bb: IRBasicBlock) -> None:
+        uses = 0
+        defs = 0
+        for inst in reversed(bb.instructions):
+            outs = self._vars.mask(inst.get_outputs())
+            uses = (uses | self._vars.mask(inst.get_input_variables())) & ~outs
+            defs |= outs
+        self._uses[bb] = uses
+        self._defs[bb] = defs
+
+    def _transfer(self, bb: IRBasicBlock, out_vars: int) -> int:
+        if bb not in self._uses:
+            # not reachable from the entry, but jumps into a reachable block
+            self._summarize(bb)
+        return self._uses[bb] | (out_vars & ~self._defs[bb])
+
+    def _edge(self, source: IRBasicBlock, target: IRBasicBlock, liveness: int) -> int:
+        for inst in target.phi_instructions:
+            for label, var in inst.phi_operands:
+                bit = self._vars.bit(var)
+                if label == source.label:
+                    liveness |= bit
+                else:
+                    liveness &= ~bit
+        return liveness
 
-    def _calculate_liveness(self, bb: IRBasicBlock) -> bool:
+    def _number_vars(self, bb: IRBasicBlock, ins: dict[IRBasicBlock, int]) -> None:
+        # the variables live at the exit of the basic block, ordered by
+        # the successors they are live in (in cfg order).
+        out_vars: OrderedSet[IRVariable] = OrderedSet()
+        for out_bb in self.cfg.cfg_out(bb):
+            if out_bb in self._block_vars:
+                out_vars.update(self.input_vars_from(bb, out_bb))
+            else:
+                # back edge, the successor has not been numbered yet
+                out_vars.update(self._vars.iter(self._edge(bb, out_bb, ins.get(out_bb, 0))))
+
+        # number the variables of the basic block: variables live at exit
+        # first, then in the order they become live walking backwards
+        # through the basic block. the order is relevant to instruction
+        # selection, which lays out the stack according to it.
+        block_vars = BitsetIndex(out_vars)
+        liveness = self._scan(bb, block_vars)
+
+        self._block_vars[bb] = block_vars
+        self._out_vars[bb] = (1 << len(out_vars)) - 1
+        self._in_vars[bb] = liveness[bb.instructions[0]]
+
+    def _scan(self, bb: IRBasicBlock, block_vars: BitsetIndex) -> dict[IRInstruction, int]:
         """
-        Compute liveness of each instruction in the basic block.
-        Returns True if liveness changed
+        Compute liveness of each instruction in the basic block, numbering
+        the variables as they become live.
         """
-        orig_liveness = self.inst_to_liveness[bb.instructions[0]].copy()
-        liveness = self._out_vars[bb].copy()
+        ret = {}
+        liveness = block_vars.full
         for instruction in reversed(bb.instructions):
-            ins = instruction.get_input_variables()
-            outs = instruction.get_outputs()
-
-            if ins or outs:
-                # perf: only copy if changed
-                liveness = liveness.copy()
-                liveness.update(ins)
-                liveness.dropmany(outs)
-
-            self.inst_to_liveness[instruction] = liveness
-
-        return orig_liveness != self.inst_to_liveness[bb.instructions[0]]
-
-    def _calculate_out_vars(self, bb: IRBasicBlock) -> bool:
-        """
-        Compute out_vars of basic block.
-        Returns True if out_vars changed
-        """
-        out_vars = self._out_vars[bb].copy()
-        self._out_vars[bb] = OrderedSet()
-        for out_bb in self.cfg.cfg_out(bb):
-            target_vars = self.input_vars_from(bb, out_bb)
-            self._out_vars[bb].update(target_vars)
-        return out_vars != self._out_vars[bb]
-
-    def liveness_in_vars(self, bb):
+            for var in instruction.get_input_variables():
+                if var not in block_vars or not liveness & block_vars.bit(var):
+                    # (re-)entering the live set, put it last
+                    liveness |= 1 << block_vars.renumber(var)
+            for var in instruction.get_outputs():
+                if var in block_vars:
+                    liveness &= ~block_vars.bit(var)
+            ret[instruction] = liveness
+        return ret
+
+    def _get_inst_liveness(self, inst: IRInstruction) -> int:
+        bb = inst.parent
+        liveness = self._inst_liveness.get(bb)
+        if liveness is None:
+            # rescan the block. starting from the same variables live at
+            # exit reproduces the numbering of `_number_vars`.
+            block_vars = BitsetIndex(self._block_vars[bb].iter(self._out_vars[bb]))
+            liveness = self._scan(bb, block_vars)
+            self._block_vars[bb] = block_vars
+            self._inst_liveness[bb] = liveness
+        return liveness[inst]
+
+    def liveness_in_vars(self, bb: IRBasicBlock) -> OrderedSet[IRVariable]:
         for inst in bb.instructions:
             if inst.opcode != "phi":
-                return self.inst_to_liveness[inst]
+                return self.live_vars_at(inst)
         return OrderedSet()
 
     def out_vars(self, bb: IRBasicBlock) -> OrderedSet[IRVariable]:
         """
         Return variables that are live at exit of basic block
         """
-        return self._out_vars[bb]
+        return self._block_vars[bb].to_set(self._out_vars[bb])
 
     def live_vars_at(self, inst: IRInstruction) -> OrderedSet[IRVariable]:
         """
         Get the variables that are live at (right before) a given instruction
         """
-        return self.inst_to_liveness[inst]
+        bb = inst.parent
+        if inst is bb.instructions[0]:
+            return self._block_vars[bb].to_set(self._in_vars[bb])
+        return self._block_vars[bb].to_set(self._get_inst_liveness(inst))
 
     # calculate the input variables into self from source
     def input_vars_from(self, source: IRBasicBlock, target: IRBasicBlock) -> OrderedSet[IRVariable]:
-        liveness = self.inst_to_liveness[target.instructions[0]].copy()
-
-        for inst in target.instructions:
-            if inst.opcode == "phi":
-                # we arbitrarily choose one of the arguments to be in the
-                # live variables set (dependent on how we traversed into this
-                # basic block). the argument will be replaced by the destination
-                # operand during instruction selection.
-                # for instance, `%56 = phi %label1 %12 %label2 %14`
-                # will arbitrarily choose either %12 or %14 to be in the liveness
-                # set, and then during instruction selection, after this instruction,
-                # %12 will be replaced by %56 in the liveness set
-
-                # bad path into this phi node
-                if source.label not in inst.operands:
-                    raise CompilerPanic(f"unreachable: {inst} from {source.label}")
-
-                for label, var in inst.phi_operands:
-                    if label == source.label:
-                        liveness.add(var)
-                    else:
-                        if var in liveness:
-                            liveness.remove(var)
+        liveness = self.live_vars_at(target.instructions[0])
+
+        for inst in target.phi_instructions:
+            # we arbitrarily choose one of the arguments to be in the
+            # live variables set (dependent on how we traversed into this
+            # basic block). the argument will be replaced by the destination
+            # operand during instruction selection.
+            # for instance, `%56 = phi %label1 %12 %label2 %14`
+            # will arbitrarily choose either %12 or %14 to be in the liveness
+            # set, and then during instruction selection, after this instruction,
+            # %12 will be replaced by %56 in the liveness set
+
+            # bad path into this phi node
+            if source.label not in inst.operands:
+                raise CompilerPanic(f"unreachable: {inst} from {source.label}")
+
+            for label, var in inst.phi_operands:
+                assert isinstance(var, IRVariable)  # help mypy
+                if label == source.label:
+                    liveness.add(var)
+                else:
+                    liveness.discard(var)
 
         return liveness
 
     def invalidate(self):
         # delete properties so they can't accidentally be used
+        del self._block_vars
         del self._out_vars
-        del self.inst_to_liveness
+        del self._in_vars
+        del self._inst_liveness
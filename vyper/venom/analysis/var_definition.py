@@ -1,6 +1,6 @@
-from vyper.utils import OrderedSet
 from vyper.venom.analysis import CFGAnalysis
 from vyper.venom.analysis.analysis import IRAnalysis
+from vyper.venom.analysis.dataflow import BitsetIndex, Direction, Meet, solve_dataflow
 from vyper.venom.basicblock import IRBasicBlock, IRInstruction, IRVariable
 
 
@@ -10,52 +10,48 @@ class VarDefinition(IRAnalysis):
     point in the program
     """
 
-    defined_vars: dict[IRInstruction, OrderedSet[IRVariable]]
-    defined_vars_bb: dict[IRBasicBlock, OrderedSet[IRVariable]]
+    _vars: BitsetIndex[IRVariable]
+    # the variables that are defined up to (but not including) this point
+    _defined_vars: dict[IRInstruction, int]
+    # variables that are defined at the output of the basic block
+    _defined_vars_bb: dict[IRBasicBlock, int]
     cfg: CFGAnalysis
 
     def analyze(self):
         self.cfg = self.analyses_cache.request_analysis(CFGAnalysis)
 
-        all_variables = OrderedSet()
-        for bb in self.function.get_basic_blocks():
-            all_variables.update(bb.get_assignments())
+        self._vars = BitsetIndex(
+            var for bb in self.function.get_basic_blocks() for var in bb.get_assignments()
+        )
 
-        # the variables that are defined up to (but not including) this point
-        self.defined_vars = dict()
-
-        # variables that are defined at the output of the basic block
-        self.defined_vars_bb = {bb: all_variables.copy() for bb in self.function.get_basic_blocks()}
-
-        worklist = OrderedSet(self.function.get_basic_blocks())
-        while len(worklist) > 0:
-            bb = worklist.pop()
-            changed = self._handle_bb(bb)
-
-            if changed:
-                worklist.update(self.cfg.cfg_out(bb))
-
-    def _handle_bb(self, bb: IRBasicBlock) -> bool:
         # note that the any basic block with no predecessors
         # (either the function entry or the entry block to an unreachable
         # subgraph) will seed with empty. therefore, the fixed point will
         # keep refining down as we iterate over the lattice.
-        input_defined = [self.defined_vars_bb[in_bb] for in_bb in self.cfg.cfg_in(bb)]
-        bb_defined: OrderedSet[IRVariable]
-        if len(input_defined) == 0:
-            # special case for intersection()
-            bb_defined = OrderedSet()
-        else:
-            bb_defined = OrderedSet.intersection(*input_defined)
-
+        self._defined_vars = {}
+        _, self._defined_vars_bb = solve_dataflow(
+            self.cfg,
+            self.function.get_basic_blocks(),
+            self._handle_bb,
+            Direction.FORWARD,
+            Meet.INTERSECTION,
+            top=self._vars.full,
+        )
+
+    def _handle_bb(self, bb: IRBasicBlock, bb_defined: int) -> int:
         for inst in bb.instructions:
-            self.defined_vars[inst] = bb_defined.copy()
-
-            outs = inst.get_outputs()
-            bb_defined.addmany(outs)
-
-        if self.defined_vars_bb[bb] != bb_defined:
-            self.defined_vars_bb[bb] = bb_defined
-            return True
-
-        return False
+            self._defined_vars[inst] = bb_defined
+            bb_defined |= self._vars.mask(inst.get_outputs())
+        return bb_defined
+
+    def is_defined_at(self, var: IRVariable, inst: IRInstruction) -> bool:
+        """
+        Check if `var` is defined on every path to (right before) `inst`
+        """
+        return var in self._vars and bool(self._defined_vars[inst] & self._vars.bit(var))
+
+    def is_defined_out(self, var: IRVariable, bb: IRBasicBlock) -> bool:
+        """
+        Check if `var` is defined on every path to the exit of `bb`
+        """
+        return var in self._vars and bool(self._defined_vars_bb[bb] & self._vars.bit(var))
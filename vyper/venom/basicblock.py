@@ -272,6 +272,75 @@ class IRLabel(IROperand):
         return json.dumps(self.value)  # escape it
 
 
+class _TrackedList(list):
+    """
+    A list which notifies its owner (an instruction or a basic block) when
+    it is modified in place, so that the owning function's version can be
+    bumped (see `IRFunction.version`).
+    """
+
+    __slots__ = ("_owner",)
+
+    def __init__(self, items=(), owner=None):
+        super().__init__(items)
+        self._owner = owner
+
+    def _modified(self):
+        owner = self._owner
+        if owner is not None:
+            owner._mark_modified()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._modified()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._modified()
+
+    def __iadd__(self, other):  # type: ignore[misc]
+        ret = super().__iadd__(other)
+        self._modified()
+        return ret
+
+    def append(self, item):
+        super().append(item)
+        self._modified()
+
+    def extend(self, items):
+        super().extend(items)
+        self._modified()
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self._modified()
+
+    def remove(self, item):
+        super().remove(item)
+        self._modified()
+
+    def pop(self, *args):
+        ret = super().pop(*args)
+        self._modified()
+        return ret
+
+    def clear(self):
+        super().clear()
+        self._modified()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._modified()
+
+    def reverse(self):
+        super().reverse()
+        self._modified()
+
+    def __reduce_ex__(self, protocol):
+        # copy/pickle as a plain list, the owner gets re-attached on assignment
+        return (list, (list(self),))
+
+
 class IRInstruction:
     """
     IRInstruction represents an instruction in IR. Each instruction has an opcode,
@@ -306,6 +375,28 @@ class IRInstruction:
         self.ast_source = None
         self.error_msg = None
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        # track modifications of the instruction in the function version
+        if name in ("opcode", "operands", "_outputs"):
+            changed = self.__dict__.get(name) != value
+            if name == "operands":
+                value = _TrackedList(value, self)
+            object.__setattr__(self, name, value)
+            if changed:
+                self._mark_modified()
+            return
+        object.__setattr__(self, name, value)
+
+    def __setstate__(self, state: dict) -> None:
+        # unpickling does not go through __setattr__, re-attach the owner
+        self.__dict__.update(state)
+        object.__setattr__(self, "operands", _TrackedList(state["operands"], self))
+
+    def _mark_modified(self) -> None:
+        bb = self.__dict__.get("parent")
+        if bb is not None:
+            bb._mark_modified()
+
     @property
     def is_volatile(self) -> bool:
         return self.opcode in VOLATILE_INSTRUCTIONS
@@ -562,9 +653,28 @@ class IRBasicBlock:
 
     def __init__(self, label: IRLabel, parent: IRFunction) -> None:
         assert isinstance(label, IRLabel), "label must be an IRLabel"
+        # (set `parent` last, a new basic block does not modify the function)
         self.label = label
-        self.parent = parent
         self.instructions = []
+        self.parent = parent
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # track modifications of the basic block in the function version
+        if name == "instructions":
+            value = _TrackedList(value, self)
+        object.__setattr__(self, name, value)
+        if name in ("instructions", "label"):
+            self._mark_modified()
+
+    def __setstate__(self, state: dict) -> None:
+        # unpickling does not go through __setattr__, re-attach the owner
+        self.__dict__.update(state)
+        object.__setattr__(self, "instructions", _TrackedList(state["instructions"], self))
+
+    def _mark_modified(self) -> None:
+        fn = self.__dict__.get("parent")
+        if fn is not None:
+            fn.version += 1
 
     @property
     def out_bbs(self):
@@ -80,14 +80,13 @@ def _handle_var_definition(
     for inst in bb.instructions:
         if inst.opcode == "phi":
             for label, op in inst.phi_operands:
-                defined = var_def.defined_vars_bb[fn.get_basic_block(label.name)]
-                if op not in defined:
+                pred = fn.get_basic_block(label.name)
+                if not (isinstance(op, IRVariable) and var_def.is_defined_out(op, pred)):
                     errors.append(VarNotDefined(var=op, inst=inst))
             continue
-        defined = var_def.defined_vars[inst]
         for op in inst.operands:
             if isinstance(op, IRVariable):
-                if op not in defined:
+                if not var_def.is_defined_at(op, inst):
                     errors.append(VarNotDefined(var=op, inst=inst))
     return errors
 
@@ -36,11 +36,17 @@ class IRFunction:
     last_variable: int
     _basic_block_dict: dict[str, IRBasicBlock]
 
+    # modification counter, bumped whenever the function's IR changes
+    # (its basic blocks, or their instructions). used to keep analyses
+    # of unchanged functions alive, see `IRAnalysesCache`.
+    version: int
+
     # Used during code generation
     _ast_source_stack: list[IRnode]
     _error_msg_stack: list[str]
 
     def __init__(self, name: IRLabel, ctx: IRContext = None):
+        self.version = 0
         self.ctx = ctx  # type: ignore
         self.name = name
         self.args = []
@@ -65,10 +71,12 @@ class IRFunction:
         assert isinstance(bb, IRBasicBlock), bb
         assert bb.label.name not in self._basic_block_dict, bb.label
         self._basic_block_dict[bb.label.name] = bb
+        self.version += 1
 
     def remove_basic_block(self, bb: IRBasicBlock):
         assert isinstance(bb, IRBasicBlock), bb
         del self._basic_block_dict[bb.label.name]
+        self.version += 1
 
     def has_basic_block(self, label: str) -> bool:
         return label in self._basic_block_dict
@@ -85,6 +93,7 @@ class IRFunction:
 
     def clear_basic_blocks(self):
         self._basic_block_dict.clear()
+        self.version += 1
 
     def get_basic_blocks(self) -> Iterator[IRBasicBlock]:
         """
@@ -0,0 +1,199 @@
+"""
+Run the per-function venom pipeline over a pool of worker processes.
+
+Most passes only look at the function they optimize. The pipeline is
+split into segments: a segment of function local steps is run for all
+functions in parallel, each function being pickled, optimized in a worker
+process and merged back into the context. Steps which depend on other
+functions (e.g. memory allocation needs the memory used by callees) are
+run in this process, callees first. Since a function local step does not
+depend on the order the functions are optimized in, the result is the
+same as running the whole pipeline on one function after the other.
+"""
+
+import concurrent.futures
+import io
+import multiprocessing
+import pickle
+from typing import Any, Optional
+
+from vyper.ast import nodes as vy_ast
+from vyper.compiler.settings import Settings, anchor_settings, get_global_settings
+from vyper.venom.analysis import IRAnalysesCache
+from vyper.venom.context import IRContext
+from vyper.venom.function import IRFunction
+from vyper.venom.pipeline import Pipeline, Step
+
+# number of worker processes for the per-function passes, set by the
+# `--venom-jobs` cli flag. 1 means the passes run in this process.
+JOBS = 1
+
+
+class _SourceRef:
+    """
+    Stand-in (in a worker process) for an ast node which an instruction
+    refers to. The ast is not sent to the worker processes.
+    """
+
+    __slots__ = ("index",)
+
+    def __init__(self, index: int):
+        self.index = index
+
+
+class _FunctionPickler(pickle.Pickler):
+    # pickle a function without its context, and with references in
+    # place of the ast nodes (`sources`) which its instructions point to.
+    def __init__(self, file, ctx: IRContext, sources: list):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.ctx = ctx
+        self.sources = sources
+        self._source_ids = {id(source): i for i, source in enumerate(sources)}
+
+    def persistent_id(self, obj: Any) -> Any:
+        if obj is self.ctx:
+            return "ctx"
+        if isinstance(obj, _SourceRef):
+            return obj.index
+        if isinstance(obj, vy_ast.VyperNode):
+            ix = self._source_ids.get(id(obj))
+            if ix is None:
+                ix = len(self.sources)
+                self._source_ids[id(obj)] = ix
+                self.sources.append(obj)
+            return ix
+        return None
+
+
+class _FunctionUnpickler(pickle.Unpickler):
+    # `sources` is None in the worker processes
+    def __init__(self, file, ctx: IRContext, sources: Optional[list]):
+        super().__init__(file)
+        self.ctx = ctx
+        self.sources = sources
+        self._refs: dict[int, _SourceRef] = {}
+
+    def persistent_load(self, pid: Any) -> Any:
+        if pid == "ctx":
+            return self.ctx
+        if self.sources is not None:
+            return self.sources[pid]
+        if pid not in self._refs:
+            self._refs[pid] = _SourceRef(pid)
+        return self._refs[pid]
+
+
+def _dumps(fn: IRFunction, ctx: IRContext, sources: list) -> bytes:
+    buf = io.BytesIO()
+    _FunctionPickler(buf, ctx, sources).dump(fn)
+    return buf.getvalue()
+
+
+def _loads(data: bytes, ctx: IRContext, sources: Optional[list]) -> IRFunction:
+    return _FunctionUnpickler(io.BytesIO(data), ctx, sources).load()
+
+
+def _run_steps(
+    data: bytes, steps: tuple[Step, ...], settings: Optional[Settings]
+) -> Optional[bytes]:
+    # (runs in a worker process)
+    try:
+        ctx = IRContext()
+        fn = _loads(data, ctx, None)
+        ctx.add_function(fn)
+        if settings is None:
+            Pipeline(steps).run(IRAnalysesCache(fn), fn)
+        else:
+            # the worker does not inherit the global settings (e.g. the
+            # evm version) unless it was forked from this process.
+            with anchor_settings(settings):
+                Pipeline(steps).run(IRAnalysesCache(fn), fn)
+        return _dumps(fn, ctx, [])
+    except Exception:
+        # let the main process run the passes again and report the
+        # error, the same way as sequential mode.
+        return None
+
+
+def _merge(fn: IRFunction, new_fn: IRFunction) -> None:
+    # keep `fn` itself, it is referenced from the rest of the compiler
+    # (e.g. by the memory allocator).
+    vars(fn).update(vars(new_fn))
+    for bb in fn.get_basic_blocks():
+        bb.parent = fn
+
+
+def _split(pipeline: Pipeline) -> list[tuple[bool, tuple[Step, ...]]]:
+    # split the pipeline into maximal segments of function local steps,
+    # and single steps which are not function local.
+    ret: list[tuple[bool, tuple[Step, ...]]] = []
+    for step in pipeline.steps:
+        if step.function_local and len(ret) > 0 and ret[-1][0]:
+            ret[-1] = (True, ret[-1][1] + (step,))
+        else:
+            ret.append((step.function_local, (step,)))
+    return ret
+
+
+def _run_segment(
+    executor: concurrent.futures.Executor,
+    ctx: IRContext,
+    functions: list[IRFunction],
+    steps: tuple[Step, ...],
+    ir_analyses: dict[IRFunction, IRAnalysesCache],
+) -> bool:
+    settings = get_global_settings()
+    sources: dict[IRFunction, list] = {fn: [] for fn in functions}
+    futures = [
+        executor.submit(_run_steps, _dumps(fn, ctx, sources[fn]), steps, settings)
+        for fn in functions
+    ]
+    results = [future.result() for future in futures]
+    if any(result is None for result in results):
+        return False
+
+    # merge in a fixed order, independent of when the workers finished
+    for fn, result in zip(functions, results):
+        assert result is not None  # help mypy
+        _merge(fn, _loads(result, ctx, sources[fn]))
+        # the cached analyses refer to the old instructions
+        ir_analyses[fn] = IRAnalysesCache(fn)
+
+    return True
+
+
+def run_fn_passes(
+    ctx: IRContext,
+    functions: list[IRFunction],
+    pipeline: Pipeline,
+    ir_analyses: dict[IRFunction, IRAnalysesCache],
+    jobs: int,
+    mp_context: Optional[multiprocessing.context.BaseContext] = None,
+) -> None:
+    """
+    Run `pipeline` on `functions` (which are ordered callees first), using
+    `jobs` worker processes, started with `mp_context` (the default start
+    method if None).
+    """
+    segments = _split(pipeline)
+
+    jobs = min(jobs, len(functions))
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs, mp_context=mp_context
+    ) as executor:
+        for i, (function_local, steps) in enumerate(segments):
+            if function_local and _run_segment(executor, ctx, functions, steps, ir_analyses):
+                continue
+
+            if function_local:
+                # a worker failed (most likely the passes raise an error).
+                # finish in this process, which reports the error the
+                # same way as sequential mode.
+                steps = tuple(step for _, segment in segments[i:] for step in segment)
+                rest = Pipeline(steps)
+                for fn in functions:
+                    rest.run(ir_analyses[fn], fn)
+                return
+
+            for fn in functions:
+                Pipeline(steps).run(ir_analyses[fn], fn)
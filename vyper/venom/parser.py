@@ -1,8 +1,11 @@
 import json
-from typing import Optional
+import re
+from typing import Iterator, Optional
 
-from lark import Lark, Transformer
+from lark import Lark, Token, Transformer, UnexpectedInput
+from lark.lexer import Lexer, PatternStr
 
+from vyper.lark_cache import cached_lark
 from vyper.venom.basicblock import (
     IRAbstractMemLoc,
     IRBasicBlock,
@@ -69,7 +72,101 @@ VENOM_GRAMMAR = """
     %ignore COMMENT
     """
 
-VENOM_PARSER = Lark(VENOM_GRAMMAR, parser="lalr")
+
+class _LexerFallback(Exception):
+    pass
+
+
+class _VenomLexer(Lexer):
+    """
+    A faster lexer for venom. Like lark's contextual lexer, it only
+    produces terminals which the parser accepts in its current state, but
+    it scans each lexeme with a single regex and then classifies it,
+    instead of trying the regexes of all candidate terminals in turn.
+
+    It gives up (with `_LexerFallback`) on anything unusual, including
+    syntax errors; the source is then parsed again with the contextual
+    lexer, which also produces the error messages.
+    """
+
+    __future_interface__ = True
+
+    def __init__(self, lexer_conf):
+        terminals = {t.name: t for t in lexer_conf.terminals}
+        # keywords and punctuation
+        self._literals = {
+            t.pattern.value: name
+            for name, t in terminals.items()
+            if isinstance(t.pattern, PatternStr)
+        }
+        self._const = re.compile(terminals["CONST"].pattern.to_regexp())
+        self._int = re.compile(terminals["INT"].pattern.to_regexp())
+
+        def group(name, regexp):
+            return f"(?P<{name}>{regexp})"
+
+        # NEWLINE comes before WS, like in the contextual lexer
+        groups = [
+            group(name, terminals[name].pattern.to_regexp())
+            for name in ("NEWLINE", "WS", "COMMENT", "VAR_IDENT", "HEXSTR", "ESCAPED_STRING")
+        ]
+        # identifiers, keywords and numbers
+        groups.append(group("WORD", r"[+-]?[0-9A-Za-z_]+"))
+        punctuation = [value for value in self._literals if len(value) == 1]
+        groups.append(group("PUNCTUATION", "|".join(re.escape(c) for c in punctuation)))
+        self._token = re.compile("|".join(groups))
+
+    def lex(self, lexer_state, parser_state) -> Iterator[Token]:
+        # (newer versions of lark wrap the text in a `TextSlice`)
+        text = getattr(lexer_state.text, "text", lexer_state.text)
+        states = parser_state.parse_conf.parse_table.states
+        match = self._token.match
+
+        pos = 0
+        while pos < len(text):
+            m = match(text, pos)
+            if m is None:
+                raise _LexerFallback()
+            start, pos = pos, m.end()
+
+            kind = m.lastgroup
+            if kind in ("WS", "COMMENT"):
+                continue
+
+            value = m.group()
+            accepts = states[parser_state.position]
+            if kind == "NEWLINE":
+                if "NEWLINE" not in accepts:
+                    # where NEWLINE is not accepted, newlines are whitespace
+                    continue
+                type_ = kind
+            elif kind == "WORD":
+                type_ = self._classify_word(value, accepts)
+            elif kind == "PUNCTUATION":
+                type_ = self._literals[value]
+            else:
+                type_ = kind
+
+            if type_ not in accepts:
+                raise _LexerFallback()
+            yield Token(type_, value, start)
+
+    def _classify_word(self, word: str, accepts) -> str:
+        keyword = self._literals.get(word)
+        if keyword in accepts:
+            return keyword
+
+        # where both are accepted, lark tries CONST before IDENT
+        for type_, pattern in (("CONST", self._const), ("INT", self._int)):
+            if type_ in accepts and (m := pattern.match(word)) is not None:
+                if m.end() != len(word):
+                    # e.g. `0x1g`
+                    raise _LexerFallback()
+                return type_
+
+        if word[0] in "+-":
+            raise _LexerFallback()
+        return "IDENT"
 
 
 def _set_last_var(fn: IRFunction):
@@ -307,8 +404,25 @@ class VenomTransformer(Transformer):
         return val.value
 
 
+_parsers: dict[str, Lark] = {}
+
+
+def _venom_parser(lexer: str) -> Lark:
+    # built on first use, and cached on disk across processes. the
+    # transformer runs during parsing, no parse tree is built.
+    if lexer not in _parsers:
+        lexer_type = _VenomLexer if lexer == "fast" else lexer
+        _parsers[lexer] = cached_lark(
+            VENOM_GRAMMAR, lexer=lexer_type, transformer=VenomTransformer()
+        )
+    return _parsers[lexer]
+
+
 def parse_venom(source: str) -> IRContext:
-    tree = VENOM_PARSER.parse(source)
-    ctx = VenomTransformer().transform(tree)
+    try:
+        ctx = _venom_parser("fast").parse(source)
+    except (_LexerFallback, UnexpectedInput):
+        # parse again, and let the contextual lexer report errors
+        ctx = _venom_parser("contextual").parse(source)
     assert isinstance(ctx, IRContext)  # help mypy
     return ctx
@@ -1,9 +1,43 @@
+import functools
+import time
+from typing import Callable
+
+from vyper.compiler.timings import get_active_timings
 from vyper.venom.analysis import IRAnalysesCache
 from vyper.venom.context import IRContext
 from vyper.venom.function import IRFunction
 from vyper.venom.passes.machinery.inst_updater import InstUpdater
 
 
+def _instrumented(pass_name: str, run_pass: Callable) -> Callable:
+    # wrap `run_pass` so that each run of the pass is recorded while
+    # compiler timings are being recorded (see vyper.compiler.timings).
+    @functools.wraps(run_pass)
+    def inner(self, *args, **kwargs):
+        timings = get_active_timings()
+        # fast path, no instrumentation
+        if timings is None:
+            return run_pass(self, *args, **kwargs)
+
+        stage = timings.current_stage()
+        before = self._ir_stats()
+        with timings.phase(f"venom_pass:{pass_name}"):
+            start = time.perf_counter()
+            ret = run_pass(self, *args, **kwargs)
+            elapsed = time.perf_counter() - start
+        after = self._ir_stats()
+
+        timings.record_pass(stage, self._function_name(), pass_name, elapsed, before, after)
+        return ret
+
+    return inner
+
+
+def _function_stats(fn: IRFunction) -> tuple[int, int]:
+    num_insts = sum(len(bb.instructions) for bb in fn.get_basic_blocks())
+    return num_insts, fn.num_basic_blocks
+
+
 class IRPass:
     """
     Base class for all Venom IR passes.
@@ -13,13 +47,31 @@ class IRPass:
     analyses_cache: IRAnalysesCache
     updater: InstUpdater  # optional, does not need to be instantiated
 
+    # whether the pass only reads and writes `function`. function local
+    # passes can be run in a worker process (see vyper.venom.parallel);
+    # passes which depend on other functions have to set this to False.
+    function_local: bool = True
+
     def __init__(self, analyses_cache: IRAnalysesCache, function: IRFunction):
         self.function = function
         self.analyses_cache = analyses_cache
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "run_pass" in cls.__dict__:
+            cls.run_pass = _instrumented(cls.__name__, cls.run_pass)  # type: ignore
+
     def run_pass(self, *args, **kwargs):
         raise NotImplementedError(f"Not implemented! {self.__class__}.run_pass()")
 
+    def _function_name(self) -> str:
+        return self.function.name.value
+
+    def _ir_stats(self) -> tuple[int, int, int, int]:
+        num_insts, num_bbs = _function_stats(self.function)
+        ac = self.analyses_cache
+        return num_insts, num_bbs, ac.hits, ac.misses
+
 
 class IRGlobalPass:
     """
@@ -33,5 +85,24 @@ class IRGlobalPass:
         self.analyses_caches = analyses_caches
         self.ctx = ctx
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "run_pass" in cls.__dict__:
+            cls.run_pass = _instrumented(cls.__name__, cls.run_pass)  # type: ignore
+
     def run_pass(self, *args, **kwargs):
         raise NotImplementedError(f"Not implemented! {self.__class__}.run_pass()")
+
+    def _function_name(self) -> None:
+        return None
+
+    def _ir_stats(self) -> tuple[int, int, int, int]:
+        # aggregate over all functions in the context
+        num_insts = num_bbs = 0
+        for fn in self.ctx.functions.values():
+            fn_insts, fn_bbs = _function_stats(fn)
+            num_insts += fn_insts
+            num_bbs += fn_bbs
+        hits = sum(ac.hits for ac in self.analyses_caches.values())
+        misses = sum(ac.misses for ac in self.analyses_caches.values())
+        return num_insts, num_bbs, hits, misses
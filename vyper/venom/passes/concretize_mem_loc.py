@@ -22,6 +22,9 @@ from vyper.venom.passes.base_pass import IRPass
 class ConcretizeMemLocPass(IRPass):
     allocated_in_bb: dict[IRBasicBlock, int]
 
+    # uses the context's memory allocator, and the memory used by callees
+    function_local = False
+
     def run_pass(self):
         self.allocator = self.function.ctx.mem_allocator
         self.cfg = self.analyses_cache.request_analysis(CFGAnalysis)
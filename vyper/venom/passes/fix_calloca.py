@@ -1,6 +1,6 @@
 from collections import deque
 
-from vyper.venom.analysis import DFGAnalysis, FCGAnalysis
+from vyper.venom.analysis import DFGAnalysis
 from vyper.venom.basicblock import IRInstruction, IRLabel, IRLiteral
 from vyper.venom.function import IRFunction
 from vyper.venom.passes.base_pass import IRGlobalPass
@@ -16,7 +16,6 @@ class FixCalloca(IRGlobalPass):
 
     def run_pass(self):
         for fn in self.ctx.get_functions():
-            self.fcg = self.analyses_caches[fn].request_analysis(FCGAnalysis)
             self.dfg = self.analyses_caches[fn].request_analysis(DFGAnalysis)
             self.updater = InstUpdater(self.dfg)
             self._handle_fn(fn)
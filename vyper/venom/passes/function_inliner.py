@@ -53,13 +53,13 @@ class FunctionInlinerPass(IRGlobalPass):
 
             calls = self.fcg.get_call_sites(candidate)
             self._inline_function(candidate, calls)
+
+            # the call graph is updated in place: the calls in the inlined
+            # bodies were added by `_inline_call_site`.
+            self.fcg.remove_function(candidate)
             self.ctx.remove_function(candidate)
             self.walk.remove(candidate)
 
-            # TODO: check if recomputing this is a perf issue or we should rather
-            # update it in-place.
-            self.fcg = self.analyses_caches[entry].force_analysis(FCGAnalysis)
-
     def _select_inline_candidate(self) -> Optional[IRFunction]:
         for func in self.walk:
             call_count = len(self.fcg.get_call_sites(func))
@@ -205,6 +205,8 @@ class FunctionInlinerPass(IRGlobalPass):
 
                     inst.opcode = "jmp"
                     inst.operands = [call_site_return.label]
+                elif inst.opcode == "invoke":
+                    self.fcg.add_call_site(call_site_func, inst)
 
             for inst in bb.instructions:
                 if not inst.annotation:
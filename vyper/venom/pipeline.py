@@ -0,0 +1,298 @@
+"""
+Declarative description of the per-function venom pass pipeline.
+
+A pipeline is a sequence of steps, where each step is either a single pass
+(`PassStep`) or a group of steps which is rerun until it stops changing
+the IR (`FixedPoint`). There is a default pipeline for each optimization
+level, and a pipeline can also be supplied by the user (via the
+`--venom-pipeline` flag, the `venomPipeline` json setting or the
+`#pragma venom-pipeline` source pragma), using the syntax parsed by
+`parse_pipeline`.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Type, Union
+
+from vyper.compiler.settings import OptimizationLevel, Settings
+from vyper.evm.address_space import MEMORY, STORAGE, TRANSIENT
+from vyper.venom.analysis import IRAnalysesCache
+from vyper.venom.function import IRFunction
+from vyper.venom.passes import (
+    CSE,
+    SCCP,
+    AlgebraicOptimizationPass,
+    AssignElimination,
+    BranchOptimizationPass,
+    CFGNormalization,
+    ConcretizeMemLocPass,
+    DeadStoreElimination,
+    DFTPass,
+    FloatAllocas,
+    LoadElimination,
+    LowerDloadPass,
+    MakeSSA,
+    Mem2Var,
+    MemMergePass,
+    PhiEliminationPass,
+    ReduceLiteralsCodesize,
+    RemoveUnusedVariablesPass,
+    RevertToAssert,
+    SimplifyCFGPass,
+    SingleUseExpansion,
+)
+from vyper.venom.passes.base_pass import IRPass
+
+# safety net against groups which never converge (e.g. two passes which
+# undo each other)
+DEFAULT_MAX_ITERATIONS = 8
+
+
+@dataclass(frozen=True)
+class PassStep:
+    pass_cls: Type[IRPass]
+    # keyword arguments for the pass constructor
+    init_kwargs: tuple[tuple[str, Any], ...] = ()
+    # keyword arguments for `run_pass()`
+    run_kwargs: tuple[tuple[str, Any], ...] = ()
+
+    def run(self, ac: IRAnalysesCache, fn: IRFunction) -> None:
+        self.pass_cls(ac, fn, **dict(self.init_kwargs)).run_pass(**dict(self.run_kwargs))
+
+    @property
+    def function_local(self) -> bool:
+        return self.pass_cls.function_local
+
+    def __str__(self) -> str:
+        return self.pass_cls.__name__
+
+
+@dataclass(frozen=True)
+class FixedPoint:
+    steps: tuple["Step", ...]
+    max_iterations: int = DEFAULT_MAX_ITERATIONS
+
+    def run(self, ac: IRAnalysesCache, fn: IRFunction) -> None:
+        for _ in range(self.max_iterations):
+            before = fn.version
+            for step in self.steps:
+                step.run(ac, fn)
+            if fn.version == before:
+                break
+
+    @property
+    def function_local(self) -> bool:
+        return all(step.function_local for step in self.steps)
+
+    def __str__(self) -> str:
+        return "[" + ",".join(str(step) for step in self.steps) + "]"
+
+
+Step = Union[PassStep, FixedPoint]
+
+
+@dataclass(frozen=True)
+class Pipeline:
+    steps: tuple[Step, ...]
+
+    def run(self, ac: IRAnalysesCache, fn: IRFunction) -> None:
+        for step in self.steps:
+            step.run(ac, fn)
+
+    def __str__(self) -> str:
+        return ",".join(str(step) for step in self.steps)
+
+
+def _dse(addr_space) -> PassStep:
+    return PassStep(DeadStoreElimination, run_kwargs=(("addr_space", addr_space),))
+
+
+_DSE_STEPS = (_dse(MEMORY), _dse(STORAGE), _dse(TRANSIENT))
+
+
+def _step(pass_cls: Type[IRPass], **init_kwargs) -> PassStep:
+    return PassStep(pass_cls, init_kwargs=tuple(init_kwargs.items()))
+
+
+# passes which can be named in a user-supplied pipeline. a name can stand
+# for several steps (e.g. dead store elimination runs once per address
+# space, and mem2var has to be followed by SSA construction). DFT and CFG
+# normalization always run last, see `LOWERING_EPILOGUE`.
+PASS_REGISTRY: dict[str, tuple[PassStep, ...]] = {
+    cls.__name__: (_step(cls),)
+    for cls in (
+        CSE,
+        SCCP,
+        AlgebraicOptimizationPass,
+        AssignElimination,
+        BranchOptimizationPass,
+        ConcretizeMemLocPass,
+        FloatAllocas,
+        LoadElimination,
+        LowerDloadPass,
+        MakeSSA,
+        MemMergePass,
+        PhiEliminationPass,
+        ReduceLiteralsCodesize,
+        RemoveUnusedVariablesPass,
+        RevertToAssert,
+        SimplifyCFGPass,
+        SingleUseExpansion,
+    )
+}
+PASS_REGISTRY["DeadStoreElimination"] = _DSE_STEPS
+PASS_REGISTRY["Mem2Var"] = (_step(Mem2Var), _step(MakeSSA), _step(PhiEliminationPass))
+
+
+def _steps(*items: Union[Type[IRPass], Step, tuple[Step, ...]]) -> tuple[Step, ...]:
+    ret: list[Step] = []
+    for item in items:
+        if isinstance(item, tuple):
+            ret.extend(item)
+        elif isinstance(item, (PassStep, FixedPoint)):
+            ret.append(item)
+        else:
+            ret.append(_step(item))
+    return tuple(ret)
+
+
+_GAS_STEPS = _steps(
+    FloatAllocas,
+    SimplifyCFGPass,
+    MakeSSA,
+    PhiEliminationPass,
+    # run constant folding before mem2var to reduce some pointer arithmetic
+    AlgebraicOptimizationPass,
+    _step(SCCP, remove_allocas=False),
+    SimplifyCFGPass,
+    AssignElimination,
+    Mem2Var,
+    MakeSSA,
+    PhiEliminationPass,
+    SCCP,
+    SimplifyCFGPass,
+    AssignElimination,
+    AlgebraicOptimizationPass,
+    LoadElimination,
+    PhiEliminationPass,
+    AssignElimination,
+    SCCP,
+    AssignElimination,
+    RevertToAssert,
+    SimplifyCFGPass,
+    RemoveUnusedVariablesPass,
+    _DSE_STEPS,
+    AssignElimination,
+    RemoveUnusedVariablesPass,
+    ConcretizeMemLocPass,
+    SCCP,
+    SimplifyCFGPass,
+    # run memmerge before LowerDload
+    MemMergePass,
+    LowerDloadPass,
+    RemoveUnusedVariablesPass,
+    BranchOptimizationPass,
+    AlgebraicOptimizationPass,
+    # This improves the performance of cse
+    RemoveUnusedVariablesPass,
+    PhiEliminationPass,
+    AssignElimination,
+    CSE,
+    AssignElimination,
+    RemoveUnusedVariablesPass,
+    SingleUseExpansion,
+)
+
+# DFT and CFG normalization have to run last
+_FINAL_STEPS = _steps(DFTPass, CFGNormalization)
+
+# a user-supplied pipeline only describes the optimizations, it is always
+# wrapped in the passes which codegen relies on: the IR is brought into SSA
+# form first (most passes, e.g. SCCP, assume it), and memory locations and
+# dloads are lowered (folding the now constant offsets, which would take up
+# stack slots otherwise) and the stack is prepared last.
+LOWERING_PROLOGUE = _steps(FloatAllocas, SimplifyCFGPass, MakeSSA)
+LOWERING_EPILOGUE = (
+    _steps(
+        SimplifyCFGPass,
+        ConcretizeMemLocPass,
+        SCCP,
+        LowerDloadPass,
+        RemoveUnusedVariablesPass,
+        SingleUseExpansion,
+    )
+    + _FINAL_STEPS
+)
+
+# NOTE: the unoptimized pipeline is the same as the gas pipeline, since
+# venom codegen relies on the optimizations (e.g. to keep the number of
+# live variables within reach of the stack). a faster pipeline for
+# development builds can be supplied with `--venom-pipeline`.
+PIPELINES: dict[OptimizationLevel, Pipeline] = {
+    OptimizationLevel.NONE: Pipeline(_GAS_STEPS + _FINAL_STEPS),
+    OptimizationLevel.GAS: Pipeline(_GAS_STEPS + _FINAL_STEPS),
+    OptimizationLevel.CODESIZE: Pipeline(
+        _GAS_STEPS + _steps(ReduceLiteralsCodesize) + _FINAL_STEPS
+    ),
+}
+
+
+def parse_pipeline(spec: str) -> Pipeline:
+    """
+    Parse a pipeline from a comma-separated list of pass names. A group of
+    passes in square brackets is rerun until it stops changing the IR,
+    e.g. `[SCCP,AssignElimination,RemoveUnusedVariablesPass],CSE`. The
+    passes run between `LOWERING_PROLOGUE` and `LOWERING_EPILOGUE`.
+    A spec which is the name of an optimization level (e.g. `gas`) stands
+    for the default pipeline of that level.
+    """
+    spec = "".join(spec.split())  # ignore whitespace
+    if spec in ("none", "gas", "codesize"):
+        return PIPELINES[OptimizationLevel.from_string(spec)]
+
+    steps, rest = _parse_steps(spec)
+    if rest != "":
+        raise ValueError(f"invalid venom pipeline `{spec}`: unexpected `{rest[0]}`")
+    if len(steps) == 0:
+        raise ValueError("empty venom pipeline")
+    return Pipeline(LOWERING_PROLOGUE + tuple(steps) + LOWERING_EPILOGUE)
+
+
+def _parse_steps(spec: str) -> tuple[list[Step], str]:
+    # parse steps until the end of the spec or a closing bracket, return
+    # the parsed steps and the unparsed remainder.
+    steps: list[Step] = []
+    while spec != "" and not spec.startswith("]"):
+        if spec.startswith("["):
+            group, spec = _parse_steps(spec[1:])
+            if not spec.startswith("]"):
+                raise ValueError("invalid venom pipeline: unclosed `[`")
+            if len(group) == 0:
+                raise ValueError("invalid venom pipeline: empty group")
+            steps.append(FixedPoint(tuple(group)))
+            spec = spec[1:]
+        else:
+            name, _, _ = spec.partition(",")
+            name = name.split("]")[0].split("[")[0]
+            if name in ("DFTPass", "CFGNormalization"):
+                raise ValueError(f"venom pass `{name}` always runs last and cannot be named")
+            if name not in PASS_REGISTRY:
+                raise ValueError(f"unknown venom pass `{name}`")
+            steps.extend(PASS_REGISTRY[name])
+            spec = spec[len(name) :]
+
+        if spec.startswith(","):
+            spec = spec[1:]
+        elif spec != "" and not spec.startswith("]"):
+            raise ValueError(f"invalid venom pipeline: expected `,` before `{spec}`")
+
+    return steps, spec
+
+
+def get_pipeline(settings: Settings) -> Pipeline:
+    if settings.venom_pipeline is not None:
+        return parse_pipeline(settings.venom_pipeline)
+
+    optimize = settings.optimize
+    if optimize is None:
+        optimize = OptimizationLevel.default()
+    return PIPELINES[optimize]
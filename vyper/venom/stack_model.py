@@ -1,16 +1,24 @@
+from bisect import bisect_left, insort
+from typing import Any
+
 from vyper.venom.basicblock import IROperand, IRVariable
 
 
 class StackModel:
     NOT_IN_STACK = object()
     _stack: list[IROperand]
+    # the positions (indices into `_stack`, ascending) of each operand,
+    # keyed by operand value, so depth lookups do not scan the stack.
+    _positions: dict[Any, list[int]]
 
     def __init__(self):
         self._stack = []
+        self._positions = {}
 
     def copy(self):
         new = StackModel()
         new._stack = self._stack.copy()
+        new._positions = {k: v.copy() for k, v in self._positions.items()}
         return new
 
     @property
@@ -20,15 +28,41 @@ class StackModel:
         """
         return len(self._stack)
 
+    def _add_position(self, op: IROperand, pos: int) -> None:
+        positions = self._positions.get(op.value)
+        if positions is None:
+            self._positions[op.value] = [pos]
+        else:
+            insort(positions, pos)
+
+    def _remove_position(self, op: IROperand, pos: int) -> None:
+        positions = self._positions[op.value]
+        if len(positions) == 1:
+            del self._positions[op.value]
+        else:
+            del positions[bisect_left(positions, pos)]
+
     def push(self, op: IROperand) -> None:
         """
         Pushes an operand onto the stack map.
         """
         assert isinstance(op, IROperand), f"{type(op)}: {op}"
+        positions = self._positions.get(op.value)
+        if positions is None:
+            self._positions[op.value] = [len(self._stack)]
+        else:
+            # the top of the stack is above all other positions
+            positions.append(len(self._stack))
         self._stack.append(op)
 
     def pop(self, num: int = 1) -> None:
-        del self._stack[len(self._stack) - num :]
+        for _ in range(num):
+            op = self._stack.pop()
+            positions = self._positions[op.value]
+            if len(positions) == 1:
+                del self._positions[op.value]
+            else:
+                positions.pop()
 
     def get_depth(self, op: IROperand) -> int:
         """
@@ -37,11 +71,11 @@ class StackModel:
         """
         assert isinstance(op, IROperand), f"{type(op)}: {op}"
 
-        for i, stack_op in enumerate(reversed(self._stack)):
-            if stack_op.value == op.value:
-                return -i
+        positions = self._positions.get(op.value)
+        if positions is None:
+            return StackModel.NOT_IN_STACK  # type: ignore
 
-        return StackModel.NOT_IN_STACK  # type: ignore
+        return positions[-1] - len(self._stack) + 1
 
     def get_phi_depth(self, phis: list[IRVariable]) -> int:
         """
@@ -52,12 +86,12 @@ class StackModel:
         assert isinstance(phis, list)
 
         ret = StackModel.NOT_IN_STACK
-        for i, stack_item in enumerate(reversed(self._stack)):
-            if stack_item in phis:
+        for phi in dict.fromkeys(phis):
+            for pos in self._positions.get(phi.value, ()):
                 assert (
                     ret is StackModel.NOT_IN_STACK
                 ), f"phi argument is not unique! {phis}, {self._stack}"
-                ret = -i
+                ret = pos - len(self._stack) + 1
 
         return ret  # type: ignore
 
@@ -75,7 +109,10 @@ class StackModel:
         assert depth is not StackModel.NOT_IN_STACK, "Cannot poke non-in-stack depth"
         assert depth <= 0, "Bad depth"
         assert isinstance(op, IROperand), f"{type(op)}: {op}"
-        self._stack[depth - 1] = op
+        pos = len(self._stack) + depth - 1
+        self._remove_position(self._stack[pos], pos)
+        self._add_position(op, pos)
+        self._stack[pos] = op
 
     def dup(self, depth: int) -> None:
         """
@@ -83,7 +120,7 @@ class StackModel:
         """
         assert depth is not StackModel.NOT_IN_STACK, "Cannot dup non-existent operand"
         assert depth <= 0, "Cannot dup positive depth"
-        self._stack.append(self.peek(depth))
+        self.push(self.peek(depth))
 
     def swap(self, depth: int) -> None:
         """
@@ -91,9 +128,17 @@ class StackModel:
         """
         assert depth is not StackModel.NOT_IN_STACK, "Cannot swap non-existent operand"
         assert depth < 0, "Cannot swap positive depth"
-        top = self._stack[-1]
-        self._stack[-1] = self._stack[depth - 1]
-        self._stack[depth - 1] = top
+        top_pos = len(self._stack) - 1
+        pos = top_pos + depth
+        top = self._stack[top_pos]
+        op = self._stack[pos]
+        if top.value != op.value:
+            self._remove_position(top, top_pos)
+            self._add_position(top, pos)
+            self._remove_position(op, pos)
+            self._add_position(op, top_pos)
+        self._stack[top_pos] = op
+        self._stack[pos] = top
 
     def __repr__(self) -> str:
         return f"<StackModel: {self._stack}>"
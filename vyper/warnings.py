@@ -25,6 +25,22 @@ def warnings_filter(warnings_control: Optional[str]):
         yield
 
 
+@contextlib.contextmanager
+def record_warnings():
+    """
+    Record the warnings emitted in this context. The recorded warnings are
+    re-emitted on exit, under the enclosing warnings filter, so recording
+    them is transparent to the caller.
+    """
+    try:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            yield caught
+    finally:
+        for w in caught:
+            warnings.warn(w.message, stacklevel=3)
+
+
 def set_warnings_filter(warnings_control: Optional[str]):
     if warnings_control == "error":
         warnings_filter = "error"